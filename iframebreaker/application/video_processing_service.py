@@ -102,10 +102,7 @@ class VideoProcessingService:
         return batches
 
     def _publish_segments(self, segments: List[SegmentMessage]) -> bool:
-        for segment in segments:
-            if not self._message_publisher.publish(segment):
-                return False
-        return True
+        return self._message_publisher.publish_batch(segments)
 
     def _extract_video_id(self, video_url: str) -> str:
         try:
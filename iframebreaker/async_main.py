@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import signal
+from typing import Optional
+from config.config import Config
+from storage.minio_client import MinioClient
+from storage.redis_client import RedisClient
+from messaging.async_rabbitmq_client import AsyncRabbitMQClient
+from infrastructure.async_video_analyzer import AsyncFFProbeVideoAnalyzer, AsyncPacketFFProbeVideoAnalyzer
+from services.video_service import VideoService
+from services.async_message_handler import AsyncMessageHandler
+from main import HealthChecker, start_health_check_server
+
+class AsyncHealthChecker(HealthChecker):
+    def get_health_status(self):
+        checks = {
+            'rabbitmq': self._check_rabbitmq(),
+            'minio': self._check_minio(),
+        }
+        return {
+            'status': 'healthy' if all(checks.values()) else 'unhealthy',
+            'checks': checks,
+            'presigned_url_cache': self.minio_client.cache_stats()
+        }
+
+    def _check_rabbitmq(self):
+        try:
+            return self.rabbitmq_client.check_health()
+        except Exception:
+            return False
+
+class AsyncIFrameBreakerApp:
+    """asyncio runtime: one event loop, up to MAX_CONCURRENT_PROBES ffprobe subprocesses in flight."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.minio_client = MinioClient(config)
+        self.rabbitmq_client = AsyncRabbitMQClient(config)
+        self.message_handler = AsyncMessageHandler(
+            config,
+            self.minio_client,
+            self.rabbitmq_client,
+            VideoService(config, self._create_keyframe_cache(config)),
+            self._create_video_analyzer(config),
+            RedisClient(config) if config.IDEMPOTENT_UPLOADS else None
+        )
+        self.health_server = None
+        self.shutdown_event: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def _create_keyframe_cache(config: Config):
+        if not config.KEYFRAME_CACHE:
+            return None
+        from storage.keyframe_cache import RedisKeyframeCache
+        return RedisKeyframeCache(config)
+
+    @staticmethod
+    def _create_video_analyzer(config: Config) -> AsyncFFProbeVideoAnalyzer:
+        if config.VIDEO_ANALYZER == 'packets':
+            return AsyncPacketFFProbeVideoAnalyzer(config.MAX_CONCURRENT_PROBES)
+        return AsyncFFProbeVideoAnalyzer(config.MAX_CONCURRENT_PROBES)
+
+    async def start(self) -> None:
+        self.shutdown_event = asyncio.Event()
+        self._warn_unsupported_settings()
+
+        try:
+            await self.rabbitmq_client.connect()
+            health_checker = AsyncHealthChecker(self.rabbitmq_client, self.minio_client, self.config)
+            self.health_server, _ = start_health_check_server(health_checker, self.config.HEALTH_CHECK_PORT)
+
+            await self.rabbitmq_client.consume(self.message_handler.handle_message)
+            logging.info(f"Consuming with up to {self.config.MAX_CONCURRENT_PROBES} concurrent probes, prefetch {self.config.RABBITMQ_PREFETCH_COUNT}")
+
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.add_signal_handler(signum, self._request_shutdown, signum)
+            await self.shutdown_event.wait()
+        finally:
+            await self._cleanup()
+
+    def _warn_unsupported_settings(self) -> None:
+        if self.config.PIPELINED_PUBLISHING:
+            logging.warning("PIPELINED_PUBLISHING is not supported by the asyncio runtime; publishing after each probe")
+        if self.config.PROBE_INPUT == 'scratch':
+            logging.warning("PROBE_INPUT=scratch is not supported by the asyncio runtime; probing presigned URLs")
+        if self.config.SCHEDULER != 'fifo':
+            logging.warning("SCHEDULER is not supported by the asyncio runtime; uploads are handled in delivery order")
+        if self.config.MP4_INDEX_READER:
+            logging.warning("MP4_INDEX_READER is not supported by the asyncio runtime; probing every upload with ffprobe")
+        if self.config.VIDEO_ANALYZER not in ('ffprobe', 'packets'):
+            logging.warning(f"VIDEO_ANALYZER={self.config.VIDEO_ANALYZER} is not supported by the asyncio runtime; using ffprobe")
+
+    def _request_shutdown(self, signum) -> None:
+        logging.info(f"Received signal {signum}, shutting down...")
+        self.shutdown_event.set()
+
+    async def _cleanup(self) -> None:
+        await self.rabbitmq_client.close()
+        if self.health_server:
+            self.health_server.shutdown()
+
+def run(config: Config) -> None:
+    asyncio.run(AsyncIFrameBreakerApp(config).start())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import os
+import statistics
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_timestamp_selectors import build_keyframes, time_selector
+from infrastructure.balanced_timestamp_selector import BalancedTimestampSelector
+from infrastructure.timestamp_selector import TwoPointerTimestampSelector
+
+
+def segment_stats(cuts):
+    """Segment count, duration standard deviation and longest-minus-shortest spread."""
+    durations = [b - a for a, b in zip(cuts, cuts[1:])]
+    if not durations:
+        return 0, 0.0, 0.0
+    return len(durations), statistics.pstdev(durations), max(durations) - min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare greedy and balanced (DP) cut points: runtime and segment evenness.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Keyframe counts (default: 10k 100k 1M).")
+    parser.add_argument("--profiles", nargs="+", default=["all-intra", "screen", "gop", "jittered"],
+                        help="Keyframe profiles: all-intra, screen, gop, jittered.")
+    parser.add_argument("--min-period", type=float, default=5.0, help="Minimum segment duration (default: 5.0).")
+    parser.add_argument("--max-period", type=float, default=8.0, help="Maximum segment duration (default: 8.0).")
+    parser.add_argument("--variance-weight", type=float, default=10.0, help="TIMESTAMP_VARIANCE_WEIGHT (default: 10).")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement; best time is reported (default: 1).")
+
+    args = parser.parse_args()
+
+    selectors = {
+        "two_pointer": TwoPointerTimestampSelector(),
+        "balanced": BalancedTimestampSelector(args.variance_weight),
+    }
+
+    print(f"{'profile':>10} {'keyframes':>10} {'selector':>12} {'time':>10} {'segments':>9} {'stddev':>8} {'spread':>8}")
+    for profile in args.profiles:
+        for count in args.counts:
+            keyframes = build_keyframes(count, profile)
+            for name, selector in selectors.items():
+                elapsed, cuts = time_selector(selector, keyframes, args.min_period, args.max_period, args.repeat)
+                segments, stddev, spread = segment_stats(cuts)
+                print(f"{profile:>10} {count:>10} {name:>12} {elapsed * 1000:>8.1f}ms {segments:>9} {stddev:>7.3f}s {spread:>7.3f}s")
+
+if __name__ == "__main__":
+    main()
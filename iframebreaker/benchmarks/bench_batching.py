@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import heapq
+import os
+import random
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from infrastructure.timestamp_selector import TwoPointerTimestampSelector
+from services.video_service import VideoService
+
+
+def cut_points(duration: float, gop: float, seed: int):
+    """Cut points of a video with a jittered GOP, as the service would select them."""
+    rng = random.Random(seed)
+    keyframes, ts = [0.0], 0.0
+    while ts < duration:
+        ts = min(ts + gop * rng.uniform(0.5, 1.5), duration)
+        keyframes.append(round(ts, 3))
+    return TwoPointerTimestampSelector().select_optimal_timestamps(keyframes, 5.0, 8.0)
+
+
+def makespan(batches, workers: int, speed: float, overhead: float) -> float:
+    """Finish time of the last job when jobs go, in message order, to the first free worker."""
+    free_at = [0.0] * workers
+    finish = 0.0
+    for batch in batches:
+        start = heapq.heappop(free_at)
+        end = start + overhead + (batch[-1] - batch[0]) / speed
+        heapq.heappush(free_at, end)
+        finish = max(finish, end)
+    return finish
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcode makespan of fixed-span and balanced segment batching.")
+    parser.add_argument("--durations", type=float, nargs="+", default=[61, 125, 600, 3600, 10800],
+                        help="Video durations in seconds (default: 61 125 600 3600 10800).")
+    parser.add_argument("--workers", type=int, default=16, help="Parallel transcode jobs (default: 16).")
+    parser.add_argument("--span", type=float, default=60.0, help="MESSAGE_SPAN_SECONDS for the fixed strategy (default: 60).")
+    parser.add_argument("--speed", type=float, default=0.5, help="Seconds of video a job transcodes per second (default: 0.5).")
+    parser.add_argument("--overhead", type=float, default=15.0, help="Per-job startup cost in seconds (default: 15).")
+    parser.add_argument("--gop", type=float, default=2.0, help="Mean keyframe interval in seconds (default: 2).")
+
+    args = parser.parse_args()
+
+    strategies = {
+        "span": lambda cuts: VideoService.batch_timestamps(cuts, args.span),
+        "within-span": lambda cuts: VideoService.batches_within(cuts, args.span),
+        "target-jobs": lambda cuts: VideoService.balanced_batches(cuts, args.workers),
+    }
+
+    print(f"{'duration':>9} " + " ".join(f"{name + ' jobs':>17} {'makespan':>9}" for name in strategies))
+    for duration in args.durations:
+        cuts = cut_points(duration, args.gop, seed=int(duration))
+        row = []
+        for strategy in strategies.values():
+            batches = strategy(cuts)
+            row.append(f"{len(batches):>17} {makespan(batches, args.workers, args.speed, args.overhead):>8.0f}s")
+        print(f"{duration:>8.0f}s " + " ".join(row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from infrastructure.mp4_index_analyzer import Mp4IndexVideoAnalyzer
+from tests.test_mp4_index_analyzer import build_mp4
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class FileRangeHandler(BaseHTTPRequestHandler):
+    """Serves one file from disk with Range support, counting the bytes sent."""
+
+    def do_GET(self):
+        size = os.path.getsize(self.server.path)
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        start, end = (int(match.group(1)), min(int(match.group(2) or size - 1), size - 1)) if match else (0, size - 1)
+
+        self.send_response(206 if match else 200)
+        if match:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+
+        with open(self.server.path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                chunk = f.read(min(remaining, 1 << 20))
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+                self.server.bytes_sent += len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_sparse_mp4(path: str, size_gb: float, hours: float):
+    """Moov-at-end MP4 whose mdat is a sparse hole of ``size_gb``; 25 fps, 2 s GOP."""
+    samples = int(hours * 3600 * 25)
+    mp4 = build_mp4(samples, 512, 12800, sync_every=50, ctts_offset=1024, edits=[(int(hours * 3600 * 1000), 1024)], mdat_size=0)
+    mdat_at = mp4.index(b'mdat') - 4
+    moov = mp4[mdat_at + 8:]
+    mdat_size = int(size_gb * (1 << 30))
+
+    with open(path, 'wb') as f:
+        f.write(mp4[:mdat_at])
+        f.write((mdat_size + 16).to_bytes(4, 'big') if mdat_size + 16 < 1 << 32 else (1).to_bytes(4, 'big'))
+        f.write(b'mdat')
+        if mdat_size + 16 >= 1 << 32:
+            f.write((mdat_size + 16).to_bytes(8, 'big'))
+        else:
+            f.write(b'\0' * 8)
+        f.seek(mdat_size, os.SEEK_CUR)
+        f.write(moov)
+    return samples // 50
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time MP4 moov index reading against a full sequential read of the file.")
+    parser.add_argument("--size-gb", type=float, default=4.0, help="Size of the (sparse) mdat in GiB (default: 4).")
+    parser.add_argument("--hours", type=float, default=2.0, help="Simulated video duration in hours (default: 2).")
+    parser.add_argument("--full-read", action="store_true", help="Also time downloading the whole file, as ffprobe would.")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'movie.mp4')
+        expected_keyframes = write_sparse_mp4(path, args.size_gb, args.hours)
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FileRangeHandler)
+        server.path = path
+        server.bytes_sent = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}/movie.mp4'
+
+        analyzer = Mp4IndexVideoAnalyzer(fallback=Mock())
+        start = time.perf_counter()
+        keyframes, duration = analyzer.extract_keyframes(url)
+        elapsed = time.perf_counter() - start
+
+        print(f"File size:          {os.path.getsize(path) / (1 << 30):.2f} GiB")
+        print(f"Keyframes:          {len(keyframes)} (expected {expected_keyframes}), duration {duration:.1f}s")
+        print(f"Index read:         {elapsed * 1000:.1f} ms, {server.bytes_sent / 1024:.1f} KiB transferred")
+
+        if args.full_read:
+            server.bytes_sent = 0
+            start = time.perf_counter()
+            with urllib.request.urlopen(url) as response:
+                while response.read(1 << 20):
+                    pass
+            print(f"Full read:          {time.perf_counter() - start:.2f} s, {server.bytes_sent / (1 << 30):.2f} GiB transferred")
+
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
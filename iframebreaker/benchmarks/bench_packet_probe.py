@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from infrastructure.video_analyzer import FFProbeVideoAnalyzer, PacketFFProbeVideoAnalyzer
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FIXTURES = {
+    "h264-1080p": ("1920x1080", ["-c:v", "libx264", "-preset", "ultrafast"]),
+    "hevc-2160p": ("3840x2160", ["-c:v", "libx265", "-preset", "ultrafast"]),
+}
+
+
+def make_fixture(directory: str, name: str, duration: int, gop: int) -> str:
+    """Encode a synthetic test pattern with a fixed GOP so both modes must agree."""
+    path = os.path.join(directory, f"{name}.mp4")
+    size, codec = FIXTURES[name]
+    command = [
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=duration={duration}:rate=25:size={size}",
+        *codec, "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+        "-pix_fmt", "yuv420p", path
+    ]
+    subprocess.run(command, check=True)
+    return path
+
+
+def children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def measure(analyzer, path: str, repeat: int):
+    best_wall, best_cpu, result = float("inf"), float("inf"), None
+    for _ in range(repeat):
+        cpu_start, wall_start = children_cpu_seconds(), time.perf_counter()
+        result = analyzer.extract_keyframes(path)
+        best_wall = min(best_wall, time.perf_counter() - wall_start)
+        best_cpu = min(best_cpu, children_cpu_seconds() - cpu_start)
+    return best_wall, best_cpu, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare frame-based and packet-based ffprobe keyframe extraction.")
+    parser.add_argument("videos", nargs="*", help="Local video files; synthetic fixtures are encoded when omitted.")
+    parser.add_argument("--fixtures", nargs="+", default=list(FIXTURES), choices=list(FIXTURES))
+    parser.add_argument("--duration", type=int, default=60, help="Fixture duration in seconds (default: 60).")
+    parser.add_argument("--gop", type=int, default=50, help="Fixture GOP length in frames (default: 50).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; best time is reported (default: 3).")
+
+    args = parser.parse_args()
+
+    if not shutil.which("ffprobe") or (not args.videos and not shutil.which("ffmpeg")):
+        sys.exit("ffprobe (and ffmpeg for fixtures) must be on PATH")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        videos = args.videos or [make_fixture(tmp, name, args.duration, args.gop) for name in args.fixtures]
+
+        print(f"{'video':>24} {'mode':>8} {'wall (s)':>9} {'cpu (s)':>8} {'keyframes':>10}  identical")
+        for path in videos:
+            frames_wall, frames_cpu, frames = measure(FFProbeVideoAnalyzer(), path, args.repeat)
+            packets_wall, packets_cpu, packets = measure(PacketFFProbeVideoAnalyzer(), path, args.repeat)
+            name = os.path.basename(path)[-24:]
+            print(f"{name:>24} {'frames':>8} {frames_wall:>9.3f} {frames_cpu:>8.3f} {len(frames[0] or []):>10}")
+            print(f"{name:>24} {'packets':>8} {packets_wall:>9.3f} {packets_cpu:>8.3f} {len(packets[0] or []):>10}  {frames == packets}")
+
+if __name__ == "__main__":
+    main()
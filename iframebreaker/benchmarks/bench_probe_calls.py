@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import json
+import logging
+import os
+import time
+from unittest.mock import Mock, patch
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.config import Config
+from services.message_handler import MessageHandler
+from services.video_service import VideoService
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class FakeFFProbe:
+    """Stands in for subprocess.run, counting calls and simulating probe latency."""
+
+    def __init__(self, duration: float, gop_seconds: float, latency: float):
+        keyframes = [i * gop_seconds for i in range(int(duration / gop_seconds))]
+        self.stdout = json.dumps({
+            "frames": [{"pts_time": f"{ts:.6f}"} for ts in keyframes],
+            "format": {"duration": f"{duration:.6f}"}
+        })
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        return Mock(stdout=self.stdout)
+
+
+def build_upload_event(index: int) -> bytes:
+    record = {"s3": {"bucket": {"name": "raw"}, "object": {"key": f"session{index}/movie.mp4"}}}
+    return json.dumps({"Records": [record]}).encode('utf-8')
+
+
+def run(messages: int, duration: float, gop_seconds: float, latency: float):
+    config = Config()
+    minio_client = Mock()
+    minio_client.find_presigned_url.side_effect = lambda bucket, prefix, candidates: ('http://minio/raw/session/movie.mp4', next(iter(candidates)))
+    rabbitmq_client = Mock()
+    rabbitmq_client.publish_status.return_value = True
+    rabbitmq_client.publish_segments.return_value = True
+
+    handler = MessageHandler(config, minio_client, rabbitmq_client, VideoService(config))
+    fake_ffprobe = FakeFFProbe(duration, gop_seconds, latency)
+
+    with patch('infrastructure.video_analyzer.subprocess.run', fake_ffprobe):
+        start = time.perf_counter()
+        for i in range(messages):
+            handler.process_video_message(Mock(), Mock(delivery_tag=i), None, build_upload_event(i))
+        elapsed = time.perf_counter() - start
+
+    print(f"Messages processed:       {messages}")
+    print(f"ffprobe calls:            {fake_ffprobe.calls}")
+    print(f"ffprobe calls / message:  {fake_ffprobe.calls / messages:.2f}")
+    print(f"Wall time:                {elapsed:.3f}s ({elapsed / messages * 1000:.1f} ms/message)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count ffprobe invocations per upload message with a simulated ffprobe.")
+    parser.add_argument("--messages", type=int, default=20, help="Number of upload events to process (default: 20).")
+    parser.add_argument("--duration", type=float, default=7200.0, help="Simulated video duration in seconds (default: 7200).")
+    parser.add_argument("--gop", type=float, default=2.0, help="Seconds between simulated keyframes (default: 2.0).")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per ffprobe run (default: 0.05).")
+
+    args = parser.parse_args()
+    run(args.messages, args.duration, args.gop, args.latency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_mp4_index import FileRangeHandler
+from infrastructure.scratch_download import ParallelRangeDownloader
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class ThrottledRangeHandler(FileRangeHandler):
+    """Adds per-request latency and a per-connection bandwidth cap, like a proxied ingress."""
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        super().do_GET()
+
+    def setup(self):
+        super().setup()
+        write = self.wfile.write
+        rate = self.server.connection_rate
+
+        def throttled(data):
+            time.sleep(len(data) / rate)
+            return write(data)
+
+        self.wfile.write = throttled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a single-stream download with parallel ranged GETs.")
+    parser.add_argument("--size-mb", type=int, default=256, help="Object size in MiB (default: 256).")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Added latency per request (default: 20).")
+    parser.add_argument("--connection-mbps", type=float, default=400.0, help="Bandwidth cap per connection in Mbit/s (default: 400).")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16], help="Parallel range counts to try.")
+    parser.add_argument("--chunk-mb", type=int, default=16, help="Range size in MiB (default: 16).")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'movie.bin')
+        with open(source, 'wb') as f:
+            f.truncate(args.size_mb << 20)
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottledRangeHandler)
+        server.path = source
+        server.bytes_sent = 0
+        server.latency = args.latency_ms / 1000
+        server.connection_rate = args.connection_mbps * 1e6 / 8
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}/movie.bin'
+
+        start = time.perf_counter()
+        with urllib.request.urlopen(url) as response:
+            while response.read(1 << 20):
+                pass
+        single = time.perf_counter() - start
+        print(f"{'mode':>16} {'wall (s)':>9} {'speedup':>8}")
+        print(f"{'single GET':>16} {single:>9.2f} {1.0:>8.1f}")
+
+        target = os.path.join(tmp, 'scratch.bin')
+        for workers in args.workers:
+            downloader = ParallelRangeDownloader(workers, args.chunk_mb << 20, timeout=600)
+            start = time.perf_counter()
+            downloader.download(url, target, downloader.content_length(url))
+            elapsed = time.perf_counter() - start
+            os.unlink(target)
+            print(f"{f'{workers} ranges':>16} {elapsed:>9.2f} {single / elapsed:>8.1f}")
+
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+import os
+import subprocess
+import time
+import tracemalloc
+from unittest.mock import patch
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from infrastructure.video_analyzer import FFProbeVideoAnalyzer, StreamingFFProbeVideoAnalyzer
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+REAL_POPEN = subprocess.Popen
+
+# Emits the same keyframes ffprobe would, either as one JSON document or as compact lines.
+FAKE_FFPROBE = r'''
+import sys
+count, gop, fmt = int(sys.argv[1]), float(sys.argv[2]), sys.argv[3]
+out = sys.stdout
+if fmt == "json":
+    out.write('{"frames": [')
+    for i in range(count):
+        out.write(('' if i == 0 else ',') + '{"pts_time": "%.6f"}' % (i * gop))
+    out.write('], "format": {"duration": "%.6f"}}' % (count * gop))
+else:
+    for i in range(count):
+        out.write('frame|pts_time=%.6f\n' % (i * gop))
+    out.write('format|duration=%.6f\n' % (count * gop))
+'''
+
+
+def fake_popen(count, gop):
+    def popen(command, **kwargs):
+        fmt = command[command.index("-of") + 1]
+        return REAL_POPEN([sys.executable, '-c', FAKE_FFPROBE, str(count), str(gop), fmt], **kwargs)
+    return popen
+
+
+def measure(analyzer, count, gop):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_keyframe_at = None
+
+    with patch('infrastructure.video_analyzer.subprocess.Popen', side_effect=fake_popen(count, gop)):
+        if isinstance(analyzer, StreamingFFProbeVideoAnalyzer):
+            stream = analyzer.stream_keyframes('fake://video')
+            for _ in stream:
+                if first_keyframe_at is None:
+                    first_keyframe_at = time.perf_counter() - start
+        else:
+            analyzer.extract_keyframes('fake://video')
+            first_keyframe_at = time.perf_counter() - start
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, first_keyframe_at, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare buffered JSON and streaming ffprobe parsing on synthetic keyframe lists.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Keyframe counts to simulate (default: 10k 100k 1M).")
+    parser.add_argument("--gop", type=float, default=2.0, help="Seconds between keyframes (default: 2.0).")
+
+    args = parser.parse_args()
+
+    print(f"{'keyframes':>10} {'mode':>10} {'total (s)':>10} {'first kf (s)':>13} {'peak MiB':>10}")
+    for count in args.counts:
+        for name, analyzer in (("json", FFProbeVideoAnalyzer()), ("streaming", StreamingFFProbeVideoAnalyzer())):
+            elapsed, first, peak = measure(analyzer, count, args.gop)
+            print(f"{count:>10} {name:>10} {elapsed:>10.3f} {first:>13.3f} {peak / 2**20:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import os
+import random
+import time
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from infrastructure.timestamp_selector import OptimalTimestampSelector, TwoPointerTimestampSelector
+from infrastructure.vectorized_timestamp_selector import NumpyTimestampSelector
+
+SELECTORS = {
+    "greedy": OptimalTimestampSelector,
+    "two_pointer": TwoPointerTimestampSelector,
+    "numpy": NumpyTimestampSelector,
+}
+
+
+def build_keyframes(count: int, profile: str, seed: int = 0):
+    """Synthetic keyframe lists: all-intra 25fps, screen recording bursts, scene-cut GOPs or a regular 2s GOP."""
+    rng = random.Random(seed)
+    if profile == "all-intra":
+        return [i * 0.04 for i in range(count)]
+    if profile == "screen":
+        frames, ts = [], 0.0
+        for _ in range(count):
+            ts += rng.choice([0.04, 0.04, 0.04, 0.5, 3.0, 12.0])
+            frames.append(round(ts, 3))
+        return frames
+    if profile == "jittered":
+        frames, ts = [], 0.0
+        for _ in range(count):
+            ts += rng.uniform(0.3, 2.5)
+            frames.append(round(ts, 3))
+        return frames
+    return [i * 2.0 for i in range(count)]
+
+
+def time_selector(selector, keyframes, min_period, max_period, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = selector.select_optimal_timestamps(keyframes, min_period, max_period)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cut-point selectors on dense keyframe lists.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000],
+                        help="Keyframe counts (default: 10k 100k 1M 5M).")
+    parser.add_argument("--profiles", nargs="+", default=["all-intra", "screen", "gop"],
+                        help="Keyframe profiles: all-intra, screen, jittered, gop.")
+    parser.add_argument("--min-period", type=float, default=5.0, help="Minimum segment duration (default: 5.0).")
+    parser.add_argument("--max-period", type=float, default=8.0, help="Maximum segment duration (default: 8.0).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; best time is reported (default: 3).")
+    parser.add_argument("--selectors", nargs="+", default=list(SELECTORS), choices=list(SELECTORS))
+
+    args = parser.parse_args()
+
+    print(f"{'profile':>10} {'keyframes':>10} " + " ".join(f"{name:>12}" for name in args.selectors) + "  identical")
+    for profile in args.profiles:
+        for count in args.counts:
+            keyframes = build_keyframes(count, profile)
+            timings, results = [], []
+            for name in args.selectors:
+                elapsed, result = time_selector(SELECTORS[name](), keyframes, args.min_period, args.max_period, args.repeat)
+                timings.append(elapsed)
+                results.append(result)
+            identical = all(result == results[0] for result in results)
+            print(f"{profile:>10} {count:>10} " + " ".join(f"{t * 1000:>10.1f}ms" for t in timings) + f"  {identical}")
+
+if __name__ == "__main__":
+    main()
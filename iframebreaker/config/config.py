@@ -34,6 +34,17 @@ class Config:
         self.RABBITMQ_PUBLISH_EXCHANGE = os.environ.get('RABBITMQ_PUBLISH_EXCHANGE', 'video_segments')
         self.RABBITMQ_PUBLISH_ROUTING_KEY = os.environ.get('RABBITMQ_PUBLISH_ROUTING_KEY', 'segment.process')
         self.RABBITMQ_CONSUME_QUEUE = os.environ.get('RABBITMQ_CONSUME_QUEUE', 'video_upload_queue')
+        self.RABBITMQ_PLAYLIST_EXCHANGE = os.environ.get('RABBITMQ_PLAYLIST_EXCHANGE', 'video')
+        self.RABBITMQ_PLAYLIST_ROUTING_KEY = os.environ.get('RABBITMQ_PLAYLIST_ROUTING_KEY', 'video.playlist')
+        
+        # Publish status events from a bounded in-memory outbox on a background thread (threaded runtime),
+        # keeping only the latest pending status per video
+        self.STATUS_OUTBOX = os.environ.get('STATUS_OUTBOX', 'true').lower() == 'true'
+        self.STATUS_OUTBOX_MAX_PENDING = int(os.environ.get('STATUS_OUTBOX_MAX_PENDING', '10000'))
+        self.STATUS_OUTBOX_BATCH_SIZE = int(os.environ.get('STATUS_OUTBOX_BATCH_SIZE', '100'))
+        self.STATUS_OUTBOX_FLUSH_INTERVAL_SECONDS = float(os.environ.get('STATUS_OUTBOX_FLUSH_INTERVAL_SECONDS', '1.0'))
+        # Seconds the asyncio runtime waits for publisher confirms of a segment batch; the blocking client relies on the connection heartbeat
+        self.RABBITMQ_CONFIRM_TIMEOUT_SECONDS = float(os.environ.get('RABBITMQ_CONFIRM_TIMEOUT_SECONDS', '30'))
         
         # RabbitMQ Retry Configuration
         self.RABBITMQ_MAX_RETRIES = int(os.environ.get('RABBITMQ_MAX_RETRIES', '5'))
@@ -45,20 +56,108 @@ class Config:
         self.CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', '3'))
         self.CIRCUIT_BREAKER_TIMEOUT = int(os.environ.get('CIRCUIT_BREAKER_TIMEOUT', '60'))
 
+        # Redis Configuration
+        self.REDIS_HOST = os.environ.get('REDIS_HOST', 'redis')
+        self.REDIS_PORT = int(os.environ.get('REDIS_PORT', '6379'))
+        self.REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', '')
+        self.REDIS_DB = int(os.environ.get('REDIS_DB', '0'))
+        # Cache probe results in Redis by bucket, key and ETag so redelivered uploads skip ffprobe
+        self.KEYFRAME_CACHE = os.environ.get('KEYFRAME_CACHE', 'false').lower() == 'true'
+        self.KEYFRAME_CACHE_TTL_SECONDS = int(os.environ.get('KEYFRAME_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+        # Track each upload (video_id + ETag) in Redis: duplicate events are acked without work and
+        # partially published videos resume from the first unpublished message_id
+        self.IDEMPOTENT_UPLOADS = os.environ.get('IDEMPOTENT_UPLOADS', 'false').lower() == 'true'
+        self.UPLOAD_STATE_TTL_SECONDS = int(os.environ.get('UPLOAD_STATE_TTL_SECONDS', str(7 * 24 * 3600)))
+        # Progress is recorded after every this many confirmed segment messages
+        self.PUBLISH_CHECKPOINT_MESSAGES = int(os.environ.get('PUBLISH_CHECKPOINT_MESSAGES', '100'))
+
         # Presigned URL Configuration
         self.PRESIGNED_URL_EXPIRY_HOURS = int(os.environ.get('PRESIGNED_URL_EXPIRY_HOURS', '24'))
+        # Seconds a signed URL is reused for redelivered events. Segment jobs carry the URL and can wait
+        # in the queue for hours, so keep this short: every URL handed out then has at least
+        # expiry minus this window left (23h50m by default), well beyond queue plus transcode time
+        self.PRESIGNED_URL_CACHE_SECONDS = int(os.environ.get('PRESIGNED_URL_CACHE_SECONDS', '600'))
+        # Cached URLs are also re-signed at least this long before they expire, for short expiries
+        self.PRESIGNED_URL_CACHE_MARGIN_SECONDS = int(os.environ.get('PRESIGNED_URL_CACHE_MARGIN_SECONDS', '3600'))
+        self.PRESIGNED_URL_CACHE_SIZE = int(os.environ.get('PRESIGNED_URL_CACHE_SIZE', '1024'))
+        self.MINIO_BUCKET_CACHE_TTL_SECONDS = int(os.environ.get('MINIO_BUCKET_CACHE_TTL_SECONDS', '300'))
 
         # Video Processing Configuration
         self.MIN_PERIOD_SECONDS = float(os.environ.get('MIN_PERIOD_SECONDS', '5.0'))
         self.MAX_PERIOD_SECONDS = float(os.environ.get('MAX_PERIOD_SECONDS', '8.0'))
         self.MESSAGE_SPAN_SECONDS = float(os.environ.get('MESSAGE_SPAN_SECONDS', '60.0'))
+        # Segment batching: "span" (fixed MESSAGE_SPAN_SECONDS windows) or "balanced" (near-equal
+        # batches; BATCH_TARGET_JOBS per video if set, else as few as fit BATCH_MAX_JOB_SECONDS)
+        self.BATCH_STRATEGY = os.environ.get('BATCH_STRATEGY', 'span').lower()
+        self.BATCH_TARGET_JOBS = int(os.environ.get('BATCH_TARGET_JOBS', '0'))
+        self.BATCH_MAX_JOB_SECONDS = float(os.environ.get('BATCH_MAX_JOB_SECONDS', str(self.MESSAGE_SPAN_SECONDS)))
+        if self.BATCH_MAX_JOB_SECONDS <= 0:
+            raise ValueError(f"BATCH_MAX_JOB_SECONDS must be positive, got {self.BATCH_MAX_JOB_SECONDS}")
         self.FFPROBE_TIMEOUT_SECONDS = int(os.environ.get('FFPROBE_TIMEOUT_SECONDS', '900'))
+        # Order of prefetched uploads: "fifo" or "fair" (per-user fairness, then shortest estimated job
+        # first); reordering needs RABBITMQ_PREFETCH_COUNT above WORKER_THREADS
+        self.SCHEDULER = os.environ.get('SCHEDULER', 'fifo').lower()
+        self.SCHEDULER_AGING_SECONDS = float(os.environ.get('SCHEDULER_AGING_SECONDS', '600'))
+        # Assumed upload bitrate for cost estimates when no cached duration exists (8 Mbit/s)
+        self.SCHEDULER_BYTES_PER_SECOND = float(os.environ.get('SCHEDULER_BYTES_PER_SECOND', '1000000'))
+        self.SCHEDULER_DEFAULT_COST_SECONDS = float(os.environ.get('SCHEDULER_DEFAULT_COST_SECONDS', '600'))
+        # Segment messages carry AMQP priority up to this value, shorter videos first (0 disables);
+        # the transcode queue must be declared with a matching x-max-priority
+        self.SEGMENT_MAX_PRIORITY = int(os.environ.get('SEGMENT_MAX_PRIORITY', '9'))
+        # Stream-copy the source into the rendition at its own height instead of re-encoding, when it is
+        # H.264 in one of PASSTHROUGH_PROFILES up to PASSTHROUGH_MAX_LEVEL (41 = 4.1) and no cut-point gap
+        # exceeds PASSTHROUGH_MAX_SEGMENT_SECONDS; pipelined publishing always re-encodes
+        self.PASSTHROUGH = os.environ.get('PASSTHROUGH', 'false').lower() == 'true'
+        self.PASSTHROUGH_PROFILES = [
+            profile.strip().lower()
+            for profile in os.environ.get('PASSTHROUGH_PROFILES', 'Constrained Baseline,Baseline,Main,High').split(',')
+            if profile.strip()
+        ]
+        self.PASSTHROUGH_MAX_LEVEL = int(os.environ.get('PASSTHROUGH_MAX_LEVEL', '41'))
+        self.PASSTHROUGH_MAX_SEGMENT_SECONDS = float(os.environ.get('PASSTHROUGH_MAX_SEGMENT_SECONDS', str(self.MAX_PERIOD_SECONDS)))
+        # How long an upload claimed by one worker counts as in progress for duplicate events
+        self.UPLOAD_LEASE_SECONDS = int(os.environ.get('UPLOAD_LEASE_SECONDS', str(self.FFPROBE_TIMEOUT_SECONDS + 300)))
+        # Video analyzer: "ffprobe" (buffered JSON), "streaming" (line-oriented, incremental)
+        # or "packets" (keyframe flags from demuxed packets, no decoding)
+        self.VIDEO_ANALYZER = os.environ.get('VIDEO_ANALYZER', 'ffprobe').lower()
+        # Read keyframes of progressive MP4/MOV uploads from the moov box via HTTP Range requests,
+        # using VIDEO_ANALYZER only for other containers
+        self.MP4_INDEX_READER = os.environ.get('MP4_INDEX_READER', 'false').lower() == 'true'
+        self.MP4_INDEX_HEAD_BYTES = int(os.environ.get('MP4_INDEX_HEAD_BYTES', '65536'))
+        self.MP4_INDEX_MAX_MOOV_BYTES = int(os.environ.get('MP4_INDEX_MAX_MOOV_BYTES', str(256 * 1024 * 1024)))
+        self.MP4_INDEX_HTTP_TIMEOUT_SECONDS = float(os.environ.get('MP4_INDEX_HTTP_TIMEOUT_SECONDS', '30'))
+        # Probe input: "url" (ffprobe reads the presigned URL) or "scratch" (objects of at least
+        # SCRATCH_MIN_SIZE_BYTES are downloaded with parallel ranged GETs and probed from local disk)
+        self.PROBE_INPUT = os.environ.get('PROBE_INPUT', 'url').lower()
+        self.SCRATCH_DIR = os.environ.get('SCRATCH_DIR') or None
+        self.SCRATCH_MIN_SIZE_BYTES = int(os.environ.get('SCRATCH_MIN_SIZE_BYTES', str(256 * 1024 * 1024)))
+        # Total bytes all in-flight scratch files may occupy; larger objects are probed over HTTP
+        self.SCRATCH_DISK_BUDGET_BYTES = int(os.environ.get('SCRATCH_DISK_BUDGET_BYTES', str(20 * 1024 * 1024 * 1024)))
+        self.SCRATCH_DOWNLOAD_WORKERS = int(os.environ.get('SCRATCH_DOWNLOAD_WORKERS', '8'))
+        self.SCRATCH_CHUNK_BYTES = int(os.environ.get('SCRATCH_CHUNK_BYTES', str(16 * 1024 * 1024)))
+        self.SCRATCH_HTTP_TIMEOUT_SECONDS = float(os.environ.get('SCRATCH_HTTP_TIMEOUT_SECONDS', '60'))
+        # Cut-point selector: "greedy" (reference), "two_pointer" (linear), "numpy" (searchsorted)
+        # or "balanced" (DP over segment count and duration variance; pipelined publishing stays greedy)
+        self.TIMESTAMP_SELECTOR = os.environ.get('TIMESTAMP_SELECTOR', 'two_pointer').lower()
+        # Weight of the squared relative duration deviation against one extra segment in "balanced"
+        self.TIMESTAMP_VARIANCE_WEIGHT = float(os.environ.get('TIMESTAMP_VARIANCE_WEIGHT', '10'))
+        # Write a <upload>.kfidx keyframe index next to each raw upload (see storage/keyframe_index.py)
+        self.KEYFRAME_INDEX_SIDECAR = os.environ.get('KEYFRAME_INDEX_SIDECAR', 'false').lower() == 'true'
+        # Publish segment batches while ffprobe is still running; the job total is written to Redis at the end
+        self.PIPELINED_PUBLISHING = os.environ.get('PIPELINED_PUBLISHING', 'false').lower() == 'true'
         
         # Health Check Configuration
         self.HEALTH_CHECK_PORT = int(os.environ.get('HEALTH_CHECK_PORT', '8080'))
         
         # Application Configuration
         self.WORKER_THREADS = int(os.environ.get('WORKER_THREADS', '1'))
+        # Runtime: "threaded" (blocking pika + WORKER_THREADS) or "asyncio" (aio_pika + asyncio subprocesses)
+        self.RUNTIME = os.environ.get('RUNTIME', 'threaded').lower()
+        # Concurrent ffprobe subprocesses in the asyncio runtime
+        self.MAX_CONCURRENT_PROBES = int(os.environ.get('MAX_CONCURRENT_PROBES', '16'))
+        # Unacked upload messages per consumer; defaults to one per worker thread (or probe slot)
+        default_prefetch = self.MAX_CONCURRENT_PROBES if self.RUNTIME == 'asyncio' else self.WORKER_THREADS
+        self.RABBITMQ_PREFETCH_COUNT = int(os.environ.get('RABBITMQ_PREFETCH_COUNT', str(default_prefetch)))
         self.GRACEFUL_SHUTDOWN_TIMEOUT = int(os.environ.get('GRACEFUL_SHUTDOWN_TIMEOUT', '30'))
 
 def load_config():
@@ -1,11 +1,33 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional, Tuple, Any
+from domain.models import SourceInfo
 
 class VideoAnalyzer(ABC):
     @abstractmethod
     def extract_keyframes(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float]]:
         pass
 
+    def probe(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo]]:
+        """Keyframes and duration plus the source stream properties, when the analyzer reads them."""
+        keyframes, duration = self.extract_keyframes(video_url)
+        return keyframes, duration, None
+
+    def probe_with_offsets(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo], Optional[List[int]]]:
+        """Like ``probe``, plus each keyframe's byte offset (-1 where unknown) when the analyzer reads them."""
+        return (*self.probe(video_url), None)
+
+class KeyframeCache(ABC):
+    @abstractmethod
+    def get(self, cache_key: str) -> Optional[Tuple[List[float], float]]:
+        pass
+
+    @abstractmethod
+    def put(self, cache_key: str, keyframes: List[float], duration: float, source: Optional[SourceInfo] = None) -> None:
+        pass
+
+    def get_source(self, cache_key: str) -> Optional[SourceInfo]:
+        return None
+
 class TimestampSelector(ABC):
     @abstractmethod
     def select_optimal_timestamps(
@@ -21,6 +43,9 @@ class MessagePublisher(ABC):
     def publish(self, message: Any) -> bool:
         pass
 
+    def publish_batch(self, messages: List[Any]) -> bool:
+        return all(self.publish(message) for message in messages)
+
 class HealthMonitor(ABC):
     @abstractmethod
     def is_healthy(self) -> bool:
@@ -7,6 +7,59 @@ class VideoInfo:
     duration: float
     video_id: str
 
+@dataclass(frozen=True)
+class SourceInfo:
+    """Properties of the source video stream, read by the same probe as the keyframes.
+
+    Any field the container does not report is None.
+    """
+    width: Optional[int] = None
+    height: Optional[int] = None
+    codec: Optional[str] = None
+    bitrate: Optional[int] = None
+    fps: Optional[float] = None
+    profile: Optional[str] = None
+    level: Optional[int] = None
+
+    def to_payload(self) -> dict:
+        return {
+            "width": self.width,
+            "height": self.height,
+            "codec": self.codec,
+            "bitrate": self.bitrate,
+            "fps": self.fps,
+            "profile": self.profile,
+            "level": self.level
+        }
+
+@dataclass(frozen=True)
+class VideoAnalysis:
+    """Result of a single probe: keyframes, duration and the cut points derived from them."""
+    keyframes: List[float]
+    duration: float
+    cut_points: List[float]
+    source: Optional[SourceInfo] = None
+    # Byte offset of each keyframe (-1 where unknown); None when the probe did not read them
+    offsets: Optional[List[int]] = None
+
+    @property
+    def has_valid_cut_points(self) -> bool:
+        return len(self.cut_points) >= 2
+
+@dataclass(frozen=True)
+class UploadProgress:
+    """Idempotency record of one upload version (video_id + ETag).
+
+    ``total`` is 0 while pipelined publishing has not finished probing.
+    """
+    state: str = "new"
+    published: int = 0
+    total: int = 0
+
+    @property
+    def is_published(self) -> bool:
+        return self.state == "published"
+
 @dataclass(frozen=True)
 class SegmentMessage:
     message_id: int
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import logging
+import subprocess
+from typing import List, Optional, Tuple
+from domain.models import SourceInfo
+from infrastructure.video_analyzer import FFProbeVideoAnalyzer, PacketFFProbeVideoAnalyzer
+
+class AsyncFFProbeVideoAnalyzer(FFProbeVideoAnalyzer):
+    """Runs ffprobe through ``asyncio.create_subprocess_exec`` instead of a blocking thread.
+
+    A semaphore caps how many probes run at once, so one event loop can hold many
+    in-flight uploads without forking an ffprobe for each of them.
+    The synchronous ``extract_keyframes`` is still available for the threaded runtime.
+    """
+
+    def __init__(self, max_concurrent_probes: Optional[int] = None):
+        super().__init__()
+        self._probe_slots = asyncio.Semaphore(max_concurrent_probes or self.config.MAX_CONCURRENT_PROBES)
+
+    async def extract_keyframes_async(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float]]:
+        keyframes, duration, _ = await self.probe_async(video_url)
+        return keyframes, duration
+
+    async def probe_async(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo]]:
+        try:
+            async with self._probe_slots:
+                ffprobe_data = await self._run_ffprobe_async(video_url)
+
+            keyframes = self._extract_keyframe_timestamps(ffprobe_data)
+            duration = self._extract_duration(ffprobe_data)
+
+            if not keyframes:
+                keyframes = self._handle_no_keyframes(duration)
+                if not keyframes:
+                    return None, None, None
+
+            keyframes = self._ensure_starts_at_zero(keyframes)
+            keyframes = self._deduplicate_and_sort(keyframes)
+
+            return keyframes, duration, self._extract_source(ffprobe_data)
+
+        except Exception as e:
+            logging.error(f"Error analyzing video {video_url}: {e}")
+            return None, None, None
+
+    async def _run_ffprobe_async(self, video_url: str) -> dict:
+        command = self._ffprobe_command(video_url)
+
+        timeout_seconds = self.config.FFPROBE_TIMEOUT_SECONDS
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logging.error(f"FFProbe timeout ({timeout_seconds}s) for video: {video_url}")
+            raise subprocess.TimeoutExpired(command, timeout_seconds)
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        if process.returncode != 0:
+            stderr_text = stderr.decode('utf-8', errors='replace')
+            logging.error(f"FFProbe failed for video {video_url}: {stderr_text}")
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr_text)
+
+        return json.loads(stdout)
+
+
+class AsyncPacketFFProbeVideoAnalyzer(PacketFFProbeVideoAnalyzer, AsyncFFProbeVideoAnalyzer):
+    """Packet-flag keyframe detection (VIDEO_ANALYZER=packets) for the asyncio runtime."""
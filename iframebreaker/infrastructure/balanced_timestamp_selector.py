@@ -0,0 +1,184 @@
+import math
+from typing import List, Tuple
+import numpy as np
+from domain.interfaces import TimestampSelector
+from infrastructure.timestamp_selector import TwoPointerTimestampSelector
+
+# Blocks whose (keyframes × window) matrix has at most this many cells are relaxed in plain Python,
+# where NumPy call overhead would dominate
+SMALL_BLOCK = 64
+
+class BalancedTimestampSelector(TimestampSelector):
+    """Dynamic-programming cut points minimizing segment count plus duration variance.
+
+    Every segment costs ``1 + variance_weight * ((duration - target) / target) ** 2``
+    where ``target`` is the even split of the video into the fewest segments of at
+    most ``max_period``. For a fixed segment count the squared-deviation sum is the
+    duration variance times the count, so the optimum trades an extra segment
+    against evening out the rest.
+
+    Segments last between ``min_period`` and ``max_period``; a keyframe with no
+    successor in that window may jump to the first keyframe past it, as the greedy
+    selector does. Each keyframe only looks back over its window, so the cost is
+    O(n·w). Keyframes less than ``min_period`` apart cannot depend on each other and
+    are relaxed together with NumPy.
+    """
+
+    def __init__(self, variance_weight: float = 10.0):
+        self.variance_weight = variance_weight
+
+    def select_optimal_timestamps(
+        self,
+        keyframes: List[float],
+        min_period: float,
+        max_period: float
+    ) -> List[float]:
+        if len(keyframes) == 0:
+            return []
+
+        frames = np.unique(np.asarray(keyframes, dtype=np.float64))
+        if len(frames) == 1:
+            return frames.tolist()
+
+        if min_period <= 0 or max_period < min_period:
+            # Without a positive minimum keyframes can depend on their neighbours; keep the greedy cuts
+            return TwoPointerTimestampSelector().select_optimal_timestamps(frames.tolist(), min_period, max_period)
+
+        return self._select(frames, min_period, max_period)
+
+    def _select(self, frames: np.ndarray, min_period: float, max_period: float) -> List[float]:
+        n = len(frames)
+        span = float(frames[-1] - frames[0])
+        target = min(max(span / math.ceil(span / max_period), min_period), max_period)
+        scale = self.variance_weight / (target * target)
+
+        # Predecessors of keyframe j are lo[j] <= i < hi[j]
+        lo = self._first_within(frames, np.searchsorted(frames, frames - max_period, side='left'), max_period, strict=False)
+        hi = self._first_within(frames, np.searchsorted(frames, frames - min_period, side='right'), min_period, strict=True)
+        jump_to, jump_from = self._jumps(lo, hi)
+
+        cost = np.full(n, np.inf)
+        parent = np.full(n, -1, dtype=np.int64)
+        cost[0] = 0.0
+        values = frames.tolist()
+        cost_list = cost.tolist()
+        parent_list = parent.tolist()
+        lo_list, hi_list = lo.tolist(), hi.tolist()
+        # Keyframes closer than min_period to frames[start] only look back before it
+        block_ends = np.searchsorted(frames, frames + min_period, side='left').tolist()
+
+        start, synced, k = 1, 1, 0
+        while start < n:
+            end = max(block_ends[start], start + 1)
+            if (end - start) * (hi_list[end - 1] - lo_list[start]) <= SMALL_BLOCK:
+                for j in range(start, end):
+                    best, best_i = math.inf, -1
+                    value = values[j]
+                    for i in range(lo_list[j], hi_list[j]):
+                        deviation = value - values[i] - target
+                        candidate = cost_list[i] + 1.0 + scale * deviation * deviation
+                        if candidate < best:
+                            best, best_i = candidate, i
+                    cost_list[j], parent_list[j] = best, best_i
+            else:
+                # The matrix reads costs the Python loop produced
+                cost[synced:start] = cost_list[synced:start]
+                self._relax_block(frames, cost, parent, lo, hi, start, end, target, scale)
+                cost_list[start:end] = cost[start:end].tolist()
+                parent_list[start:end] = parent[start:end].tolist()
+                synced = end
+
+            while k < len(jump_to) and jump_to[k] < end:
+                i, j = jump_from[k], jump_to[k]
+                deviation = values[j] - values[i] - target
+                candidate = cost_list[i] + 1.0 + scale * deviation * deviation
+                if candidate < cost_list[j]:
+                    cost_list[j], parent_list[j] = candidate, i
+                    if synced > j:
+                        cost[j] = candidate
+                k += 1
+            start = end
+
+        return [values[i] for i in self._path(parent_list, self._last_cut(cost_list))]
+
+    @staticmethod
+    def _first_within(frames: np.ndarray, guess: np.ndarray, limit: float, strict: bool) -> np.ndarray:
+        """For each keyframe j, the first i with ``frames[j] - frames[i]`` below (``strict``) or at most ``limit``.
+
+        ``guess`` comes from searchsorted on ``frames - limit``, which can round differently
+        from the gap itself; it is nudged until it agrees with the gap the greedy selector compares.
+        """
+        within = np.less if strict else np.less_equal
+        first = np.minimum(guess, np.arange(len(frames)))
+        while True:
+            back = np.flatnonzero(first > 0)
+            back = back[within(frames[back] - frames[first[back] - 1], limit)]
+            if len(back) == 0:
+                break
+            first[back] -= 1
+        while True:
+            ahead = np.flatnonzero(~within(frames - frames[first], limit))
+            if len(ahead) == 0:
+                break
+            first[ahead] += 1
+        return first
+
+    @staticmethod
+    def _jumps(lo: np.ndarray, hi: np.ndarray) -> Tuple[List[int], List[int]]:
+        """Jumps from keyframes with an empty window to the first keyframe past it, ordered by target."""
+        n = len(lo)
+        has_successor = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(has_successor, lo[hi > lo], 1)
+        np.add.at(has_successor, hi[hi > lo], -1)
+        stranded = np.flatnonzero(np.cumsum(has_successor)[:n] == 0)
+        # lo is non-decreasing; the first j with lo[j] > i is the first keyframe more than max_period after i
+        targets = np.searchsorted(lo, stranded, side='right')
+        keep = targets < n
+        return targets[keep].tolist(), stranded[keep].tolist()
+
+    @staticmethod
+    def _relax_block(
+        frames: np.ndarray,
+        cost: np.ndarray,
+        parent: np.ndarray,
+        lo: np.ndarray,
+        hi: np.ndarray,
+        start: int,
+        end: int,
+        target: float,
+        scale: float
+    ) -> None:
+        """Relax keyframes ``start:end`` against their windows as one (block × window) matrix."""
+        block_lo = lo[start:end]
+        width = int((hi[start:end] - block_lo).max())
+        if width <= 0:
+            return
+        candidates = block_lo[:, None] + np.arange(width)
+        valid = candidates < hi[start:end, None]
+        candidates = np.where(valid, candidates, 0)
+
+        deviation = frames[start:end, None] - frames[candidates] - target
+        total = np.where(valid, cost[candidates] + 1.0 + scale * deviation * deviation, np.inf)
+        best = total.argmin(axis=1)
+        rows = np.arange(end - start)
+        cost[start:end] = total[rows, best]
+        parent[start:end] = np.where(np.isfinite(total[rows, best]), candidates[rows, best], -1)
+
+    @staticmethod
+    def _last_cut(cost: List[float]) -> int:
+        """The last keyframe if reachable; otherwise the latest reachable one, within min_period of it."""
+        last = len(cost) - 1
+        if math.isfinite(cost[last]):
+            return last
+        for i in range(last - 1, -1, -1):
+            if math.isfinite(cost[i]):
+                return i
+        return 0
+
+    @staticmethod
+    def _path(parent: List[int], last: int) -> List[int]:
+        path = [last]
+        while parent[path[-1]] >= 0:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
@@ -0,0 +1,347 @@
+import logging
+import re
+import struct
+import urllib.request
+from dataclasses import replace
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from domain.interfaces import VideoAnalyzer
+from domain.models import SourceInfo
+from config.config import load_config
+
+class UnsupportedContainer(Exception):
+    """The file is not a progressive MP4/MOV whose sample tables can be read directly."""
+
+class RangeReader:
+    """Reads byte ranges of a (presigned) URL, keeping the first chunk for box-header lookups."""
+
+    def __init__(self, url: str, timeout: float, head_bytes: int):
+        self.url = url
+        self.timeout = timeout
+        self.requests = 0
+        self.bytes_read = 0
+        self.size: Optional[int] = None
+        self._head = b''
+        self._head = self.read(0, head_bytes)
+
+    def read(self, offset: int, length: int) -> bytes:
+        if length <= 0:
+            return b''
+        if self.size is not None and offset < len(self._head) and offset + length <= len(self._head):
+            return self._head[offset:offset + length]
+
+        request = urllib.request.Request(self.url, headers={'Range': f'bytes={offset}-{offset + length - 1}'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status != 206:
+                # The server ignored the Range header; reading on would download the whole file
+                raise UnsupportedContainer(f"Range requests not honored (HTTP {response.status})")
+            total = re.search(r'/(\d+)$', response.headers.get('Content-Range', ''))
+            if total:
+                self.size = int(total.group(1))
+            data = response.read(length)
+
+        self.requests += 1
+        self.bytes_read += len(data)
+        return data
+
+class Mp4IndexVideoAnalyzer(VideoAnalyzer):
+    """Reads keyframe times from the ``moov`` sample tables with HTTP Range requests.
+
+    Only the top-level box headers and the ``moov`` box are downloaded, so the cost
+    does not grow with the size of ``mdat``. Keyframe PTS are derived from
+    ``stss``/``stts``/``ctts`` and the edit list the same way ffprobe reports them.
+    Other containers, fragmented MP4 and unreadable files go to ``fallback``.
+
+    The sample tables also give each keyframe's byte offset, which
+    ``probe_with_offsets`` returns alongside the keyframes.
+    """
+
+    def __init__(self, fallback: VideoAnalyzer):
+        self.config = load_config()
+        self.fallback = fallback
+
+    def extract_keyframes(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float]]:
+        index = self._try_index(video_url)
+        if index is None:
+            return self.fallback.extract_keyframes(video_url)
+        return index[0], index[1]
+
+    def probe(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo]]:
+        index = self._try_index(video_url)
+        if index is None:
+            return self.fallback.probe(video_url)
+        return index[:3]
+
+    def probe_with_offsets(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo], Optional[List[int]]]:
+        index = self._try_index(video_url)
+        if index is None:
+            return self.fallback.probe_with_offsets(video_url)
+        return index
+
+    def _try_index(self, video_url: str) -> Optional[Tuple[List[float], float, SourceInfo, Optional[List[int]]]]:
+        try:
+            keyframes, duration, source, offsets = self.read_index(video_url)
+        except UnsupportedContainer as e:
+            logging.info(f"MP4 index not usable ({e}), falling back to {type(self.fallback).__name__}")
+            return None
+        except Exception as e:
+            logging.warning(f"Failed to read MP4 index of {video_url}: {e}; falling back to {type(self.fallback).__name__}")
+            return None
+
+        by_time = dict(zip(reversed(keyframes), reversed(offsets))) if offsets is not None else None
+        if not keyframes or keyframes[0] > 0.0:
+            keyframes.insert(0, 0.0)
+        keyframes = sorted(set(keyframes))
+        offsets = [by_time.get(t, -1) for t in keyframes] if by_time is not None else None
+        return keyframes, duration, source, offsets
+
+    def read_index(self, video_url: str) -> Tuple[List[float], float, SourceInfo, Optional[List[int]]]:
+        """Keyframes, duration, source properties and keyframe byte offsets (None without chunk tables)."""
+        reader = RangeReader(video_url, self.config.MP4_INDEX_HTTP_TIMEOUT_SECONDS, self.config.MP4_INDEX_HEAD_BYTES)
+        moov = self._fetch_moov(reader)
+        keyframes, duration, source, offsets = self._parse_moov(moov)
+        logging.debug(f"Read MP4 index with {reader.requests} range requests ({reader.bytes_read} bytes)")
+        if source.bitrate is None and reader.size and duration:
+            # Container bitrate, which is also what ffprobe reports when the stream has none
+            source = replace(source, bitrate=int(reader.size * 8 / duration))
+        return keyframes, duration, source, offsets
+
+    def _fetch_moov(self, reader: RangeReader) -> bytes:
+        offset = 0
+        while reader.size is None or offset < reader.size:
+            header = reader.read(offset, 16)
+            if len(header) < 8:
+                break
+            box_size, box_type, header_size = self._box_header(header)
+            if box_size == 0 and reader.size is not None:
+                box_size = reader.size - offset
+
+            if offset == 0 and box_type not in (b'ftyp', b'wide', b'free', b'moov'):
+                raise UnsupportedContainer(f"not an ISO BMFF file (first box {box_type!r})")
+            if box_type == b'moof':
+                raise UnsupportedContainer("fragmented MP4")
+            if box_type == b'moov':
+                if box_size > self.config.MP4_INDEX_MAX_MOOV_BYTES:
+                    raise UnsupportedContainer(f"moov box of {box_size} bytes exceeds limit")
+                return reader.read(offset + header_size, box_size - header_size)
+            if box_size < header_size:
+                raise UnsupportedContainer(f"corrupt {box_type!r} box at offset {offset}")
+            offset += box_size
+
+        raise UnsupportedContainer("no moov box")
+
+    @staticmethod
+    def _box_header(data: bytes, offset: int = 0) -> Tuple[int, bytes, int]:
+        size, box_type = struct.unpack_from('>I4s', data, offset)
+        if size == 1:
+            return struct.unpack_from('>Q', data, offset + 8)[0], box_type, 16
+        return size, box_type, 8
+
+    def _children(self, data: bytes, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+        offset = start
+        while offset + 8 <= end:
+            size, box_type, header_size = self._box_header(data, offset)
+            if size == 0:
+                size = end - offset
+            if size < header_size or offset + size > end:
+                raise UnsupportedContainer(f"corrupt {box_type!r} box inside moov")
+            yield box_type, offset + header_size, offset + size
+            offset += size
+
+    def _child(self, data: bytes, start: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+        for child_type, child_start, child_end in self._children(data, start, end):
+            if child_type == box_type:
+                return child_start, child_end
+        return None
+
+    def _parse_moov(self, moov: bytes) -> Tuple[List[float], float, SourceInfo, Optional[List[int]]]:
+        boxes = {box_type: (start, end) for box_type, start, end in self._children(moov, 0, len(moov)) if box_type != b'trak'}
+        if b'mvex' in boxes:
+            raise UnsupportedContainer("fragmented MP4")
+        if b'mvhd' not in boxes:
+            raise UnsupportedContainer("moov without mvhd")
+        movie_timescale, movie_duration = self._timescale_and_duration(moov, boxes[b'mvhd'][0])
+
+        for box_type, start, end in self._children(moov, 0, len(moov)):
+            if box_type == b'trak':
+                track = self._video_track(moov, start, end)
+                if track:
+                    keyframes, track_duration, sync = self._keyframe_times(moov, track, movie_timescale)
+                    duration = movie_duration / movie_timescale if movie_timescale and movie_duration else track_duration
+                    offsets = self._sample_offsets(moov, track, sync)
+                    return keyframes, duration, self._source(moov, track, track_duration), offsets
+
+        raise UnsupportedContainer("no video track")
+
+    def _video_track(self, data: bytes, start: int, end: int) -> Optional[Dict[bytes, Tuple[int, int]]]:
+        mdia = self._child(data, start, end, b'mdia')
+        if not mdia:
+            return None
+        hdlr = self._child(data, *mdia, b'hdlr')
+        if not hdlr or data[hdlr[0] + 8:hdlr[0] + 12] != b'vide':
+            return None
+
+        minf = self._child(data, *mdia, b'minf')
+        stbl = self._child(data, *minf, b'stbl') if minf else None
+        if not stbl:
+            raise UnsupportedContainer("video track without sample table")
+
+        track = {box_type: (s, e) for box_type, s, e in self._children(data, *stbl)}
+        track[b'mdhd'] = self._child(data, *mdia, b'mdhd')
+        edts = self._child(data, start, end, b'edts')
+        elst = self._child(data, *edts, b'elst') if edts else None
+        if elst:
+            track[b'elst'] = elst
+        return track
+
+    @staticmethod
+    def _timescale_and_duration(data: bytes, start: int) -> Tuple[int, int]:
+        """mvhd and mdhd share this layout: version, flags, two timestamps, timescale, duration."""
+        if data[start] == 1:
+            return struct.unpack_from('>IQ', data, start + 20)
+        return struct.unpack_from('>II', data, start + 12)
+
+    def _keyframe_times(self, data: bytes, track: Dict[bytes, Tuple[int, int]], movie_timescale: int) -> Tuple[List[float], float, np.ndarray]:
+        """Keyframe PTS in seconds, the track duration and the keyframes' sample numbers (0-based)."""
+        if not track.get(b'mdhd') or b'stts' not in track:
+            raise UnsupportedContainer("video track without mdhd/stts")
+        timescale, media_duration = self._timescale_and_duration(data, track[b'mdhd'][0])
+        if not timescale:
+            raise UnsupportedContainer("video track with zero timescale")
+
+        sample_count = self._sample_count(data, track)
+        if sample_count == 0:
+            raise UnsupportedContainer("video track without samples")
+
+        dts = self._decode_times(data, track[b'stts'][0], sample_count)
+        pts = dts + self._composition_offsets(data, track.get(b'ctts'), len(dts))
+        pts += self._edit_shift(data, track.get(b'elst'), timescale, movie_timescale)
+
+        sync = np.arange(len(pts))
+        if b'stss' in track:
+            start = track[b'stss'][0]
+            count = struct.unpack_from('>I', data, start + 4)[0]
+            sync = np.frombuffer(data, dtype='>u4', count=count, offset=start + 8).astype(np.int64) - 1
+            sync = sync[(sync >= 0) & (sync < len(pts))]
+
+        times = np.round(pts[sync] / timescale, 6)
+        return times.tolist(), media_duration / timescale, sync
+
+    @staticmethod
+    def _sample_offsets(data: bytes, track: Dict[bytes, Tuple[int, int]], samples: np.ndarray) -> Optional[List[int]]:
+        """File offsets of ``samples`` from ``stsz``, ``stsc`` and ``stco``/``co64``; None if a table is missing."""
+        chunks = track.get(b'stco') or track.get(b'co64')
+        if b'stsz' not in track or b'stsc' not in track or not chunks:
+            return None
+
+        start = track[b'stsz'][0]
+        sample_size, sample_count = struct.unpack_from('>II', data, start + 4)
+        if sample_size:
+            sizes = np.full(sample_count, sample_size, dtype=np.int64)
+        else:
+            sizes = np.frombuffer(data, dtype='>u4', count=sample_count, offset=start + 12).astype(np.int64)
+
+        chunk_count = struct.unpack_from('>I', data, chunks[0] + 4)[0]
+        dtype = '>u4' if b'stco' in track else '>u8'
+        chunk_offsets = np.frombuffer(data, dtype=dtype, count=chunk_count, offset=chunks[0] + 8).astype(np.int64)
+
+        # stsc runs: (first chunk, samples per chunk, sample description), each lasting until the next run
+        start = track[b'stsc'][0]
+        count = struct.unpack_from('>I', data, start + 4)[0]
+        runs = np.frombuffer(data, dtype='>u4', count=count * 3, offset=start + 8).reshape(-1, 3).astype(np.int64)
+        run_lengths = np.diff(np.append(runs[:, 0] - 1, chunk_count))
+        per_chunk = np.repeat(runs[:, 1], np.maximum(run_lengths, 0))
+        if len(per_chunk) != chunk_count or per_chunk.sum() < sample_count:
+            return None
+
+        first_sample = np.zeros(chunk_count, dtype=np.int64)
+        np.cumsum(per_chunk[:-1], out=first_sample[1:])
+        bytes_before = np.zeros(sample_count, dtype=np.int64)
+        np.cumsum(sizes[:-1], out=bytes_before[1:])
+
+        chunk = np.searchsorted(first_sample, samples, side='right') - 1
+        return (chunk_offsets[chunk] + bytes_before[samples] - bytes_before[first_sample[chunk]]).tolist()
+
+    # Sample entry types of the codecs we see, named as ffprobe's codec_name
+    CODEC_NAMES = {b'avc1': 'h264', b'avc3': 'h264', b'hvc1': 'hevc', b'hev1': 'hevc',
+                   b'av01': 'av1', b'vp09': 'vp9', b'mp4v': 'mpeg4'}
+    # AVCProfileIndication values, named as ffprobe's profile
+    AVC_PROFILES = {66: 'Baseline', 77: 'Main', 88: 'Extended', 100: 'High', 110: 'High 10',
+                    122: 'High 4:2:2', 244: 'High 4:4:4 Predictive'}
+
+    def _source(self, data: bytes, track: Dict[bytes, Tuple[int, int]], track_duration: float) -> SourceInfo:
+        """Coded size and codec from the first visual sample entry in ``stsd``, frame rate from the sample count."""
+        fps = self._sample_count(data, track) / track_duration if track_duration else 0
+        fps = round(fps, 3) if fps > 0 else None
+        stsd = track.get(b'stsd')
+        # Full box header and entry count, then the entry's box header and 24 bytes before width/height
+        if not stsd or stsd[1] - stsd[0] < 44 or struct.unpack_from('>I', data, stsd[0] + 4)[0] == 0:
+            return SourceInfo(fps=fps)
+        entry = stsd[0] + 8
+        entry_type = data[entry + 4:entry + 8]
+        width, height = struct.unpack_from('>HH', data, entry + 32)
+        codec = self.CODEC_NAMES.get(entry_type, entry_type.decode('ascii', errors='replace').strip())
+        profile, level = self._avc_profile_level(data, entry, stsd[1]) if codec == 'h264' else (None, None)
+        return SourceInfo(width=width or None, height=height or None, codec=codec, fps=fps, profile=profile, level=level)
+
+    def _avc_profile_level(self, data: bytes, entry: int, stsd_end: int) -> Tuple[Optional[str], Optional[int]]:
+        """Profile and level from the ``avcC`` box after the 78-byte visual sample entry fields."""
+        entry_end = min(entry + struct.unpack_from('>I', data, entry)[0], stsd_end)
+        avcc = self._child(data, entry + 86, entry_end, b'avcC')
+        if not avcc or avcc[1] - avcc[0] < 4:
+            return None, None
+        profile_idc, constraints, level = struct.unpack_from('>BBB', data, avcc[0] + 1)
+        profile = self.AVC_PROFILES.get(profile_idc)
+        if profile_idc == 66 and constraints & 0x40:
+            profile = 'Constrained Baseline'
+        return profile, level
+
+    @staticmethod
+    def _sample_count(data: bytes, track: Dict[bytes, Tuple[int, int]]) -> int:
+        if b'stsz' in track:
+            return struct.unpack_from('>I', data, track[b'stsz'][0] + 8)[0]
+        if b'stz2' in track:
+            return struct.unpack_from('>I', data, track[b'stz2'][0] + 8)[0]
+        raise UnsupportedContainer("video track without sample sizes")
+
+    @staticmethod
+    def _decode_times(data: bytes, start: int, sample_count: int) -> np.ndarray:
+        count = struct.unpack_from('>I', data, start + 4)[0]
+        entries = np.frombuffer(data, dtype='>u4', count=count * 2, offset=start + 8).reshape(-1, 2).astype(np.int64)
+        deltas = np.repeat(entries[:, 1], entries[:, 0])[:sample_count]
+        dts = np.zeros(len(deltas), dtype=np.int64)
+        np.cumsum(deltas[:-1], out=dts[1:])
+        return dts
+
+    @staticmethod
+    def _composition_offsets(data: bytes, ctts: Optional[Tuple[int, int]], sample_count: int) -> np.ndarray:
+        offsets = np.zeros(sample_count, dtype=np.int64)
+        if not ctts:
+            return offsets
+        start = ctts[0]
+        count = struct.unpack_from('>I', data, start + 4)[0]
+        # Version 0 offsets are unsigned on paper, but writers emit negative ones; ffmpeg reads both as signed
+        entries = np.frombuffer(data, dtype='>i4', count=count * 2, offset=start + 8).reshape(-1, 2).astype(np.int64)
+        expanded = np.repeat(entries[:, 1], np.maximum(entries[:, 0], 0))[:sample_count]
+        offsets[:len(expanded)] = expanded
+        return offsets
+
+    @staticmethod
+    def _edit_shift(data: bytes, elst: Optional[Tuple[int, int]], timescale: int, movie_timescale: int) -> int:
+        """Offset in media timescale: leading empty edits delay the track, media_time trims its start."""
+        if not elst:
+            return 0
+        start = elst[0]
+        version = data[start]
+        count = struct.unpack_from('>I', data, start + 4)[0]
+        entry_format, entry_size = ('>Qq', 20) if version == 1 else ('>Ii', 12)
+
+        empty_duration = 0
+        for i in range(count):
+            segment_duration, media_time = struct.unpack_from(entry_format, data, start + 8 + i * entry_size)
+            if media_time == -1:
+                empty_duration += segment_duration
+                continue
+            delay = empty_duration * timescale // movie_timescale if movie_timescale else 0
+            return delay - media_time
+        return 0
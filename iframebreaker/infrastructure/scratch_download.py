@@ -0,0 +1,135 @@
+import logging
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+from domain.interfaces import VideoAnalyzer
+from domain.models import SourceInfo
+from config.config import load_config
+
+class DiskBudget:
+    """Process-wide byte budget for scratch files, shared by all worker threads."""
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.reserved_bytes = 0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, size: int) -> bool:
+        with self._lock:
+            if self.reserved_bytes + size > self.limit_bytes:
+                return False
+            self.reserved_bytes += size
+            return True
+
+    def release(self, size: int) -> None:
+        with self._lock:
+            self.reserved_bytes = max(self.reserved_bytes - size, 0)
+
+class ParallelRangeDownloader:
+    """Downloads a URL into a memory-mapped file with concurrent ``Range`` GETs."""
+
+    def __init__(self, workers: int, chunk_bytes: int, timeout: float):
+        self.workers = max(1, workers)
+        self.chunk_bytes = chunk_bytes
+        self.timeout = timeout
+
+    def content_length(self, url: str) -> Optional[int]:
+        """Object size from a one-byte ranged GET; presigned GET URLs do not allow HEAD."""
+        request = urllib.request.Request(url, headers={'Range': 'bytes=0-0'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status != 206:
+                return None
+            total = re.search(r'/(\d+)$', response.headers.get('Content-Range', ''))
+            return int(total.group(1)) if total else None
+
+    def download(self, url: str, path: str, size: int) -> None:
+        with open(path, 'w+b') as f:
+            f.truncate(size)
+            with mmap.mmap(f.fileno(), size) as mapped:
+                ranges = [(start, min(start + self.chunk_bytes, size)) for start in range(0, size, self.chunk_bytes)]
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    # list() re-raises the first failed range
+                    list(executor.map(lambda r: self._fetch_range(url, mapped, *r), ranges))
+                mapped.flush()
+
+    def _fetch_range(self, url: str, mapped: mmap.mmap, start: int, end: int) -> None:
+        request = urllib.request.Request(url, headers={'Range': f'bytes={start}-{end - 1}'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status != 206:
+                raise IOError(f"Range request answered with HTTP {response.status}")
+            view = memoryview(mapped)[start:end]
+            try:
+                received = 0
+                while received < end - start:
+                    n = response.readinto(view[received:])
+                    if not n:
+                        raise IOError(f"Short read for bytes {start}-{end - 1}: got {received}")
+                    received += n
+            finally:
+                view.release()
+
+class ScratchDownloadVideoAnalyzer(VideoAnalyzer):
+    """Copies large objects to local scratch space before probing them (PROBE_INPUT=scratch).
+
+    ffprobe seeks a lot; over HTTP every seek is a new request through the ingress.
+    Objects of at least SCRATCH_MIN_SIZE_BYTES are fetched with parallel ranged GETs,
+    probed from disk and deleted. Smaller objects, or any that do not fit the
+    SCRATCH_DISK_BUDGET_BYTES budget or the free space, are probed over HTTP as before.
+    """
+
+    def __init__(self, inner: VideoAnalyzer, budget: Optional[DiskBudget] = None):
+        self.config = load_config()
+        self.inner = inner
+        self.budget = budget or DiskBudget(self.config.SCRATCH_DISK_BUDGET_BYTES)
+        self.downloader = ParallelRangeDownloader(
+            self.config.SCRATCH_DOWNLOAD_WORKERS,
+            self.config.SCRATCH_CHUNK_BYTES,
+            self.config.SCRATCH_HTTP_TIMEOUT_SECONDS
+        )
+
+    def extract_keyframes(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float]]:
+        return self._analyze(self.inner.extract_keyframes, video_url)
+
+    def probe(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo]]:
+        return self._analyze(self.inner.probe, video_url)
+
+    def _analyze(self, analyze: Callable[[str], tuple], video_url: str) -> tuple:
+        """Run one of the inner analyzer's methods on a local copy when that is worthwhile."""
+        try:
+            size = self.downloader.content_length(video_url)
+        except Exception as e:
+            logging.warning(f"Could not size {video_url} for scratch download: {e}")
+            size = None
+
+        if size is None or size < self.config.SCRATCH_MIN_SIZE_BYTES:
+            return analyze(video_url)
+        if not self._has_free_space(size) or not self.budget.try_reserve(size):
+            logging.info(f"Scratch budget exhausted, probing {size} bytes over HTTP")
+            return analyze(video_url)
+
+        path = None
+        try:
+            try:
+                fd, path = tempfile.mkstemp(prefix='iframebreaker-', dir=self.config.SCRATCH_DIR)
+                os.close(fd)
+                self.downloader.download(video_url, path, size)
+            except Exception as e:
+                logging.warning(f"Scratch download failed ({e}), probing over HTTP")
+                return analyze(video_url)
+            return analyze(path)
+        finally:
+            if path is not None:
+                os.unlink(path)
+            self.budget.release(size)
+
+    def _has_free_space(self, size: int) -> bool:
+        try:
+            return shutil.disk_usage(self.config.SCRATCH_DIR or tempfile.gettempdir()).free > size
+        except OSError:
+            return False
@@ -1,4 +1,5 @@
-from typing import List, NamedTuple, Optional
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from domain.interfaces import TimestampSelector
 
 class TimestampCandidate(NamedTuple):
@@ -25,6 +26,56 @@ class OptimalTimestampSelector(TimestampSelector):
     def _prepare_keyframes(self, keyframes: List[float]) -> List[float]:
         return sorted(set(keyframes))
 
+    def iter_optimal_timestamps(
+        self,
+        keyframes: Iterable[float],
+        min_period: float,
+        max_period: float
+    ) -> Iterator[float]:
+        """Yield cut points from an increasing keyframe stream as soon as each one is final.
+
+        A selection is final once a keyframe beyond ``last_selected + max_period`` has
+        been seen, so the result equals ``select_optimal_timestamps`` on the same frames.
+        Keyframes that do not increase (duplicates, reordering) are dropped.
+        """
+        frames: List[float] = []
+        start = 0
+        last_selected: Optional[float] = None
+        last_frame: Optional[float] = None
+
+        for ts in keyframes:
+            if last_frame is not None and ts <= last_frame:
+                continue
+            last_frame = ts
+
+            if last_selected is None:
+                last_selected = ts
+                yield ts
+                continue
+
+            frames.append(ts)
+            while start < len(frames) and frames[-1] - last_selected > max_period:
+                last_selected, start = self._next_selection(
+                    frames, start, last_selected, min_period, max_period
+                )
+                yield last_selected
+
+            if start > 1024:
+                del frames[:start]
+                start = 0
+
+        if last_selected is None:
+            return
+
+        while start < len(frames):
+            last_selected, start = self._next_selection(
+                frames, start, last_selected, min_period, max_period
+            )
+            yield last_selected
+
+        if last_frame != last_selected and last_frame - last_selected >= min_period:
+            yield last_frame
+
     def _select_using_greedy_approach(
         self, 
         sorted_frames: List[float], 
@@ -36,32 +87,39 @@ class OptimalTimestampSelector(TimestampSelector):
         
         i = 1
         while i < len(sorted_frames):
-            candidates = self._find_candidates_in_window(
+            last_selected, i = self._next_selection(
                 sorted_frames, i, last_selected, min_period, max_period
             )
-            
-            if candidates:
-                best = self._select_best_candidate(candidates)
-                selected.append(best.timestamp)
-                last_selected = best.timestamp
-                i = best.index + 1
-            else:
-                next_timestamp = self._handle_no_candidates(
-                    sorted_frames, i, last_selected, min_period, max_period
-                )
-                if next_timestamp:
-                    selected.append(next_timestamp.timestamp)
-                    last_selected = next_timestamp.timestamp
-                    i = next_timestamp.index + 1 if next_timestamp.index >= 0 else i
-                else:
-                    synthetic = last_selected + max_period
-                    selected.append(synthetic)
-                    last_selected = synthetic
-                    i += 1
+            selected.append(last_selected)
 
         self._add_final_timestamp_if_needed(selected, sorted_frames, min_period)
         return selected
 
+    def _next_selection(
+        self,
+        frames: List[float],
+        i: int,
+        last_selected: float,
+        min_period: float,
+        max_period: float
+    ) -> Tuple[float, int]:
+        """Pick the next cut point after ``last_selected`` and return it with the next scan index."""
+        candidates = self._find_candidates_in_window(
+            frames, i, last_selected, min_period, max_period
+        )
+        
+        if candidates:
+            best = self._select_best_candidate(candidates)
+            return best.timestamp, best.index + 1
+
+        next_timestamp = self._handle_no_candidates(
+            frames, i, last_selected, min_period, max_period
+        )
+        if next_timestamp:
+            return next_timestamp.timestamp, next_timestamp.index + 1 if next_timestamp.index >= 0 else i
+
+        return last_selected + max_period, i + 1
+
     def _find_candidates_in_window(
         self, 
         frames: List[float], 
@@ -117,4 +175,54 @@ class OptimalTimestampSelector(TimestampSelector):
         last_frame = sorted_frames[-1]
         if (last_frame != selected[-1] and 
             last_frame - selected[-1] >= min_period):
-            selected.append(last_frame)
\ No newline at end of file
+            selected.append(last_frame)
+
+class TwoPointerTimestampSelector(OptimalTimestampSelector):
+    """Same selections as OptimalTimestampSelector in linear time.
+
+    The last selected timestamp never decreases, so the first frame at or beyond
+    ``min_period`` and the first frame beyond ``max_period`` only move forward and
+    every keyframe is visited a constant number of times.
+    """
+
+    def _prepare_keyframes(self, keyframes: List[float]) -> List[float]:
+        if all(a < b for a, b in zip(keyframes, islice(keyframes, 1, None))):
+            return list(keyframes)
+        return sorted(set(keyframes))
+
+    def _select_using_greedy_approach(
+        self,
+        sorted_frames: List[float],
+        min_period: float,
+        max_period: float
+    ) -> List[float]:
+        if min_period < 0 or max_period < 0:
+            return super()._select_using_greedy_approach(sorted_frames, min_period, max_period)
+
+        frames = sorted_frames
+        n = len(frames)
+        selected = [frames[0]]
+        last_selected = frames[0]
+        i = lo = hi = 1
+
+        while i < n:
+            lo = max(lo, i)
+            while lo < n and frames[lo] - last_selected < min_period:
+                lo += 1
+            hi = max(hi, i)
+            while hi < n and frames[hi] - last_selected <= max_period:
+                hi += 1
+
+            if lo < hi:
+                last_selected = frames[hi - 1]
+                i = hi
+            elif hi < n and frames[hi] - last_selected >= min_period:
+                last_selected = frames[hi]
+                i = hi + 1
+            else:
+                last_selected = last_selected + max_period
+                i += 1
+            selected.append(last_selected)
+
+        self._add_final_timestamp_if_needed(selected, frames, min_period)
+        return selected
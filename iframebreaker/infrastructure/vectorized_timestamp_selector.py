@@ -0,0 +1,84 @@
+from typing import List
+import numpy as np
+from domain.interfaces import TimestampSelector
+from infrastructure.timestamp_selector import OptimalTimestampSelector
+
+class NumpyTimestampSelector(TimestampSelector):
+    """OptimalTimestampSelector semantics with NumPy sorting and ``searchsorted`` window lookups.
+
+    ``searchsorted`` finds each window bound in O(log n); the bound is then nudged
+    with the exact ``frame - last_selected`` comparison the reference selector uses,
+    so float rounding cannot make the two implementations disagree.
+    """
+
+    def select_optimal_timestamps(
+        self,
+        keyframes: List[float],
+        min_period: float,
+        max_period: float
+    ) -> List[float]:
+        if len(keyframes) == 0:
+            return []
+
+        frames = np.unique(np.asarray(keyframes, dtype=np.float64))
+        values = frames.tolist()
+        if len(values) == 1:
+            return values
+
+        if min_period < 0 or max_period < 0:
+            return OptimalTimestampSelector()._select_using_greedy_approach(values, min_period, max_period)
+
+        return self._select(frames, values, min_period, max_period)
+
+    def _select(
+        self,
+        frames: np.ndarray,
+        values: List[float],
+        min_period: float,
+        max_period: float
+    ) -> List[float]:
+        n = len(values)
+        selected = [values[0]]
+        last_selected = values[0]
+        i = 1
+
+        while i < n:
+            lo = self._first_gap_at_least(frames, values, i, last_selected, min_period)
+            hi = self._first_gap_above(frames, values, i, last_selected, max_period)
+
+            if lo < hi:
+                last_selected = values[hi - 1]
+                i = hi
+            elif hi < n and values[hi] - last_selected >= min_period:
+                last_selected = values[hi]
+                i = hi + 1
+            else:
+                last_selected = last_selected + max_period
+                i += 1
+            selected.append(last_selected)
+
+        if values[-1] != selected[-1] and values[-1] - selected[-1] >= min_period:
+            selected.append(values[-1])
+        return selected
+
+    @staticmethod
+    def _first_gap_at_least(frames: np.ndarray, values: List[float], start: int, last: float, period: float) -> int:
+        """First index >= start with ``values[k] - last >= period``."""
+        n = len(values)
+        k = max(int(np.searchsorted(frames, last + period, side='left')), start)
+        while k > start and values[k - 1] - last >= period:
+            k -= 1
+        while k < n and values[k] - last < period:
+            k += 1
+        return k
+
+    @staticmethod
+    def _first_gap_above(frames: np.ndarray, values: List[float], start: int, last: float, period: float) -> int:
+        """First index >= start with ``values[k] - last > period``."""
+        n = len(values)
+        k = max(int(np.searchsorted(frames, last + period, side='right')), start)
+        while k > start and values[k - 1] - last > period:
+            k -= 1
+        while k < n and values[k] - last <= period:
+            k += 1
+        return k
@@ -1,17 +1,63 @@
 import subprocess
 import json
 import logging
-from typing import List, Optional, Tuple
+import os
+import tempfile
+import threading
+from array import array
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from domain.interfaces import VideoAnalyzer
+from domain.models import SourceInfo
 from config.config import load_config
 
+# Bytes of ffprobe's stderr kept for the failure log; damaged inputs can print far more
+STDERR_TAIL_BYTES = 64 * 1024
+
+# Read alongside the keyframes; stream and format sections cost nothing extra to print
+SOURCE_ENTRIES = "stream=codec_name,profile,level,width,height,bit_rate,avg_frame_rate"
+
+def _int_or_none(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _frame_rate(value) -> Optional[float]:
+    """Parse an ffprobe rational such as ``30000/1001``; ``0/0`` means unknown."""
+    numerator, _, denominator = str(value or "").partition("/")
+    try:
+        rate = float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return round(rate, 3) if rate > 0 else None
+
+def source_info(stream: Dict[str, str], fmt: Dict[str, str]) -> Optional[SourceInfo]:
+    """Build SourceInfo from ffprobe's video stream section, falling back to the container bitrate."""
+    if not stream:
+        return None
+    level = _int_or_none(stream.get("level"))
+    return SourceInfo(
+        width=_int_or_none(stream.get("width")),
+        height=_int_or_none(stream.get("height")),
+        codec=stream.get("codec_name") or None,
+        bitrate=_int_or_none(stream.get("bit_rate")) or _int_or_none(fmt.get("bit_rate")),
+        fps=_frame_rate(stream.get("avg_frame_rate")),
+        profile=stream.get("profile") or None,
+        # ffprobe reports -99 when the codec has no level
+        level=level if level is not None and level >= 0 else None
+    )
+
 class FFProbeVideoAnalyzer(VideoAnalyzer):
     
     def __init__(self):
         self.config = load_config()
     
     def extract_keyframes(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float]]:
-        
+        keyframes, duration, _ = self.probe(video_url)
+        return keyframes, duration
+
+    def probe(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo]]:
         try:
             ffprobe_data = self._run_ffprobe(video_url)
             keyframes = self._extract_keyframe_timestamps(ffprobe_data)
@@ -20,27 +66,30 @@ class FFProbeVideoAnalyzer(VideoAnalyzer):
             if not keyframes:
                 keyframes = self._handle_no_keyframes(duration)
                 if not keyframes:
-                    return None, None
+                    return None, None, None
             
             keyframes = self._ensure_starts_at_zero(keyframes)
             keyframes = self._deduplicate_and_sort(keyframes)
             
-            return keyframes, duration
+            return keyframes, duration, self._extract_source(ffprobe_data)
             
         except Exception as e:
             logging.error(f"Error analyzing video {video_url}: {e}")
-            return None, None
+            return None, None, None
 
-    def _run_ffprobe(self, video_url: str) -> dict:
-        command = [
+    def _ffprobe_command(self, video_url: str) -> List[str]:
+        return [
             "ffprobe",
             "-v", "error",
             "-select_streams", "v:0",
             "-skip_frame", "nokey",
-            "-show_entries", "frame=pts_time:format=duration",
+            "-show_entries", f"frame=pts_time:{SOURCE_ENTRIES}:format=duration,bit_rate",
             "-of", "json",
             video_url
         ]
+
+    def _run_ffprobe(self, video_url: str) -> dict:
+        command = self._ffprobe_command(video_url)
         
         timeout_seconds = self.config.FFPROBE_TIMEOUT_SECONDS
         
@@ -64,6 +113,10 @@ class FFProbeVideoAnalyzer(VideoAnalyzer):
             return float(duration_str)
         return None
 
+    def _extract_source(self, data: dict) -> Optional[SourceInfo]:
+        streams = data.get("streams") or [{}]
+        return source_info(streams[0], data.get("format", {}))
+
     def _handle_no_keyframes(self, duration: Optional[float]) -> Optional[List[float]]:
         if duration:
             logging.warning("No keyframes found, using start timestamp")
@@ -76,4 +129,219 @@ class FFProbeVideoAnalyzer(VideoAnalyzer):
         return keyframes
 
     def _deduplicate_and_sort(self, keyframes: List[float]) -> List[float]:
-        return sorted(list(set(keyframes)))
\ No newline at end of file
+        return sorted(list(set(keyframes)))
+
+
+class PacketFFProbeVideoAnalyzer(FFProbeVideoAnalyzer):
+    """Finds keyframes from packet flags instead of decoding them.
+
+    ``-skip_frame nokey`` still decodes every keyframe, which dominates probe time for
+    4K HEVC. ``-show_packets`` only demuxes; packets flagged ``K`` are keyframes.
+    Packets arrive in decode order, which ``_deduplicate_and_sort`` takes care of.
+    """
+
+    def _ffprobe_command(self, video_url: str) -> List[str]:
+        return [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", f"packet=pts_time,flags:{SOURCE_ENTRIES}:format=duration,bit_rate",
+            "-of", "json",
+            video_url
+        ]
+
+    def _extract_keyframe_timestamps(self, data: dict) -> List[float]:
+        keyframes = []
+        for packet in data.get("packets", []):
+            pts_time = packet.get("pts_time")
+            if "K" in packet.get("flags", "") and pts_time not in (None, "N/A"):
+                keyframes.append(float(pts_time))
+        return keyframes
+
+
+class KeyframeStream:
+    """Iterates keyframe timestamps from a running ffprobe process as they are emitted.
+
+    Parsed timestamps are kept in a compact ``array('d')``; the container duration
+    and the source properties are only known once the stream has been fully consumed.
+    ffprobe's stderr goes to ``stderr_file`` rather than a pipe nobody reads while
+    stdout is consumed, so a flood of decode errors cannot block the process.
+    """
+
+    def __init__(self, process: subprocess.Popen, video_url: str, timeout_seconds: int, stderr_file=None):
+        self.keyframes = array('d')
+        self.duration: Optional[float] = None
+        self._stream_fields: Dict[str, str] = {}
+        self._format_fields: Dict[str, str] = {}
+        self._process = process
+        self._stderr_file = stderr_file
+        self._video_url = video_url
+        self._timeout_seconds = timeout_seconds
+        self._timed_out = False
+        self._timer = threading.Timer(timeout_seconds, self._on_timeout)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def __iter__(self) -> Iterator[float]:
+        try:
+            for line in self._process.stdout:
+                section, value = self._parse_line(line)
+                if section == "stream":
+                    self._stream_fields = self._fields(line)
+                elif section == "format":
+                    self._format_fields = self._fields(line)
+                if value is None:
+                    continue
+                if section == "frame":
+                    self.keyframes.append(value)
+                    yield value
+                elif section == "format":
+                    self.duration = value
+            self._wait()
+        finally:
+            self.close()
+
+    @property
+    def source(self) -> Optional[SourceInfo]:
+        return source_info(self._stream_fields, self._format_fields)
+
+    def __enter__(self) -> "KeyframeStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._timer.cancel()
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        if self._stderr_file is not None:
+            self._stderr_file.close()
+
+    @staticmethod
+    def _fields(line: str) -> Dict[str, str]:
+        """All ``name=value`` fields of a ``-of compact`` line."""
+        fields = line.strip().split("|")[1:]
+        return dict(field.partition("=")[::2] for field in fields)
+
+    @staticmethod
+    def _parse_line(line: str) -> Tuple[Optional[str], Optional[float]]:
+        """Parse a ``-of compact`` line such as ``frame|pts_time=1.001000``."""
+        section, _, fields = line.strip().partition("|")
+        for field in fields.split("|"):
+            name, _, raw = field.partition("=")
+            if name in ("pts_time", "duration"):
+                try:
+                    return section, float(raw)
+                except ValueError:
+                    return section, None
+        return section, None
+
+    def _on_timeout(self) -> None:
+        self._timed_out = True
+        self._process.kill()
+
+    def _wait(self) -> None:
+        returncode = self._process.wait()
+        if self._timed_out:
+            logging.error(f"FFProbe timeout ({self._timeout_seconds}s) for video: {self._video_url}")
+            raise subprocess.TimeoutExpired(self._process.args, self._timeout_seconds)
+        if returncode != 0:
+            stderr = self._stderr_tail()
+            logging.error(f"FFProbe failed for video {self._video_url}: {stderr}")
+            raise subprocess.CalledProcessError(returncode, self._process.args, stderr=stderr)
+
+    def _stderr_tail(self) -> Optional[str]:
+        if self._stderr_file is None:
+            return self._process.stderr.read() if self._process.stderr else None
+        size = self._stderr_file.seek(0, os.SEEK_END)
+        self._stderr_file.seek(max(size - STDERR_TAIL_BYTES, 0))
+        return self._stderr_file.read().decode('utf-8', errors='replace')
+
+
+class StreamingFFProbeVideoAnalyzer(FFProbeVideoAnalyzer):
+    """Reads ffprobe output line by line instead of buffering one JSON document.
+
+    Memory stays proportional to the number of keyframes (8 bytes each) and callers
+    can consume keyframes through ``stream_keyframes`` while the probe is running.
+    """
+
+    def probe(self, video_url: str) -> Tuple[Optional[Sequence[float]], Optional[float], Optional[SourceInfo]]:
+        try:
+            stream = self.stream_keyframes(video_url)
+            for _ in stream:
+                pass
+
+            keyframes = stream.keyframes
+            if not keyframes:
+                keyframes = self._handle_no_keyframes(stream.duration)
+                if not keyframes:
+                    return None, None, None
+                keyframes = array('d', keyframes)
+
+            keyframes = self._ensure_starts_at_zero(keyframes)
+            keyframes = self._deduplicate_and_sort(keyframes)
+
+            return keyframes, stream.duration, stream.source
+
+        except Exception as e:
+            logging.error(f"Error analyzing video {video_url}: {e}")
+            return None, None, None
+
+    def stream_keyframes(self, video_url: str) -> KeyframeStream:
+        command = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-skip_frame", "nokey",
+            "-show_entries", f"frame=pts_time:{SOURCE_ENTRIES}:format=duration,bit_rate",
+            "-of", "compact",
+            video_url
+        ]
+        stderr_file = tempfile.TemporaryFile()
+        try:
+            process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=stderr_file, text=True, bufsize=1
+            )
+        except Exception:
+            stderr_file.close()
+            raise
+        return KeyframeStream(process, video_url, self.config.FFPROBE_TIMEOUT_SECONDS, stderr_file)
+
+    def probe_duration(self, video_url: str) -> Optional[float]:
+        """Read only the container duration, which ffprobe prints after all frames in streaming mode."""
+        return self.probe_header(video_url)[0]
+
+    def probe_header(self, video_url: str) -> Tuple[Optional[float], Optional[SourceInfo]]:
+        """Read the container duration and source properties from the headers, without walking the frames."""
+        command = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", f"{SOURCE_ENTRIES}:format=duration,bit_rate",
+            "-of", "compact",
+            video_url
+        ]
+        try:
+            process = subprocess.run(
+                command, capture_output=True, text=True, check=True,
+                timeout=self.config.FFPROBE_TIMEOUT_SECONDS
+            )
+            duration, stream_fields, format_fields = None, {}, {}
+            for line in process.stdout.splitlines():
+                section, value = KeyframeStream._parse_line(line)
+                if section == "stream":
+                    stream_fields = KeyframeStream._fields(line)
+                elif section == "format":
+                    format_fields = KeyframeStream._fields(line)
+                    duration = value
+            return duration, source_info(stream_fields, format_fields)
+        except Exception as e:
+            logging.error(f"Error reading duration of video {video_url}: {e}")
+            return None, None
+
+    def _deduplicate_and_sort(self, keyframes: array) -> array:
+        if all(a < b for a, b in zip(keyframes, islice(keyframes, 1, None))):
+            return keyframes
+        return array('d', sorted(set(keyframes)))
@@ -9,7 +9,10 @@ from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from config.config import load_config
 from storage.minio_client import MinioClient
+from storage.redis_client import RedisClient
 from messaging.rabbitmq_client import RabbitMQClient
+from messaging.status_outbox import StatusOutbox
+from messaging.worker_pool import ScheduledWorkerPool, ThreadLocalRabbitMQClient, WorkerPool
 from services.video_service import VideoService
 from services.message_handler import MessageHandler
 
@@ -80,10 +83,11 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
         self.wfile.write(json.dumps(data).encode())
 
 class HealthChecker:
-    def __init__(self, rabbitmq_client, minio_client, config):
+    def __init__(self, rabbitmq_client, minio_client, config, status_outbox=None):
         self.rabbitmq_client = rabbitmq_client
         self.minio_client = minio_client
         self.config = config
+        self.status_outbox = status_outbox
     
     def get_health_status(self):
         checks = {
@@ -98,7 +102,9 @@ class HealthChecker:
             'circuit_breaker': {
                 'state': self.rabbitmq_client.circuit_state.value,
                 'failures': self.rabbitmq_client.failure_count
-            }
+            },
+            'presigned_url_cache': self.minio_client.cache_stats(),
+            'status_outbox': self.status_outbox.stats() if self.status_outbox else None
         }
     
     def is_ready(self):
@@ -141,20 +147,60 @@ def start_health_check_server(health_checker, port=8080):
     logging.info(f"Health check server started on port {port}")
     return server, thread
 
+def warn_unsupported_settings(config) -> None:
+    if not config.PIPELINED_PUBLISHING:
+        return
+    # Both need every cut point before the first message goes out
+    if config.BATCH_STRATEGY == 'balanced':
+        logging.warning("BATCH_STRATEGY=balanced is not supported with PIPELINED_PUBLISHING; batching by MESSAGE_SPAN_SECONDS")
+    if config.PASSTHROUGH:
+        logging.warning("PASSTHROUGH is not supported with PIPELINED_PUBLISHING; every rendition is re-encoded")
+
 def main():
     config = load_config()
+    if config.RUNTIME == 'asyncio':
+        from async_main import run
+        run(config)
+        return
+
+    warn_unsupported_settings(config)
+
     minio_client = MinioClient(config)
     rabbitmq_client = RabbitMQClient(config)
-    video_service = VideoService(config)
-    message_handler = MessageHandler(config, minio_client, rabbitmq_client, video_service)
+    redis_client = RedisClient(config) if config.PIPELINED_PUBLISHING or config.IDEMPOTENT_UPLOADS else None
+    keyframe_cache = None
+    if config.KEYFRAME_CACHE:
+        from storage.keyframe_cache import RedisKeyframeCache
+        keyframe_cache = RedisKeyframeCache(config)
+    video_service = VideoService(config, keyframe_cache)
+    # Workers publish on their own connections; the consuming connection stays on its thread.
+    # Those sit unserviced during probes, so one idle past a heartbeat is reopened before use
+    publisher = ThreadLocalRabbitMQClient(lambda: RabbitMQClient(config), config.RABBITMQ_HEARTBEAT)
+    status_outbox = None
+    if config.STATUS_OUTBOX:
+        status_outbox = StatusOutbox(RabbitMQClient(config), config.STATUS_OUTBOX_MAX_PENDING,
+                                     config.STATUS_OUTBOX_BATCH_SIZE, config.STATUS_OUTBOX_FLUSH_INTERVAL_SECONDS)
+        status_outbox.start()
+    message_handler = MessageHandler(config, minio_client, publisher, video_service, redis_client, status_outbox)
+    if config.SCHEDULER == 'fair':
+        from services.cost_estimator import UploadCostEstimator
+        estimator = UploadCostEstimator(config, minio_client, keyframe_cache)
+        worker_pool = ScheduledWorkerPool(message_handler.process_video_message, config.WORKER_THREADS,
+                                          estimator.estimate, config.SCHEDULER_AGING_SECONDS)
+    else:
+        worker_pool = WorkerPool(message_handler.process_video_message, config.WORKER_THREADS)
     
-    health_checker = HealthChecker(rabbitmq_client, minio_client, config)
+    health_checker = HealthChecker(rabbitmq_client, minio_client, config, status_outbox)
     health_server, health_thread = start_health_check_server(health_checker, config.HEALTH_CHECK_PORT)
 
     def signal_handler(signum, frame):
         logging.info(f"Received signal {signum}, shutting down...")
         try:
             rabbitmq_client.close()
+            worker_pool.shutdown(wait=False)
+            publisher.close()
+            if status_outbox:
+                status_outbox.close()
         except Exception as e:
             logging.error(f"Shutting down error: {e}")
         sys.exit(0)
@@ -165,7 +211,8 @@ def main():
     def rabbitmq_consumer_worker():
         try:
             rabbitmq_client.connect()
-            rabbitmq_client.consume(message_handler.process_video_message)
+            logging.info(f"Consuming with {config.WORKER_THREADS} worker threads, prefetch {config.RABBITMQ_PREFETCH_COUNT}")
+            rabbitmq_client.consume(worker_pool.dispatch)
         except Exception as e:
             logging.error(f"RabbitMQ consumer error: {e}")
             rabbitmq_client.close()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+import aio_pika
+from pamqp.commands import Basic
+from aio_pika.abc import AbstractChannel, AbstractExchange, AbstractIncomingMessage, AbstractQueue, AbstractRobustConnection
+
+class AsyncRabbitMQClient:
+    """aio_pika counterpart of RabbitMQClient for the asyncio runtime.
+
+    ``connect_robust`` restores the connection, channel and consumer after a broker
+    outage; publishes are retried with ``asyncio.sleep`` backoff instead of blocking
+    the consumer thread.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.max_retries = config.RABBITMQ_MAX_RETRIES
+        self.connection: Optional[AbstractRobustConnection] = None
+        self.channel: Optional[AbstractChannel] = None
+        self.segment_exchange: Optional[AbstractExchange] = None
+        self.status_exchange: Optional[AbstractExchange] = None
+        self.playlist_exchange: Optional[AbstractExchange] = None
+        self.queue: Optional[AbstractQueue] = None
+
+    async def connect(self) -> None:
+        """Open a robust connection and look up the exchanges iframebreaker publishes to."""
+        self.connection = await aio_pika.connect_robust(
+            host=self.config.RABBITMQ_HOST,
+            port=self.config.RABBITMQ_PORT,
+            virtualhost=self.config.RABBITMQ_VHOST,
+            login=self.config.RABBITMQ_USER,
+            password=self.config.RABBITMQ_PASSWORD,
+            heartbeat=self.config.RABBITMQ_HEARTBEAT,
+            reconnect_interval=self.config.RABBITMQ_RETRY_DELAY
+        )
+        self.channel = await self.connection.channel()
+        await self.channel.set_qos(prefetch_count=self.config.RABBITMQ_PREFETCH_COUNT)
+
+        self.segment_exchange = await self.channel.get_exchange(self.config.RABBITMQ_PUBLISH_EXCHANGE)
+        self.status_exchange = await self.channel.get_exchange("video")
+        self.playlist_exchange = await self.channel.get_exchange(self.config.RABBITMQ_PLAYLIST_EXCHANGE)
+        logging.info(f"Connected to RabbitMQ at {self.config.RABBITMQ_HOST}:{self.config.RABBITMQ_PORT}")
+
+    async def consume(self, callback: Callable[[AbstractIncomingMessage], Awaitable[None]]) -> None:
+        """Start delivering upload events to ``callback``; returns once the consumer is registered."""
+        if not self.channel:
+            raise RuntimeError("RabbitMQ channel not available")
+        self.queue = await self.channel.declare_queue(self.config.RABBITMQ_CONSUME_QUEUE, durable=True)
+        await self.queue.consume(callback)
+        logging.info(f"Waiting for messages on queue '{self.config.RABBITMQ_CONSUME_QUEUE}'")
+
+    async def publish_segment(self, segment_payload, priority: Optional[int] = None) -> bool:
+        """Publish a segment message with retry logic."""
+        return await self._publish(
+            self.segment_exchange, self.config.RABBITMQ_PUBLISH_ROUTING_KEY, segment_payload, "segment", priority
+        )
+
+    async def publish_segments(self, segment_payloads: List[dict], priority: Optional[int] = None) -> bool:
+        """Publish all segment messages of a video concurrently; the channel runs in confirm mode.
+
+        Each ``publish`` resolves when the broker confirms it, so the batch costs one
+        round trip and only the failed publishes are retried.
+        """
+        if not self.segment_exchange:
+            raise RuntimeError("RabbitMQ exchange not available")
+
+        pending = list(segment_payloads)
+        for attempt in range(self.max_retries):
+            results = await asyncio.gather(
+                *(self.segment_exchange.publish(self._message(payload, priority), routing_key=self.config.RABBITMQ_PUBLISH_ROUTING_KEY,
+                                                timeout=self.config.RABBITMQ_CONFIRM_TIMEOUT_SECONDS)
+                  for payload in pending),
+                return_exceptions=True
+            )
+            failed = [payload for payload, result in zip(pending, results) if isinstance(result, (BaseException, Basic.Nack))]
+            if not failed:
+                return True
+
+            logging.error(f"{len(failed)} of {len(pending)} segments unconfirmed (attempt {attempt + 1})")
+            pending = failed
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(min(2 ** attempt, 10))
+        return False
+
+    async def publish_status(self, video_id: str, status: str, service: str = "iframebreaker", metadata: dict = None, error: str = None) -> bool:
+        """Publish a status update message with retry logic."""
+        status_payload = {
+            "video_id": video_id,
+            "status": status,
+            "service": service,
+            "timestamp": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "metadata": metadata or {},
+            "error": error
+        }
+        if await self._publish(self.status_exchange, "video.status", status_payload, "status"):
+            logging.info(f"Published status update: video_id={video_id}, status={status}")
+            return True
+        return False
+
+    async def publish_playlist_ready(self, video_id: str, resolution: str) -> bool:
+        """Announce a fully transcoded resolution to the playlist service."""
+        payload = {"video_id": video_id, "resolution": resolution}
+        return await self._publish(
+            self.playlist_exchange, self.config.RABBITMQ_PLAYLIST_ROUTING_KEY, payload, "playlist notification"
+        )
+
+    async def _publish(self, exchange: Optional[AbstractExchange], routing_key: str, payload: dict, kind: str, priority: Optional[int] = None) -> bool:
+        if not exchange:
+            raise RuntimeError("RabbitMQ exchange not available")
+
+        message = self._message(payload, priority)
+        for attempt in range(self.max_retries):
+            try:
+                await exchange.publish(message, routing_key=routing_key)
+                return True
+            except Exception as err:
+                logging.error(f"Failed to publish {kind} (attempt {attempt + 1}): {err}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(min(2 ** attempt, 10))
+        return False
+
+    @staticmethod
+    def _message(payload: dict, priority: Optional[int] = None) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=json.dumps(payload).encode('utf-8'),
+            content_type='application/json',
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            priority=priority
+        )
+
+    def check_health(self) -> bool:
+        if not self.connection:
+            return False
+        return not self.connection.is_closed
+
+    async def close(self) -> None:
+        if self.connection and not self.connection.is_closed:
+            await self.connection.close()
+            logging.info("RabbitMQ connection closed")
+        self.connection = None
+        self.channel = None
@@ -0,0 +1,48 @@
+import json
+import logging
+from typing import List, Optional, Sequence
+import pika
+from pika.exceptions import NackError, UnroutableError
+
+class ConfirmChannel:
+    """Publisher-confirm channel for batches of messages, on pika's public BlockingChannel API.
+
+    ``confirm_delivery`` makes every ``basic_publish`` wait for the broker's ack, and
+    ``mandatory`` turns a message no queue is bound for into an ``UnroutableError``
+    instead of an ack. Nacked and returned messages are reported by index so only
+    those are sent again. A broker that stops answering is detected by the
+    connection heartbeat, which closes the connection and raises out of the publish.
+    """
+
+    def __init__(self, connection: pika.BlockingConnection):
+        self.connection = connection
+        self._channel = connection.channel()
+        self._channel.confirm_delivery()
+
+    @property
+    def is_open(self) -> bool:
+        return self._channel.is_open and self.connection.is_open
+
+    def publish_batch(self, exchange: str, routing_key: str, payloads: Sequence[dict], priority: Optional[int] = None) -> List[int]:
+        """Publish every payload with confirms; returns the indices the broker nacked or returned."""
+        unconfirmed = []
+        for index, payload in enumerate(payloads):
+            try:
+                self._channel.basic_publish(
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    body=json.dumps(payload),
+                    properties=pika.BasicProperties(delivery_mode=2, priority=priority),
+                    mandatory=True
+                )
+            except UnroutableError:
+                logging.warning(f"Message {index} to '{exchange}' with routing key '{routing_key}' was unroutable")
+                unconfirmed.append(index)
+            except NackError:
+                logging.warning(f"Message {index} to '{exchange}' was nacked by the broker")
+                unconfirmed.append(index)
+        return unconfirmed
+
+    def close(self) -> None:
+        if self._channel.is_open:
+            self._channel.close()
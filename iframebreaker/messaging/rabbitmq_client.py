@@ -4,7 +4,8 @@ import logging
 import time
 import threading
 from enum import Enum
-from typing import Optional, Callable, Any
+from typing import List, Optional, Callable, Any
+from messaging.confirm_channel import ConfirmChannel
 
 class CircuitState(Enum):
     CLOSED = "closed"
@@ -26,6 +27,7 @@ class RabbitMQClient:
         )
         self.connection = None
         self.channel = None
+        self._confirm_channel: Optional[ConfirmChannel] = None
         self.max_retries = config.RABBITMQ_MAX_RETRIES
         self.retry_delay = config.RABBITMQ_RETRY_DELAY
         self.circuit_state = CircuitState.CLOSED
@@ -77,7 +79,7 @@ class RabbitMQClient:
                 
                 self.connection = pika.BlockingConnection(self.parameters)
                 self.channel = self.connection.channel()
-                self.channel.basic_qos(prefetch_count=1)
+                self.channel.basic_qos(prefetch_count=self.config.RABBITMQ_PREFETCH_COUNT)
                 self._record_success()
                 logging.info("Successfully connected to RabbitMQ")
                 return True
@@ -117,7 +119,7 @@ class RabbitMQClient:
             routing_key=self.config.RABBITMQ_PUBLISH_ROUTING_KEY
         )
 
-    def publish_segment(self, segment_payload) -> bool:
+    def publish_segment(self, segment_payload, priority: Optional[int] = None) -> bool:
         """Publish a segment message to RabbitMQ with retry logic."""
         for attempt in range(self.max_retries):
             if not self._ensure_connection():
@@ -128,7 +130,7 @@ class RabbitMQClient:
                     exchange=self.config.RABBITMQ_PUBLISH_EXCHANGE,
                     routing_key=self.config.RABBITMQ_PUBLISH_ROUTING_KEY,
                     body=json.dumps(segment_payload),
-                    properties=pika.BasicProperties(delivery_mode=2)
+                    properties=pika.BasicProperties(delivery_mode=2, priority=priority)
                 )
                 self._record_success()
                 return True
@@ -144,11 +146,52 @@ class RabbitMQClient:
                     
         return False
 
-    def publish_status(self, video_id: str, status: str, service: str = "iframebreaker", metadata: dict = None, error: str = None) -> bool:
-        """Publish a status update message to RabbitMQ with retry logic."""
+    def publish_segments(self, segment_payloads: List[dict], priority: Optional[int] = None) -> bool:
+        """Publish all segment messages of a video with publisher confirms.
+
+        The whole batch is pipelined and confirmed in one wait; only messages the
+        broker nacked or never confirmed are sent again on the next attempt.
+        ``priority`` is the AMQP message priority (queues need ``x-max-priority``).
+        """
+        pending = list(segment_payloads)
+        for attempt in range(self.max_retries):
+            if not self._ensure_connection():
+                return False
+
+            try:
+                if self._confirm_channel is None or self._confirm_channel.connection is not self.connection or not self._confirm_channel.is_open:
+                    self._confirm_channel = ConfirmChannel(self.connection)
+
+                unconfirmed = self._confirm_channel.publish_batch(
+                    self.config.RABBITMQ_PUBLISH_EXCHANGE,
+                    self.config.RABBITMQ_PUBLISH_ROUTING_KEY,
+                    pending,
+                    priority
+                )
+                if not unconfirmed:
+                    self._record_success()
+                    return True
+
+                logging.error(f"{len(unconfirmed)} of {len(pending)} segments unconfirmed (attempt {attempt + 1})")
+                pending = [pending[i] for i in unconfirmed]
+
+            except Exception as err:
+                logging.error(f"Failed to publish segment batch (attempt {attempt + 1}): {err}")
+                self._record_failure()
+                self.connection = None
+                self.channel = None
+                self._confirm_channel = None
+
+            if attempt < self.max_retries - 1:
+                time.sleep(min(2 ** attempt, 10))
+
+        return False
+
+    @staticmethod
+    def status_payload(video_id: str, status: str, service: str = "iframebreaker", metadata: dict = None, error: str = None) -> dict:
         from datetime import datetime
-        
-        status_payload = {
+
+        return {
             "video_id": video_id,
             "status": status,
             "service": service,
@@ -156,6 +199,10 @@ class RabbitMQClient:
             "metadata": metadata or {},
             "error": error
         }
+
+    def publish_status(self, video_id: str, status: str, service: str = "iframebreaker", metadata: dict = None, error: str = None) -> bool:
+        """Publish a status update message to RabbitMQ with retry logic."""
+        status_payload = self.status_payload(video_id, status, service, metadata, error)
         
         for attempt in range(self.max_retries):
             if not self._ensure_connection():
@@ -183,6 +230,84 @@ class RabbitMQClient:
                     
         return False
 
+    def publish_statuses(self, status_payloads: List[dict]) -> List[dict]:
+        """Publish status payloads with publisher confirms in a single attempt.
+
+        Returns the payloads that were not confirmed; the caller decides when to retry,
+        so this never sleeps between attempts.
+        """
+        if not self._ensure_connection():
+            return list(status_payloads)
+
+        try:
+            if self._confirm_channel is None or self._confirm_channel.connection is not self.connection or not self._confirm_channel.is_open:
+                self._confirm_channel = ConfirmChannel(self.connection)
+
+            unconfirmed = self._confirm_channel.publish_batch("video", "video.status", status_payloads)
+            if not unconfirmed:
+                self._record_success()
+            return [status_payloads[i] for i in unconfirmed]
+
+        except Exception as err:
+            logging.error(f"Failed to publish {len(status_payloads)} status updates: {err}")
+            self._record_failure()
+            self.connection = None
+            self.channel = None
+            self._confirm_channel = None
+            return list(status_payloads)
+
+    def keepalive(self) -> None:
+        """Service heartbeats on an idle connection owned by a background thread."""
+        try:
+            if self.connection and self.connection.is_open:
+                self.connection.process_data_events(time_limit=0)
+        except Exception as err:
+            logging.warning(f"RabbitMQ keepalive failed: {err}")
+            self.connection = None
+            self.channel = None
+            self._confirm_channel = None
+
+    def disconnect(self) -> None:
+        """Drop the connection without counting a failure; the next publish reconnects."""
+        try:
+            if self.connection and self.connection.is_open:
+                self.connection.close()
+        except Exception as err:
+            logging.debug(f"Closing idle RabbitMQ connection failed: {err}")
+        self.connection = None
+        self.channel = None
+        self._confirm_channel = None
+
+    def publish_playlist_ready(self, video_id: str, resolution: str) -> bool:
+        """Announce a fully transcoded resolution to the playlist service, as transcode.sh does."""
+        payload = {"video_id": video_id, "resolution": resolution}
+
+        for attempt in range(self.max_retries):
+            if not self._ensure_connection():
+                return False
+
+            try:
+                self.channel.basic_publish(
+                    exchange=self.config.RABBITMQ_PLAYLIST_EXCHANGE,
+                    routing_key=self.config.RABBITMQ_PLAYLIST_ROUTING_KEY,
+                    body=json.dumps(payload),
+                    properties=pika.BasicProperties(delivery_mode=2)
+                )
+                self._record_success()
+                logging.info(f"Published playlist notification: video_id={video_id}, resolution={resolution}")
+                return True
+
+            except Exception as err:
+                logging.error(f"Failed to publish playlist notification (attempt {attempt + 1}): {err}")
+                self._record_failure()
+                self.connection = None
+                self.channel = None
+
+                if attempt < self.max_retries - 1:
+                    time.sleep(min(2 ** attempt, 10))
+
+        return False
+
     def consume(self, callback):
         """Start consuming messages from the queue with automatic reconnection."""
         while True:
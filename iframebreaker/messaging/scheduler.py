@@ -0,0 +1,62 @@
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+@dataclass
+class _Pending:
+    cost: float
+    seq: int
+    enqueued_at: float
+    item: Any
+
+class FairScheduler:
+    """Orders prefetched uploads: least-served user first, then that user's cheapest upload.
+
+    Every pop charges the upload's estimated cost to its user. A user who becomes
+    active starts level with the least-served active user, so idle time is not
+    banked. Within a user, cost is discounted by waiting time (halved after
+    ``aging_seconds``) so large uploads are not starved by a stream of small ones.
+    """
+
+    def __init__(self, aging_seconds: float):
+        self._aging_seconds = aging_seconds
+        self._pending: Dict[str, List[_Pending]] = {}
+        self._served: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, user: str, cost: float, item: Any) -> None:
+        with self._lock:
+            if user not in self._pending:
+                self._served[user] = min(self._served.values(), default=0.0)
+                self._pending[user] = []
+            self._pending[user].append(_Pending(cost, next(self._seq), time.monotonic(), item))
+
+    def pop(self) -> Any:
+        """Remove and return the next item; raises IndexError when nothing is pending."""
+        with self._lock:
+            if not self._pending:
+                raise IndexError("pop from an empty scheduler")
+
+            user = min(self._pending, key=lambda u: (self._served[u], min(p.seq for p in self._pending[u])))
+            jobs = self._pending[user]
+            now = time.monotonic()
+            best = min(jobs, key=lambda p: (self._aged_cost(p, now), p.seq))
+            jobs.remove(best)
+            self._served[user] += best.cost
+
+            if not jobs:
+                del self._pending[user]
+                del self._served[user]
+            return best.item
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(jobs) for jobs in self._pending.values())
+
+    def _aged_cost(self, pending: _Pending, now: float) -> float:
+        if self._aging_seconds <= 0:
+            return pending.cost
+        return pending.cost * self._aging_seconds / (self._aging_seconds + now - pending.enqueued_at)
@@ -0,0 +1,112 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from messaging.rabbitmq_client import RabbitMQClient
+
+class StatusOutbox:
+    """Non-blocking ``publish_status`` for the analysis path.
+
+    Status events go into a bounded in-memory outbox and a background thread
+    publishes them in confirmed batches on its own connection. Only the latest
+    pending status of a video is kept, since a newer one supersedes it. When
+    the outbox is full the oldest event is dropped. Unconfirmed events are
+    retried with backoff unless a newer status for the same video arrived.
+    """
+
+    def __init__(self, publisher: RabbitMQClient, max_pending: int, batch_size: int, flush_interval: float):
+        self._publisher = publisher
+        self._max_pending = max(1, max_pending)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._pending: "OrderedDict[str, dict]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='status-outbox', daemon=True)
+        self._thread.start()
+
+    def publish_status(self, video_id: str, status: str, service: str = "iframebreaker", metadata: dict = None, error: str = None) -> bool:
+        """Queue a status update and return at once; same signature as RabbitMQClient.publish_status."""
+        payload = RabbitMQClient.status_payload(video_id, status, service, metadata, error)
+        with self._cond:
+            if video_id in self._pending:
+                del self._pending[video_id]
+                self.coalesced += 1
+            elif len(self._pending) >= self._max_pending:
+                dropped_id, dropped = self._pending.popitem(last=False)
+                self.dropped += 1
+                logging.warning(f"Status outbox full, dropped {dropped['status']} for {dropped_id}")
+            self._pending[video_id] = payload
+            self._cond.notify()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'published': self.published,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the publisher thread after one last flush attempt."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+        self._publisher.close()
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            with self._cond:
+                if not self._pending and not self._stopping:
+                    self._cond.wait(self._flush_interval)
+                stopping = self._stopping
+                batch = self._take_batch()
+
+            if not batch:
+                if stopping:
+                    return
+                self._publisher.keepalive()
+                continue
+
+            unconfirmed = self._publisher.publish_statuses(batch)
+            with self._cond:
+                self.published += len(batch) - len(unconfirmed)
+                self._requeue(unconfirmed)
+
+            if not unconfirmed:
+                failures = 0
+            elif stopping:
+                logging.error(f"Discarding {len(unconfirmed)} unpublished status updates on shutdown")
+                return
+            else:
+                failures += 1
+                with self._cond:
+                    self._cond.wait_for(lambda: self._stopping, timeout=min(2 ** (failures - 1), 10))
+
+    def _take_batch(self) -> List[dict]:
+        batch = []
+        while self._pending and len(batch) < self._batch_size:
+            batch.append(self._pending.popitem(last=False)[1])
+        return batch
+
+    def _requeue(self, payloads: List[dict]) -> None:
+        """Put unconfirmed events back at the front unless a newer status replaced them."""
+        for payload in reversed(payloads):
+            if payload['video_id'] in self._pending:
+                continue
+            if len(self._pending) >= self._max_pending:
+                self.dropped += 1
+                continue
+            self._pending[payload['video_id']] = payload
+            self._pending.move_to_end(payload['video_id'], last=False)
@@ -0,0 +1,129 @@
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from messaging.scheduler import FairScheduler
+
+class ThreadSafeChannel:
+    """Channel stand-in handed to worker threads.
+
+    pika's BlockingConnection is not thread-safe, so acks and nacks are queued with
+    ``add_callback_threadsafe`` and executed by the connection thread inside
+    ``start_consuming``.
+    """
+
+    def __init__(self, channel):
+        self._channel = channel
+        self._connection = channel.connection
+
+    def basic_ack(self, delivery_tag: int = 0, multiple: bool = False):
+        self._schedule('basic_ack', delivery_tag=delivery_tag, multiple=multiple)
+
+    def basic_nack(self, delivery_tag: int = 0, multiple: bool = False, requeue: bool = True):
+        self._schedule('basic_nack', delivery_tag=delivery_tag, multiple=multiple, requeue=requeue)
+
+    def _schedule(self, name: str, **kwargs):
+        try:
+            self._connection.add_callback_threadsafe(functools.partial(self._apply, name, kwargs))
+        except Exception as e:
+            # The connection is gone; the broker redelivers every unacked message anyway
+            logging.warning(f"Could not schedule {name} for delivery {kwargs.get('delivery_tag')}: {e}")
+
+    def _apply(self, name: str, kwargs):
+        if not self._channel.is_open:
+            logging.warning(f"Channel closed before {name} for delivery {kwargs.get('delivery_tag')}")
+            return
+        getattr(self._channel, name)(**kwargs)
+
+class WorkerPool:
+    """Runs message callbacks on a thread pool so several uploads are analyzed at once.
+
+    The prefetch count bounds how many deliveries are in flight, so the executor
+    queue never holds more than ``prefetch - max_workers`` waiting messages.
+    """
+
+    def __init__(self, callback: Callable, max_workers: int):
+        self._callback = callback
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='iframebreaker-worker')
+
+    def dispatch(self, ch, method, properties, body):
+        """``on_message_callback`` for ``basic_consume``; returns immediately."""
+        self._executor.submit(self._run, ThreadSafeChannel(ch), method, properties, body)
+
+    def _run(self, ch, method, properties, body):
+        try:
+            self._callback(ch, method, properties, body)
+        except Exception as e:
+            logging.error(f"Unhandled error in worker for delivery {method.delivery_tag}: {e}")
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+class ScheduledWorkerPool(WorkerPool):
+    """WorkerPool that runs prefetched deliveries in FairScheduler order instead of FIFO.
+
+    ``estimate(body) -> (user, cost)`` runs on the consumer thread. Each submitted
+    task runs whichever pending delivery the scheduler picks when a worker frees up,
+    so reordering only spans the ``prefetch - max_workers`` deliveries that wait.
+    """
+
+    def __init__(self, callback: Callable, max_workers: int, estimate: Callable[[bytes], Tuple[str, float]], aging_seconds: float):
+        super().__init__(callback, max_workers)
+        self._estimate = estimate
+        self._scheduler = FairScheduler(aging_seconds)
+
+    def dispatch(self, ch, method, properties, body):
+        try:
+            user, cost = self._estimate(body)
+        except Exception as e:
+            logging.warning(f"Could not estimate cost of delivery {method.delivery_tag}: {e}")
+            user, cost = "", 0.0
+        self._scheduler.push(user, cost, (ThreadSafeChannel(ch), method, properties, body))
+        self._executor.submit(self._run_next)
+
+    def _run_next(self):
+        self._run(*self._scheduler.pop())
+
+class ThreadLocalRabbitMQClient:
+    """Gives every worker thread its own publisher connection, created on first use.
+
+    Nothing services a worker's connection while it probes a video, so the broker
+    drops it after a few missed heartbeats. A connection idle for ``max_idle_seconds``
+    (the heartbeat) is closed before its next use and reopened by the publish itself,
+    instead of failing into the retry and circuit-breaker path. 0 keeps connections.
+    """
+
+    def __init__(self, factory: Callable, max_idle_seconds: float = 0):
+        self._factory = factory
+        self._max_idle_seconds = max_idle_seconds
+        self._local = threading.local()
+        self._clients: List = []
+        self._lock = threading.Lock()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        now = time.monotonic()
+        if client is None:
+            client = self._factory()
+            self._local.client = client
+            with self._lock:
+                self._clients.append(client)
+        elif self._max_idle_seconds > 0 and now - self._local.last_used >= self._max_idle_seconds:
+            client.disconnect()
+        self._local.last_used = now
+        return client
+
+    def __getattr__(self, name):
+        return getattr(self._client(), name)
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logging.error(f"Failed to close publisher connection: {e}")
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from aio_pika.abc import AbstractIncomingMessage
+from config.config import Config
+from storage.keyframe_index import is_sidecar
+from storage.minio_client import MinioClient
+from storage.redis_client import RedisClient
+from messaging.async_rabbitmq_client import AsyncRabbitMQClient
+from infrastructure.async_video_analyzer import AsyncFFProbeVideoAnalyzer
+from services.message_handler import MessageHandler
+from services.video_service import VideoService
+
+class AsyncMessageHandler(MessageHandler):
+    """Handles upload events on the event loop.
+
+    ffprobe runs as an asyncio subprocess; the MinIO presign calls and cut-point
+    selection are pushed to the default executor so they never block the loop.
+    """
+
+    def __init__(self, config: Config, minio_client: MinioClient, rabbitmq_client: AsyncRabbitMQClient, video_service: VideoService, video_analyzer: AsyncFFProbeVideoAnalyzer, redis_client: Optional[RedisClient] = None):
+        super().__init__(config, minio_client, rabbitmq_client, video_service, redis_client)
+        self.video_analyzer = video_analyzer
+
+    async def handle_message(self, message: AbstractIncomingMessage) -> None:
+        """Process an incoming upload event; always settles the message exactly once."""
+        video_id = None
+        lease_held = False
+        try:
+            bucket, key, etag = self._parse_upload_event(message.body)
+
+            if not bucket or not key:
+                logging.error("No bucket or key in message")
+                await message.nack(requeue=False)
+                return
+
+            if is_sidecar(key):
+                # Our own keyframe index landing in the watched bucket
+                await message.ack()
+                return
+
+            video_id = self.video_service.extract_video_id(key)
+
+            progress = await asyncio.to_thread(self._claim_upload, video_id, etag, message.redelivered)
+            if progress is None:
+                await message.ack()
+                return
+            lease_held = self._idempotent(etag)
+
+            if not await self.rabbitmq_client.publish_status(video_id, "processing", metadata={"bucket": bucket, "key": key}):
+                logging.warning(f"Failed to publish processing status for {video_id}")
+
+            presigned_url, key = await asyncio.to_thread(self._resolve_presigned_url, bucket, key)
+            if not presigned_url:
+                error_msg = f"Failed to generate presigned URL for {bucket}/{key} (tried both original and sanitized)"
+                logging.error(error_msg)
+                await self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+                await message.nack(requeue=False)
+                return
+
+            logging.info(f"Processing New Upload: {key}")
+
+            cache_key = self.video_service.analysis_cache_key(bucket, key, etag)
+            cached = await asyncio.to_thread(self.video_service.cached_probe, cache_key)
+            if cached is not None:
+                keyframes, duration, source = cached
+            else:
+                keyframes, duration, source = await self.video_analyzer.probe_async(presigned_url)
+                await asyncio.to_thread(self.video_service.store_video_info, cache_key, keyframes, duration, source)
+            analysis = await asyncio.to_thread(self.video_service.build_analysis, keyframes, duration, source)
+            if analysis is None:
+                error_msg = f"Failed to get video info for {key}"
+                logging.error(error_msg)
+                await self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+                await message.nack(requeue=False)
+                return
+
+            if not analysis.has_valid_cut_points:
+                logging.warning(f"No valid cut points created for {key}")
+                await message.ack()
+                return
+
+            await asyncio.to_thread(self._store_keyframe_index, bucket, key, analysis)
+
+            batches = self.video_service.batch_cut_points(analysis.cut_points)
+
+            total_messages = len(batches)
+            passthrough = self.video_service.passthrough_compatible(analysis)
+            segment_payloads = [
+                self._segment_payload(i + 1, presigned_url, video_id, batch, analysis.duration, total_messages, analysis.source, passthrough)
+                for i, batch in enumerate(batches)
+            ]
+            priority = self.video_service.segment_priority(analysis.duration)
+            if not await self._publish_checkpointed_async(video_id, etag, segment_payloads, progress, priority):
+                error_msg = f"Failed to publish {total_messages} segments for {video_id}"
+                logging.error(error_msg)
+                await self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+                await message.nack(requeue=True)
+                return
+
+            logging.info(f"Processed: {key}, {total_messages} messages published to \"{self.config.RABBITMQ_PUBLISH_EXCHANGE}\" exchange")
+            await message.ack()
+
+        except json.JSONDecodeError:
+            logging.error(f"Failed to decode message: {message.body}")
+            await message.nack(requeue=False)
+        except Exception as e:
+            error_msg = f"Unexpected error: {e}"
+            logging.error(error_msg)
+            if video_id:
+                await self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+            await message.nack(requeue=True)
+        finally:
+            if lease_held:
+                await asyncio.to_thread(self.redis_client.release_upload, video_id, etag)
+
+    async def _publish_checkpointed_async(self, video_id, etag, segment_payloads, progress, priority=None) -> bool:
+        for published, chunk in self._checkpoints(video_id, etag, segment_payloads, progress):
+            if not await self.rabbitmq_client.publish_segments(chunk, priority=priority):
+                return False
+            await asyncio.to_thread(self._record_published, video_id, etag, published, len(segment_payloads))
+        return True
@@ -0,0 +1,56 @@
+import json
+from typing import Optional, Tuple
+from urllib.parse import unquote
+from config.config import Config
+from domain.interfaces import KeyframeCache
+from storage.minio_client import MinioClient
+from services.video_service import VideoService
+
+class UploadCostEstimator:
+    """Cheap pre-probe estimate of an upload's cost in seconds of video, and its owner.
+
+    Uses the cached analysis duration when there is one, otherwise the object size
+    from the event (or a stat) at SCHEDULER_BYTES_PER_SECOND. Runs on the consumer
+    thread, so it never probes.
+    """
+
+    def __init__(self, config: Config, minio_client: MinioClient, keyframe_cache: Optional[KeyframeCache] = None):
+        self.config = config
+        self.minio_client = minio_client
+        self.keyframe_cache = keyframe_cache
+
+    def estimate(self, body: bytes) -> Tuple[str, float]:
+        try:
+            record = json.loads(body.decode('utf-8')).get("Records", [{}])[0]
+            s3_info = record.get("s3", {})
+            s3_object = s3_info.get("object", {})
+            bucket = s3_info.get("bucket", {}).get("name")
+            key = unquote(s3_object.get("key") or "")
+        except Exception:
+            # Malformed events are rejected by the handler; let them through first
+            return "", 0.0
+
+        return self._user(s3_object, key), self._cost(bucket, key, s3_object)
+
+    @staticmethod
+    def _user(s3_object: dict, key: str) -> str:
+        """The uploader from the object's user metadata, else the upload session."""
+        for name, value in (s3_object.get("userMetadata") or {}).items():
+            if name.lower() in ("x-amz-meta-user-id", "user-id") and value:
+                return value
+        return VideoService.extract_video_id(key) if key else ""
+
+    def _cost(self, bucket: Optional[str], key: str, s3_object: dict) -> float:
+        etag = (s3_object.get("eTag") or "").strip('"') or None
+        cache_key = VideoService.analysis_cache_key(bucket, key, etag)
+        if self.keyframe_cache and cache_key:
+            cached = self.keyframe_cache.get(cache_key)
+            if cached is not None:
+                return cached[1]
+
+        size = s3_object.get("size")
+        if not size and bucket and key:
+            size = self.minio_client.object_size(bucket, key)
+        if not size:
+            return self.config.SCHEDULER_DEFAULT_COST_SECONDS
+        return size / self.config.SCHEDULER_BYTES_PER_SECOND
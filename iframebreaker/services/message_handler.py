@@ -1,114 +1,105 @@
 import json
 import logging
+from typing import Iterator, List, Optional, Tuple
 from urllib.parse import unquote
 from pathvalidate import sanitize_filename
 from config.config import Config
+from domain.models import SourceInfo, UploadProgress, VideoAnalysis
+from storage.keyframe_index import KeyframeIndex, is_sidecar, sidecar_name
 from storage.minio_client import MinioClient
+from storage.redis_client import RedisClient
 from messaging.rabbitmq_client import RabbitMQClient
 from services.video_service import VideoService
 
 class MessageHandler:
-    def __init__(self, config: Config, minio_client: MinioClient, rabbitmq_client: RabbitMQClient, video_service: VideoService):
+    def __init__(self, config: Config, minio_client: MinioClient, rabbitmq_client: RabbitMQClient, video_service: VideoService, redis_client: Optional[RedisClient] = None, status_publisher=None):
         self.config = config
         self.minio_client = minio_client
         self.rabbitmq_client = rabbitmq_client
+        # Anything with publish_status, e.g. a StatusOutbox; defaults to the segment publisher
+        self.status_publisher = status_publisher or rabbitmq_client
         self.video_service = video_service
+        self.redis_client = redis_client
 
     def process_video_message(self, ch, method, properties, body):
         """Process incoming RabbitMQ message."""
         video_id = None
+        lease_held = False
         try:
-            message_data = json.loads(body.decode('utf-8'))
+            bucket, key, etag = self._parse_upload_event(body)
 
-            record = message_data.get("Records", [{}])[0]
-            s3_info = record.get("s3", {})
-            bucket = s3_info.get("bucket", {}).get("name")
-            encoded_key = s3_info.get("object", {}).get("key")
-
-            if not bucket or not encoded_key:
+            if not bucket or not key:
                 logging.error("No bucket or key in message")
                 ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
                 return
 
-            # URL decode the key since MinIO sends it encoded but the client will encode it again
-            key = unquote(encoded_key)
+            if is_sidecar(key):
+                # Our own keyframe index landing in the watched bucket
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+                return
+
             video_id = self.video_service.extract_video_id(key)
+
+            progress = self._claim_upload(video_id, etag, method.redelivered)
+            if progress is None:
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+                return
+            lease_held = self._idempotent(etag)
             
             # Publish 'processing' status when we start processing
-            if not self.rabbitmq_client.publish_status(video_id, "processing", metadata={"bucket": bucket, "key": key}):
+            if not self.status_publisher.publish_status(video_id, "processing", metadata={"bucket": bucket, "key": key}):
                 logging.warning(f"Failed to publish processing status for {video_id}")
                 # Continue processing even if status publishing fails
 
-            presigned_url = self.minio_client.get_presigned_url(bucket, key)
-            
-            # If the presigned URL fails with the original key, try alternatives
-            if not presigned_url:
-                # Extract session ID and filename from the key
-                key_parts = key.split('/', 1)
-                if len(key_parts) == 2:
-                    session_id, filename = key_parts
-                    
-                    # Try different filename variations
-                    alternatives = [
-                        # 1. Convert + signs to spaces (since + is URL encoding for space)
-                        filename.replace('+', ' '),
-                        # 2. Sanitized version to match upload service behavior  
-                        sanitize_filename(filename, platform="universal").lower(),
-                        # 3. Sanitized version of the + to space converted filename
-                        sanitize_filename(filename.replace('+', ' '), platform="universal").lower()
-                    ]
-                    
-                    for alt_filename in alternatives:
-                        if alt_filename != filename:  # Skip if same as original
-                            alt_key = f"{session_id}/{alt_filename}"
-                            presigned_url = self.minio_client.get_presigned_url(bucket, alt_key)
-                            if presigned_url:
-                                key = alt_key  # Use the working key for further processing
-                                break
+            presigned_url, key = self._resolve_presigned_url(bucket, key)
                 
             if not presigned_url:
                 error_msg = f"Failed to generate presigned URL for {bucket}/{key} (tried both original and sanitized)"
                 logging.error(error_msg)
-                self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+                self.status_publisher.publish_status(video_id, "failed", error=error_msg)
                 ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
                 return
 
             logging.info(f"Processing New Upload: {key}")
 
-            keyframes, total_duration = self.video_service.get_video_info(presigned_url)
-            if keyframes is None or total_duration is None:
+            if self.config.PIPELINED_PUBLISHING and self.redis_client:
+                self._process_pipelined(ch, method, key, video_id, presigned_url, etag, progress)
+                return
+
+            cache_key = self.video_service.analysis_cache_key(bucket, key, etag)
+            analysis = self.video_service.analyze_video(presigned_url, cache_key)
+            if analysis is None:
                 error_msg = f"Failed to get video info for {key}"
                 logging.error(error_msg)
-                self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+                self.status_publisher.publish_status(video_id, "failed", error=error_msg)
                 ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
                 return
 
-            cut_points = self.video_service.get_video_cut_points(presigned_url)
-
-            if cut_points is None or len(cut_points) < 2:
+            if not analysis.has_valid_cut_points:
                 logging.warning(f"No valid cut points created for {key}")
                 ch.basic_ack(delivery_tag=method.delivery_tag)
                 return
 
-            batches = self.video_service.batch_timestamps(cut_points, self.config.MESSAGE_SPAN_SECONDS)
+            self._store_keyframe_index(bucket, key, analysis)
+
+            cut_points = analysis.cut_points
+            total_duration = analysis.duration
+
+            batches = self.video_service.batch_cut_points(cut_points)
 
             total_messages = len(batches)
-            for i, batch in enumerate(batches):
-                message_id = i + 1
-                segment_payload = {
-                    "message_id": message_id,
-                    "video_url": presigned_url,
-                    "video_id": video_id,
-                    "timestamps": batch,
-                    "total_video_duration": total_duration,
-                    "total_messages": total_messages
-                }
-                if not self.rabbitmq_client.publish_segment(segment_payload):
-                    error_msg = f"Failed to publish segment {message_id} for {video_id}"
-                    logging.error(error_msg)
-                    self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-                    return
+            passthrough = self.video_service.passthrough_compatible(analysis)
+            segment_payloads = [
+                self._segment_payload(i + 1, presigned_url, video_id, batch, total_duration, total_messages, analysis.source, passthrough)
+                for i, batch in enumerate(batches)
+            ]
+            priority = self.video_service.segment_priority(total_duration)
+            if not self._publish_checkpointed(video_id, etag, segment_payloads, progress, priority):
+                error_msg = f"Failed to publish {total_messages} segments for {video_id}"
+                logging.error(error_msg)
+                self.status_publisher.publish_status(video_id, "failed", error=error_msg)
+                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+                return
 
             logging.info(f"Processed: {key}, {total_messages} messages published to \"{self.config.RABBITMQ_PUBLISH_EXCHANGE}\" exchange")
             ch.basic_ack(delivery_tag=method.delivery_tag)
@@ -117,11 +108,205 @@ class MessageHandler:
             error_msg = f"Failed to decode message: {body}"
             logging.error(error_msg)
             if video_id:
-                self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+                self.status_publisher.publish_status(video_id, "failed", error=error_msg)
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
         except Exception as e:
             error_msg = f"Unexpected error: {e}"
             logging.error(error_msg)
             if video_id:
-                self.rabbitmq_client.publish_status(video_id, "failed", error=error_msg)
+                self.status_publisher.publish_status(video_id, "failed", error=error_msg)
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+        finally:
+            if lease_held:
+                self.redis_client.release_upload(video_id, etag)
+
+    def _store_keyframe_index(self, bucket: str, key: str, analysis: VideoAnalysis) -> None:
+        """Write the keyframe sidecar next to the upload before its segments go out.
+
+        Keyframes from the cache or an analyzer without byte offsets do not replace
+        a sidecar an earlier probe already wrote.
+        """
+        if not self.config.KEYFRAME_INDEX_SIDECAR:
+            return
+        if analysis.offsets is None and self.minio_client.object_exists(bucket, sidecar_name(key)):
+            return
+        self.minio_client.put_keyframe_index(bucket, key, KeyframeIndex(analysis.keyframes, analysis.duration, analysis.offsets))
+
+    def _idempotent(self, etag: Optional[str]) -> bool:
+        return bool(self.config.IDEMPOTENT_UPLOADS and self.redis_client and etag)
+
+    def _claim_upload(self, video_id: str, etag: Optional[str], redelivered: bool) -> Optional[UploadProgress]:
+        """Return the progress to resume from, or None if the event duplicates an upload that
+        is already published or still being processed by another worker.
+
+        A redelivered message is our own earlier attempt, so it takes the lease over.
+        """
+        if not self._idempotent(etag):
+            return UploadProgress()
+
+        progress = self.redis_client.get_upload_progress(video_id, etag)
+        if progress.is_published:
+            logging.info(f"Duplicate upload event for {video_id} ({etag}): already published {progress.total} messages")
+            return None
+        if not self.redis_client.claim_upload(video_id, etag, self.config.UPLOAD_LEASE_SECONDS,
+                                              self.config.UPLOAD_STATE_TTL_SECONDS, take_over=bool(redelivered)):
+            logging.info(f"Duplicate upload event for {video_id} ({etag}): being processed by another worker")
+            return None
+
+        # Another worker may have finished and released its lease since the first read
+        progress = self.redis_client.get_upload_progress(video_id, etag)
+        if progress.is_published:
+            logging.info(f"Duplicate upload event for {video_id} ({etag}): published while claiming")
+            self.redis_client.release_upload(video_id, etag)
+            return None
+        return progress
+
+    def _checkpoints(self, video_id: str, etag: Optional[str], segment_payloads: List[dict], progress: UploadProgress) -> Iterator[Tuple[int, List[dict]]]:
+        """Yield ``(published_after, chunk)`` for the messages still to publish.
+
+        Without idempotency the whole batch is one chunk; otherwise progress is
+        recorded every PUBLISH_CHECKPOINT_MESSAGES messages.
+        """
+        total = len(segment_payloads)
+        start = progress.published if progress.total == total else 0
+        if start:
+            logging.info(f"Resuming {video_id} from message {start + 1} of {total}")
+        step = max(1, self.config.PUBLISH_CHECKPOINT_MESSAGES) if self._idempotent(etag) else max(1, total)
+        for offset in range(start, total, step):
+            chunk = segment_payloads[offset:offset + step]
+            yield offset + len(chunk), chunk
+
+    def _record_published(self, video_id: str, etag: Optional[str], published: int, total: int) -> None:
+        if self._idempotent(etag):
+            self.redis_client.record_upload_progress(video_id, etag, published, total, self.config.UPLOAD_STATE_TTL_SECONDS)
+
+    def _publish_checkpointed(self, video_id: str, etag: Optional[str], segment_payloads: List[dict], progress: UploadProgress, priority: Optional[int] = None) -> bool:
+        for published, chunk in self._checkpoints(video_id, etag, segment_payloads, progress):
+            if not self.rabbitmq_client.publish_segments(chunk, priority=priority):
+                return False
+            self._record_published(video_id, etag, published, len(segment_payloads))
+        return True
+
+    @staticmethod
+    def _parse_upload_event(body: bytes) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Return the bucket, decoded object key and ETag of a MinIO upload notification."""
+        message_data = json.loads(body.decode('utf-8'))
+
+        record = message_data.get("Records", [{}])[0]
+        s3_info = record.get("s3", {})
+        bucket = s3_info.get("bucket", {}).get("name")
+        s3_object = s3_info.get("object", {})
+        encoded_key = s3_object.get("key")
+        etag = (s3_object.get("eTag") or "").strip('"') or None
+        if not encoded_key:
+            return bucket, None, etag
+
+        # URL decode the key since MinIO sends it encoded but the client will encode it again
+        return bucket, unquote(encoded_key), etag
+
+    def _resolve_presigned_url(self, bucket: str, key: str) -> Tuple[Optional[str], str]:
+        """Presign the object, matching the filename variants the upload service may have stored.
+
+        All variants are checked against one listing of the session prefix.
+        """
+        # Extract session ID and filename from the key
+        key_parts = key.split('/', 1)
+        if len(key_parts) != 2:
+            return self.minio_client.get_presigned_url(bucket, key), key
+
+        session_id, filename = key_parts
+        variants = [
+            filename,
+            # Convert + signs to spaces (since + is URL encoding for space)
+            filename.replace('+', ' '),
+            # Sanitized version to match upload service behavior
+            sanitize_filename(filename, platform="universal").lower(),
+            # Sanitized version of the + to space converted filename
+            sanitize_filename(filename.replace('+', ' '), platform="universal").lower()
+        ]
+
+        presigned_url, object_name = self.minio_client.find_presigned_url(
+            bucket, f"{session_id}/", (f"{session_id}/{variant}" for variant in variants)
+        )
+        return presigned_url, object_name or key
+
+    @staticmethod
+    def _segment_payload(message_id: int, presigned_url: str, video_id: str, batch: List[float], total_duration: float, total_messages: int, source: Optional[SourceInfo] = None, passthrough: bool = False) -> dict:
+        payload = {
+            "message_id": message_id,
+            "video_url": presigned_url,
+            "video_id": video_id,
+            "timestamps": batch,
+            "total_video_duration": total_duration,
+            "total_messages": total_messages
+        }
+        if source is not None:
+            # Lets the transcoder skip renditions above the source height
+            payload["source"] = source.to_payload()
+        if passthrough:
+            # The rendition at the source height is stream-copied (see VideoService.passthrough_compatible)
+            payload["passthrough"] = True
+        return payload
+
+    def _process_pipelined(self, ch, method, key, video_id, presigned_url, etag=None, progress: Optional[UploadProgress] = None):
+        """Publish each segment batch as soon as its window is final, then record the total in Redis.
+
+        Messages are sent with ``total_messages`` set to 0; transcode jobs read the real
+        total from Redis, and resolutions that already finished are announced here.
+        Batches a previous attempt already published are skipped. Each batch is
+        confirmed before the next one; batches always span MESSAGE_SPAN_SECONDS and
+        no rendition is stream-copied, since both need every cut point up front.
+        """
+        progress = progress or UploadProgress()
+        total_duration, source = self.video_service.get_video_header(presigned_url)
+        if not total_duration:
+            error_msg = f"Failed to get video duration for {key}"
+            logging.error(error_msg)
+            self.status_publisher.publish_status(video_id, "failed", error=error_msg)
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        published = 0
+        priority = self.video_service.segment_priority(total_duration)
+        try:
+            for batch in self.video_service.stream_batches(presigned_url, self.config.MESSAGE_SPAN_SECONDS):
+                if len(batch) < 2:
+                    continue
+                if published < progress.published and not progress.total:
+                    published += 1
+                    continue
+                segment_payload = self._segment_payload(published + 1, presigned_url, video_id, batch, total_duration, 0, source)
+                if not self.rabbitmq_client.publish_segments([segment_payload], priority=priority):
+                    raise RuntimeError(f"Failed to publish segment {published + 1} for {video_id}")
+                published += 1
+                self._record_published(video_id, etag, published, 0)
+        except Exception as e:
+            error_msg = f"Pipelined processing failed for {key} after {published} messages: {e}"
+            logging.error(error_msg)
+            self.status_publisher.publish_status(video_id, "failed", error=error_msg)
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        if published == 0:
+            logging.warning(f"No valid cut points created for {key}")
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+            return
+
+        if not self.redis_client.set_total_jobs(video_id, published):
+            error_msg = f"Failed to record total of {published} messages for {video_id}"
+            logging.error(error_msg)
+            self.status_publisher.publish_status(video_id, "failed", error=error_msg)
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        self._record_published(video_id, etag, published, published)
+        self._announce_finished_resolutions(video_id, published)
+
+        logging.info(f"Processed: {key}, {published} messages published to \"{self.config.RABBITMQ_PUBLISH_EXCHANGE}\" exchange (pipelined)")
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+
+    def _announce_finished_resolutions(self, video_id, total_messages):
+        """Jobs that finished before the total was known could not announce themselves."""
+        for resolution, completed in self.redis_client.get_completed_jobs(video_id).items():
+            if completed >= total_messages and self.redis_client.claim_playlist_notification(video_id, resolution):
+                self.rabbitmq_client.publish_playlist_ready(video_id, resolution)
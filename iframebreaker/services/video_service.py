@@ -1,36 +1,170 @@
+import bisect
+import math
 import subprocess
 import json
 import logging
 from urllib.parse import urlparse
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 from config.config import Config
-from infrastructure.video_analyzer import FFProbeVideoAnalyzer
-from infrastructure.timestamp_selector import OptimalTimestampSelector
+from domain.models import SourceInfo, VideoAnalysis
+from domain.interfaces import KeyframeCache, TimestampSelector, VideoAnalyzer
+from infrastructure.video_analyzer import FFProbeVideoAnalyzer, PacketFFProbeVideoAnalyzer, StreamingFFProbeVideoAnalyzer
+from infrastructure.timestamp_selector import OptimalTimestampSelector, TwoPointerTimestampSelector
 
 class VideoService:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, keyframe_cache: Optional[KeyframeCache] = None):
         self.config = config
-        self._video_analyzer = FFProbeVideoAnalyzer()
-        self._timestamp_selector = OptimalTimestampSelector()
+        self._keyframe_cache = keyframe_cache
+        self._video_analyzer = self._create_video_analyzer(config)
+        self._timestamp_selector = self._create_timestamp_selector(config)
+        self._stream_selector = (
+            self._timestamp_selector
+            if isinstance(self._timestamp_selector, OptimalTimestampSelector)
+            else OptimalTimestampSelector()
+        )
+        self._stream_analyzer = (
+            self._video_analyzer
+            if isinstance(self._video_analyzer, StreamingFFProbeVideoAnalyzer)
+            else StreamingFFProbeVideoAnalyzer()
+        )
+
+    @staticmethod
+    def _create_video_analyzer(config: Config) -> VideoAnalyzer:
+        """Pick the keyframe analyzer implementation configured by VIDEO_ANALYZER, PROBE_INPUT and MP4_INDEX_READER."""
+        if config.VIDEO_ANALYZER == 'streaming':
+            analyzer = StreamingFFProbeVideoAnalyzer()
+        elif config.VIDEO_ANALYZER == 'packets':
+            analyzer = PacketFFProbeVideoAnalyzer()
+        else:
+            analyzer = FFProbeVideoAnalyzer()
+        if config.PROBE_INPUT == 'scratch':
+            from infrastructure.scratch_download import ScratchDownloadVideoAnalyzer
+            analyzer = ScratchDownloadVideoAnalyzer(inner=analyzer)
+        if config.MP4_INDEX_READER:
+            from infrastructure.mp4_index_analyzer import Mp4IndexVideoAnalyzer
+            return Mp4IndexVideoAnalyzer(fallback=analyzer)
+        return analyzer
+
+    @staticmethod
+    def _create_timestamp_selector(config: Config) -> TimestampSelector:
+        """Pick the cut-point selector configured by TIMESTAMP_SELECTOR; all but "balanced" produce identical cuts."""
+        if config.TIMESTAMP_SELECTOR == 'balanced':
+            from infrastructure.balanced_timestamp_selector import BalancedTimestampSelector
+            return BalancedTimestampSelector(config.TIMESTAMP_VARIANCE_WEIGHT)
+        if config.TIMESTAMP_SELECTOR == 'numpy':
+            from infrastructure.vectorized_timestamp_selector import NumpyTimestampSelector
+            return NumpyTimestampSelector()
+        if config.TIMESTAMP_SELECTOR == 'greedy':
+            return OptimalTimestampSelector()
+        return TwoPointerTimestampSelector()
+
+    def get_video_info(self, video_url: str, cache_key: Optional[str] = None) -> Tuple[Optional[List[float]], Optional[float]]:
+        """Extract keyframe timestamps and duration using ffprobe with a presigned URL.
+
+        With a ``cache_key`` (see ``analysis_cache_key``) a cached result is returned
+        without probing, and a fresh result is cached.
+        """
+        keyframes, duration, _ = self.probe_video(video_url, cache_key)
+        return keyframes, duration
+
+    def probe_video(self, video_url: str, cache_key: Optional[str] = None) -> Tuple[Optional[List[float]], Optional[float], Optional[SourceInfo]]:
+        """Like ``get_video_info``, plus the source stream properties read by the same probe."""
+        cached = self.cached_probe(cache_key)
+        if cached is not None:
+            return cached
+
+        keyframes, duration, source = self._video_analyzer.probe(video_url)
+        self.store_video_info(cache_key, keyframes, duration, source)
+        return keyframes, duration, source
+
+    @staticmethod
+    def analysis_cache_key(bucket: str, key: str, etag: Optional[str]) -> Optional[str]:
+        """Identify one version of an upload; without an ETag the result is not cacheable."""
+        return f"{bucket}/{key}@{etag}" if etag else None
+
+    def cached_video_info(self, cache_key: Optional[str]) -> Optional[Tuple[List[float], float]]:
+        if self._keyframe_cache is None or cache_key is None:
+            return None
+        cached = self._keyframe_cache.get(cache_key)
+        if cached is not None:
+            logging.info(f"Keyframe cache hit for {cache_key}")
+        return cached
+
+    def cached_probe(self, cache_key: Optional[str]) -> Optional[Tuple[List[float], float, Optional[SourceInfo]]]:
+        cached = self.cached_video_info(cache_key)
+        if cached is None:
+            return None
+        return cached[0], cached[1], self._keyframe_cache.get_source(cache_key)
 
-    def get_video_info(self, video_url: str) -> Tuple[Optional[List[float]], Optional[float]]:
-        """Extract keyframe timestamps and duration using ffprobe with a presigned URL."""
-        return self._video_analyzer.extract_keyframes(video_url)
+    def store_video_info(self, cache_key: Optional[str], keyframes: Optional[List[float]], duration: Optional[float], source: Optional[SourceInfo] = None) -> None:
+        if self._keyframe_cache is None or cache_key is None or keyframes is None or duration is None:
+            return
+        self._keyframe_cache.put(cache_key, keyframes, duration, source)
 
     def get_video_cut_points(self, video_url: str) -> Optional[List[float]]:
         """Return clean cut points for a video using optimal I-frame selection."""
+        analysis = self.analyze_video(video_url)
+        return analysis.cut_points if analysis else None
+
+    def analyze_video(self, video_url: str, cache_key: Optional[str] = None) -> Optional[VideoAnalysis]:
+        """Probe the video once and derive keyframes, duration and cut points from that single run.
+
+        Keyframe byte offsets are only known from a fresh probe; a cached result has none.
+        """
+        cached = self.cached_probe(cache_key)
+        if cached is not None:
+            return self.build_analysis(*cached)
+
+        keyframes, duration, source, offsets = self._video_analyzer.probe_with_offsets(video_url)
+        self.store_video_info(cache_key, keyframes, duration, source)
+        return self.build_analysis(keyframes, duration, source, offsets)
 
-        iframe_ts, _ = self.get_video_info(video_url)
-        if iframe_ts is None:
+    def build_analysis(self, keyframes: Optional[List[float]], duration: Optional[float], source: Optional[SourceInfo] = None,
+                       offsets: Optional[List[int]] = None) -> Optional[VideoAnalysis]:
+        """Select cut points for keyframes that were probed elsewhere, e.g. by the asyncio runtime."""
+        if keyframes is None or duration is None:
             logging.error("Could not retrieve I-frame timestamps; aborting cut generation.")
             return None
 
-        return self._timestamp_selector.select_optimal_timestamps(
-            iframe_ts,
+        cut_points = self._timestamp_selector.select_optimal_timestamps(
+            keyframes,
             self.config.MIN_PERIOD_SECONDS,
             self.config.MAX_PERIOD_SECONDS,
         )
+        return VideoAnalysis(keyframes=keyframes, duration=duration, cut_points=cut_points, source=source, offsets=offsets)
+
+    def get_video_duration(self, video_url: str) -> Optional[float]:
+        """Read the container duration without walking the frames."""
+        return self._stream_analyzer.probe_duration(video_url)
+
+    def get_video_header(self, video_url: str) -> Tuple[Optional[float], Optional[SourceInfo]]:
+        """Read the container duration and source properties without walking the frames."""
+        return self._stream_analyzer.probe_header(video_url)
+
+    def stream_batches(self, video_url: str, span: float) -> Iterator[List[float]]:
+        """Yield cut-point batches while ffprobe is still reading the video.
+
+        Probe failures surface as exceptions while iterating.
+        """
+        keyframes = self._starting_at_zero(self._stream_analyzer.stream_keyframes(video_url))
+        cut_points = self._stream_selector.iter_optimal_timestamps(
+            keyframes,
+            self.config.MIN_PERIOD_SECONDS,
+            self.config.MAX_PERIOD_SECONDS,
+        )
+        return self.iter_batches(cut_points, span)
+
+    @staticmethod
+    def _starting_at_zero(keyframes: Iterable[float]) -> Iterator[float]:
+        first = True
+        for ts in keyframes:
+            if first and ts > 0.0:
+                yield 0.0
+            first = False
+            yield ts
+        if first:
+            yield 0.0
 
     @staticmethod
     def extract_video_id(object_key: str) -> str:
@@ -56,21 +190,118 @@ class VideoService:
             return Path(object_key).stem
 
 
+    def segment_priority(self, duration: float) -> Optional[int]:
+        """AMQP priority for a video's segment messages: shorter videos rank higher.
+
+        One step per doubling of the duration in minutes, from SEGMENT_MAX_PRIORITY for
+        clips under a minute down to 0; None when priorities are disabled.
+        """
+        max_priority = self.config.SEGMENT_MAX_PRIORITY
+        if max_priority <= 0:
+            return None
+        return max(0, max_priority - int(math.log2(1 + max(duration, 0.0) / 60)))
+
+    def passthrough_compatible(self, analysis: VideoAnalysis) -> bool:
+        """Whether the rendition at the source height can be stream-copied instead of re-encoded.
+
+        Copied segments keep the source's codec settings and GOPs, so the stream must
+        be H.264 in an allowed profile and level, and the cut points (source keyframes)
+        must keep every segment within PASSTHROUGH_MAX_SEGMENT_SECONDS.
+        """
+        source = analysis.source
+        if not self.config.PASSTHROUGH or source is None or not source.height:
+            return False
+        if source.codec != 'h264' or (source.profile or '').lower() not in self.config.PASSTHROUGH_PROFILES:
+            return False
+        if source.level is None or source.level > self.config.PASSTHROUGH_MAX_LEVEL:
+            return False
+        cut_points = analysis.cut_points
+        longest = max((b - a for a, b in zip(cut_points, cut_points[1:])), default=0.0)
+        return longest <= self.config.PASSTHROUGH_MAX_SEGMENT_SECONDS
+
+    def batch_cut_points(self, cut_points: List[float]) -> List[List[float]]:
+        """Batch cut points into segment messages with the configured BATCH_STRATEGY.
+
+        "span" cuts fixed MESSAGE_SPAN_SECONDS windows; "balanced" splits the video into
+        BATCH_TARGET_JOBS (or as few as keep each job within BATCH_MAX_JOB_SECONDS)
+        batches of near-equal duration.
+        """
+        if self.config.BATCH_STRATEGY != 'balanced':
+            return self.batch_timestamps(cut_points, self.config.MESSAGE_SPAN_SECONDS)
+        if self.config.BATCH_TARGET_JOBS > 0:
+            return self.balanced_batches(cut_points, self.config.BATCH_TARGET_JOBS)
+        return self.batches_within(cut_points, self.config.BATCH_MAX_JOB_SECONDS)
+
+    @staticmethod
+    def balanced_batches(timestamps: List[float], jobs: int) -> List[List[float]]:
+        """Split sorted cut points into ``jobs`` overlapping batches of near-equal duration.
+
+        Each boundary is the cut point nearest to an equal share of the total, so
+        batches differ by at most about one segment.
+        """
+        if len(timestamps) < 2:
+            return [list(timestamps)] if timestamps else []
+
+        last = len(timestamps) - 1
+        jobs = max(1, min(jobs, last))
+        start = timestamps[0]
+        total = timestamps[-1] - start
+
+        boundaries = [0]
+        for job in range(1, jobs):
+            target = start + total * job / jobs
+            i = bisect.bisect_left(timestamps, target)
+            if i > 0 and (i > last or target - timestamps[i - 1] <= timestamps[i] - target):
+                i -= 1
+            # Keep every batch at least one segment long
+            boundaries.append(min(max(i, boundaries[-1] + 1), last - (jobs - job)))
+        boundaries.append(last)
+
+        return [timestamps[a:b + 1] for a, b in zip(boundaries, boundaries[1:])]
+
+    @staticmethod
+    def batches_within(timestamps: List[float], max_job_seconds: float) -> List[List[float]]:
+        """Fewest balanced batches whose durations all stay within ``max_job_seconds``.
+
+        The job count is bisected between the even split of the duration and one job
+        per segment, which always satisfies the limit as far as the cut points allow.
+        """
+        if max_job_seconds <= 0:
+            raise ValueError(f"max_job_seconds must be positive, got {max_job_seconds}")
+        if len(timestamps) < 2:
+            return VideoService.balanced_batches(timestamps, 1)
+
+        last = len(timestamps) - 1
+        low = min(max(1, math.ceil((timestamps[-1] - timestamps[0]) / max_job_seconds)), last)
+        high = last
+        best = None
+        while low <= high:
+            jobs = (low + high) // 2
+            batches = VideoService.balanced_batches(timestamps, jobs)
+            if all(batch[-1] - batch[0] <= max_job_seconds for batch in batches):
+                best, high = batches, jobs - 1
+            else:
+                low = jobs + 1
+        return best if best is not None else VideoService.balanced_batches(timestamps, last)
+
     @staticmethod
     def batch_timestamps(timestamps: List[float], span: float) -> List[List[float]]:
         """Group sorted timestamps into overlapping windows."""
-        if not timestamps:
-            return []
+        return list(VideoService.iter_batches(timestamps, span))
 
-        batches: List[List[float]] = []
-        batch: List[float] = [timestamps[0]]
+    @staticmethod
+    def iter_batches(timestamps: Iterable[float], span: float) -> Iterator[List[float]]:
+        """Yield each overlapping window as soon as a timestamp past its span closes it."""
+        batch: Optional[List[float]] = None
 
-        for ts in timestamps[1:]:
-            if ts - batch[0] <= span:
+        for ts in timestamps:
+            if batch is None:
+                batch = [ts]
+            elif ts - batch[0] <= span:
                 batch.append(ts)
             else:
-                batches.append(batch)
+                yield batch
                 batch = [batch[-1], ts]
 
-        batches.append(batch)
-        return batches
+        if batch is not None:
+            yield batch
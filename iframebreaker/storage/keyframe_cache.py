@@ -0,0 +1,75 @@
+import json
+import logging
+from dataclasses import asdict
+from typing import List, Optional, Tuple
+import numpy as np
+import redis
+from domain.interfaces import KeyframeCache
+from domain.models import SourceInfo
+
+class RedisKeyframeCache(KeyframeCache):
+    """Probe results in Redis, one packed little-endian float64 array per upload.
+
+    The first element is the duration, the rest are the keyframe timestamps, so a
+    two-hour video with 2 s GOPs takes about 29 KB. The source properties go to a
+    JSON key written in the same transaction, so every message of an upload sees the
+    same ladder. Redis errors are logged and treated as a miss; the cache never
+    fails a message.
+    """
+
+    KEY_PREFIX = "iframebreaker:keyframes:"
+    SOURCE_PREFIX = "iframebreaker:source:"
+
+    def __init__(self, config):
+        self.ttl_seconds = config.KEYFRAME_CACHE_TTL_SECONDS
+        try:
+            # Values are raw bytes, so this cannot share RedisClient's decode_responses connection
+            self.client = redis.Redis(
+                host=config.REDIS_HOST,
+                port=config.REDIS_PORT,
+                password=config.REDIS_PASSWORD or None,
+                db=config.REDIS_DB
+            )
+        except Exception as e:
+            logging.error(f"Failed to initialize keyframe cache: {e}")
+            raise
+
+    def get(self, cache_key: str) -> Optional[Tuple[List[float], float]]:
+        try:
+            data = self.client.get(self.KEY_PREFIX + cache_key)
+        except Exception as e:
+            logging.warning(f"Keyframe cache lookup failed for {cache_key}: {e}")
+            return None
+        return self.unpack(data) if data else None
+
+    def put(self, cache_key: str, keyframes: List[float], duration: float, source: Optional[SourceInfo] = None) -> None:
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.set(self.KEY_PREFIX + cache_key, self.pack(keyframes, duration), ex=self.ttl_seconds)
+            if source is not None:
+                pipe.set(self.SOURCE_PREFIX + cache_key, json.dumps(asdict(source)), ex=self.ttl_seconds)
+            else:
+                pipe.delete(self.SOURCE_PREFIX + cache_key)
+            pipe.execute()
+        except Exception as e:
+            logging.warning(f"Keyframe cache store failed for {cache_key}: {e}")
+
+    def get_source(self, cache_key: str) -> Optional[SourceInfo]:
+        try:
+            data = self.client.get(self.SOURCE_PREFIX + cache_key)
+            return SourceInfo(**json.loads(data)) if data else None
+        except Exception as e:
+            logging.warning(f"Source cache lookup failed for {cache_key}: {e}")
+            return None
+
+    @staticmethod
+    def pack(keyframes: List[float], duration: float) -> bytes:
+        values = np.empty(len(keyframes) + 1, dtype='<f8')
+        values[0] = duration
+        values[1:] = keyframes
+        return values.tobytes()
+
+    @staticmethod
+    def unpack(data: bytes) -> Tuple[List[float], float]:
+        values = np.frombuffer(data, dtype='<f8')
+        return values[1:].tolist(), float(values[0])
@@ -0,0 +1,109 @@
+"""Keyframe sidecar index stored next to each raw upload.
+
+iframebreaker writes ``<object>.kfidx`` once it has probed an upload, so later
+stages can look up keyframes and the duration without running ffprobe again.
+The module only needs the standard library (and a ``minio.Minio`` client for
+``read_keyframe_index``), so other services can copy or import it as is.
+
+Layout, little-endian::
+
+    0   4s   magic b"KFIX"
+    4   B    format version (1)
+    5   B    flags; bit 0: byte offsets follow the timestamps
+    6   H    reserved
+    8   Q    keyframe count n
+    16  d    duration in seconds, NaN if unknown
+    24  d*n  keyframe PTS in seconds, ascending
+    ..  q*n  byte offset of each keyframe sample in the file, -1 if unknown
+"""
+import bisect
+import math
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+MAGIC = b"KFIX"
+VERSION = 1
+SUFFIX = ".kfidx"
+HAS_OFFSETS = 0x01
+HEADER = struct.Struct('<4sBBHQd')
+
+class KeyframeIndexError(ValueError):
+    """The data is not a keyframe index this reader understands."""
+
+@dataclass(frozen=True)
+class KeyframeIndex:
+    keyframes: Sequence[float]
+    duration: Optional[float] = None
+    offsets: Optional[Sequence[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.keyframes)
+
+    def seek(self, timestamp: float) -> Tuple[float, Optional[int]]:
+        """The last keyframe at or before ``timestamp`` (the first one if it is earlier) and its byte offset."""
+        if not self.keyframes:
+            raise KeyframeIndexError("empty keyframe index")
+        i = max(bisect.bisect_right(self.keyframes, timestamp) - 1, 0)
+        offset = self.offsets[i] if self.offsets is not None and self.offsets[i] >= 0 else None
+        return self.keyframes[i], offset
+
+def sidecar_name(object_name: str) -> str:
+    return object_name + SUFFIX
+
+def is_sidecar(object_name: str) -> bool:
+    return object_name.endswith(SUFFIX)
+
+def encode(index: KeyframeIndex) -> bytes:
+    keyframes = array('d', index.keyframes)
+    offsets = array('q', index.offsets) if index.offsets is not None else None
+    if offsets is not None and len(offsets) != len(keyframes):
+        raise KeyframeIndexError(f"{len(offsets)} offsets for {len(keyframes)} keyframes")
+
+    duration = index.duration if index.duration is not None else math.nan
+    flags = HAS_OFFSETS if offsets is not None else 0
+    header = HEADER.pack(MAGIC, VERSION, flags, 0, len(keyframes), duration)
+    if sys.byteorder == 'big':
+        keyframes.byteswap()
+        if offsets is not None:
+            offsets.byteswap()
+    return header + keyframes.tobytes() + (offsets.tobytes() if offsets is not None else b'')
+
+def decode(data: bytes) -> KeyframeIndex:
+    if len(data) < HEADER.size:
+        raise KeyframeIndexError("truncated keyframe index header")
+    magic, version, flags, _, count, duration = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise KeyframeIndexError("not a keyframe index")
+    if version != VERSION:
+        raise KeyframeIndexError(f"unsupported keyframe index version {version}")
+
+    expected = HEADER.size + count * 8 * (2 if flags & HAS_OFFSETS else 1)
+    if len(data) < expected:
+        raise KeyframeIndexError(f"truncated keyframe index: {len(data)} of {expected} bytes")
+
+    keyframes = array('d', data[HEADER.size:HEADER.size + count * 8])
+    offsets = array('q', data[HEADER.size + count * 8:expected]) if flags & HAS_OFFSETS else None
+    if sys.byteorder == 'big':
+        keyframes.byteswap()
+        if offsets is not None:
+            offsets.byteswap()
+    return KeyframeIndex(keyframes, None if math.isnan(duration) else duration, offsets)
+
+def read_keyframe_index(client, bucket_name: str, object_name: str) -> Optional[KeyframeIndex]:
+    """Fetch and decode the sidecar of ``object_name`` with a ``minio.Minio`` client; None if there is none."""
+    from minio.error import S3Error
+
+    try:
+        response = client.get_object(bucket_name, sidecar_name(object_name))
+    except S3Error as err:
+        if err.code == 'NoSuchKey':
+            return None
+        raise
+    try:
+        return decode(response.read())
+    finally:
+        response.close()
+        response.release_conn()
@@ -1,7 +1,13 @@
+import io
 import logging
 import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
 from minio import Minio
 from minio.error import S3Error
+from storage.keyframe_index import KeyframeIndex, encode, sidecar_name
 
 class MinioClient:
     def __init__(self, config):
@@ -18,10 +24,26 @@ class MinioClient:
             logging.error(f"Failed to initialize MinIO client: {e}")
             raise
 
+        # Shared by every worker thread: bucket -> monotonic time the existence check expires
+        self._bucket_ttl = config.MINIO_BUCKET_CACHE_TTL_SECONDS
+        self._known_buckets: Dict[str, float] = {}
+        # (bucket, object) -> (url, monotonic time after which it is re-signed), least recently used first
+        self._url_lifetime = max(min(config.PRESIGNED_URL_CACHE_SECONDS,
+                                     self.expiry.total_seconds() - config.PRESIGNED_URL_CACHE_MARGIN_SECONDS), 0)
+        self._url_cache_size = config.PRESIGNED_URL_CACHE_SIZE
+        self._url_cache: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.url_cache_hits = 0
+        self.url_cache_misses = 0
+
     def get_presigned_url(self, bucket_name, object_name):
         """Generate a presigned URL for the specified object."""
+        cached = self._cached_url(bucket_name, object_name)
+        if cached:
+            return cached
+
         try:
-            if not self.client.bucket_exists(bucket_name):
+            if not self._bucket_exists(bucket_name):
                 logging.error(f"Bucket '{bucket_name}' does not exist")
                 return None
 
@@ -36,10 +58,7 @@ class MinioClient:
                     logging.error(f"Error checking object existence '{bucket_name}/{object_name}': {stat_err}")
                     return None
 
-            url = self.client.presigned_get_object(
-                bucket_name, object_name, expires=self.expiry
-            )
-            return url
+            return self._sign(bucket_name, object_name)
 
         except S3Error as err:
             logging.error(f"S3Error while generating URL for '{bucket_name}/{object_name}': {err}")
@@ -47,3 +66,129 @@ class MinioClient:
         except Exception as e:
             logging.error(f"Unexpected error generating presigned URL for '{bucket_name}/{object_name}': {e}")
             return None
+
+    def find_presigned_url(self, bucket_name: str, prefix: str, candidates: Iterable[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Presign the first candidate object name that exists under ``prefix``.
+
+        Existence is decided from a single ``list_objects`` call, however many
+        candidates there are. Returns the URL and the matching object name.
+        """
+        candidates = list(dict.fromkeys(candidates))
+        for object_name in candidates:
+            cached = self._cached_url(bucket_name, object_name, count_miss=False)
+            if cached:
+                return cached, object_name
+        # One lookup is one miss, however many candidates it checked
+        with self._lock:
+            self.url_cache_misses += 1
+
+        names = self.list_object_names(bucket_name, prefix)
+        if names is None:
+            return None, None
+
+        for object_name in candidates:
+            if object_name in names:
+                try:
+                    return self._sign(bucket_name, object_name), object_name
+                except Exception as e:
+                    logging.error(f"Unexpected error generating presigned URL for '{bucket_name}/{object_name}': {e}")
+                    return None, None
+
+        logging.error(f"None of {candidates} exist in '{bucket_name}'")
+        return None, None
+
+    def list_object_names(self, bucket_name: str, prefix: str) -> Optional[Set[str]]:
+        """Names of all objects under ``prefix``; one request for a typical upload session."""
+        try:
+            return {obj.object_name for obj in self.client.list_objects(bucket_name, prefix=prefix, recursive=True)}
+        except S3Error as err:
+            if err.code == 'NoSuchBucket':
+                logging.error(f"Bucket '{bucket_name}' does not exist")
+            else:
+                logging.error(f"S3Error while listing '{bucket_name}/{prefix}': {err}")
+            return None
+        except Exception as e:
+            logging.error(f"Unexpected error listing '{bucket_name}/{prefix}': {e}")
+            return None
+
+    def object_size(self, bucket_name: str, object_name: str) -> Optional[int]:
+        """Size in bytes from a HEAD request, or None if the object cannot be stat'ed."""
+        try:
+            return self.client.stat_object(bucket_name, object_name).size
+        except Exception as e:
+            logging.warning(f"Failed to stat {bucket_name}/{object_name}: {e}")
+            return None
+
+    def object_exists(self, bucket_name: str, object_name: str) -> bool:
+        try:
+            self.client.stat_object(bucket_name, object_name)
+            return True
+        except S3Error as err:
+            if err.code != 'NoSuchKey':
+                logging.warning(f"Failed to stat {bucket_name}/{object_name}: {err}")
+            return False
+        except Exception as e:
+            logging.warning(f"Failed to stat {bucket_name}/{object_name}: {e}")
+            return False
+
+    def put_keyframe_index(self, bucket_name: str, object_name: str, index: KeyframeIndex) -> bool:
+        """Store ``index`` as the sidecar of ``object_name``; failures are logged, not raised."""
+        data = encode(index)
+        try:
+            self.client.put_object(bucket_name, sidecar_name(object_name), io.BytesIO(data), len(data),
+                                   content_type='application/octet-stream')
+            return True
+        except Exception as e:
+            logging.warning(f"Failed to write keyframe index for {bucket_name}/{object_name}: {e}")
+            return False
+
+    def _sign(self, bucket_name: str, object_name: str) -> str:
+        url = self.client.presigned_get_object(
+            bucket_name, object_name, expires=self.expiry
+        )
+        self._store_url(bucket_name, object_name, url)
+        return url
+
+    def cache_stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.url_cache_hits,
+                'misses': self.url_cache_misses,
+                'size': len(self._url_cache),
+            }
+
+    def _bucket_exists(self, bucket_name: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._known_buckets.get(bucket_name, 0) > now:
+                return True
+
+        if not self.client.bucket_exists(bucket_name):
+            return False
+
+        with self._lock:
+            self._known_buckets[bucket_name] = now + self._bucket_ttl
+        return True
+
+    def _cached_url(self, bucket_name: str, object_name: str, count_miss: bool = True) -> Optional[str]:
+        key = (bucket_name, object_name)
+        with self._lock:
+            entry = self._url_cache.get(key)
+            if entry and entry[1] > time.monotonic():
+                self._url_cache.move_to_end(key)
+                self.url_cache_hits += 1
+                return entry[0]
+            if entry:
+                del self._url_cache[key]
+            if count_miss:
+                self.url_cache_misses += 1
+            return None
+
+    def _store_url(self, bucket_name: str, object_name: str, url: str) -> None:
+        if self._url_lifetime <= 0 or self._url_cache_size <= 0:
+            return
+        with self._lock:
+            self._url_cache[(bucket_name, object_name)] = (url, time.monotonic() + self._url_lifetime)
+            self._url_cache.move_to_end((bucket_name, object_name))
+            while len(self._url_cache) > self._url_cache_size:
+                self._url_cache.popitem(last=False)
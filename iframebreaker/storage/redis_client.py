@@ -0,0 +1,110 @@
+import logging
+from typing import Dict
+import redis
+from domain.models import UploadProgress
+
+class RedisClient:
+    def __init__(self, config):
+        try:
+            self.client = redis.Redis(
+                host=config.REDIS_HOST,
+                port=config.REDIS_PORT,
+                password=config.REDIS_PASSWORD or None,
+                db=config.REDIS_DB,
+                decode_responses=True
+            )
+            logging.info("Successfully connected to Redis")
+        except Exception as e:
+            logging.error(f"Failed to initialize Redis client: {e}")
+            raise
+
+    @staticmethod
+    def total_jobs_key(video_id: str) -> str:
+        return f"transcode:jobs:{video_id}:total"
+
+    @staticmethod
+    def completed_jobs_key(video_id: str) -> str:
+        return f"transcode:jobs:{video_id}:completed"
+
+    @staticmethod
+    def notified_jobs_key(video_id: str) -> str:
+        return f"transcode:jobs:{video_id}:notified"
+
+    @staticmethod
+    def upload_state_key(video_id: str, etag: str) -> str:
+        return f"iframebreaker:uploads:{video_id}:{etag}"
+
+    @staticmethod
+    def upload_lease_key(video_id: str, etag: str) -> str:
+        return f"iframebreaker:uploads:{video_id}:{etag}:lease"
+
+    def get_upload_progress(self, video_id: str, etag: str) -> UploadProgress:
+        """Return what has been done for this upload version; unknown uploads are "new"."""
+        try:
+            record = self.client.hgetall(self.upload_state_key(video_id, etag))
+        except Exception as e:
+            logging.error(f"Failed to read upload state for {video_id}: {e}")
+            return UploadProgress()
+        if not record:
+            return UploadProgress()
+        return UploadProgress(record.get("state", "new"), int(record.get("published", 0)), int(record.get("total", 0)))
+
+    def claim_upload(self, video_id: str, etag: str, lease_seconds: int, ttl_seconds: int, take_over: bool = False) -> bool:
+        """Take the processing lease; ``take_over`` steals it for a redelivered message.
+
+        Fails open, so a Redis outage costs duplicate work rather than a lost upload.
+        """
+        try:
+            claimed = self.client.set(self.upload_lease_key(video_id, etag), 1, nx=not take_over, ex=lease_seconds)
+            if claimed:
+                pipe = self.client.pipeline()
+                pipe.hsetnx(self.upload_state_key(video_id, etag), "state", "probing")
+                pipe.expire(self.upload_state_key(video_id, etag), ttl_seconds)
+                pipe.execute()
+            return bool(claimed)
+        except Exception as e:
+            logging.error(f"Failed to claim upload {video_id}: {e}")
+            return True
+
+    def record_upload_progress(self, video_id: str, etag: str, published: int, total: int, ttl_seconds: int) -> None:
+        """Record that message_ids 1..published are confirmed; the upload is done once all are."""
+        state = "published" if total and published >= total else "publishing"
+        try:
+            pipe = self.client.pipeline()
+            pipe.hset(self.upload_state_key(video_id, etag), mapping={"state": state, "published": published, "total": total})
+            pipe.expire(self.upload_state_key(video_id, etag), ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            logging.error(f"Failed to record progress {published}/{total} for {video_id}: {e}")
+
+    def release_upload(self, video_id: str, etag: str) -> None:
+        try:
+            self.client.delete(self.upload_lease_key(video_id, etag))
+        except Exception as e:
+            logging.error(f"Failed to release upload lease for {video_id}: {e}")
+
+    def set_total_jobs(self, video_id: str, total: int) -> bool:
+        """Record the number of segment messages once a pipelined upload has been fully probed."""
+        try:
+            self.client.set(self.total_jobs_key(video_id), total)
+            return True
+        except Exception as e:
+            logging.error(f"Failed to set total jobs for {video_id}: {e}")
+            return False
+
+    def get_completed_jobs(self, video_id: str) -> Dict[str, int]:
+        """Return completed transcode job counts per resolution."""
+        try:
+            completed = self.client.hgetall(self.completed_jobs_key(video_id))
+            return {resolution: int(count) for resolution, count in completed.items()}
+        except Exception as e:
+            logging.error(f"Failed to read completed jobs for {video_id}: {e}")
+            return {}
+
+    def claim_playlist_notification(self, video_id: str, resolution: str) -> bool:
+        """Atomically claim the right to announce a finished resolution (shared with transcode.sh)."""
+        try:
+            return bool(self.client.hsetnx(self.notified_jobs_key(video_id), resolution, 1))
+        except Exception as e:
+            logging.error(f"Failed to claim playlist notification for {video_id}/{resolution}: {e}")
+            return False
@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import Mock, patch
+from tests.test_message_handler import ffprobe_output
+from tools.analyze_catalog import discover, main, resolutions_for_height, summarize
+
+
+class TestDiscover(unittest.TestCase):
+    def test_directories_are_scanned_by_extension_and_manifest_paths_resolved(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, 'catalog', 'season1'))
+            for name in ('catalog/a.mp4', 'catalog/season1/b.MKV', 'catalog/notes.txt'):
+                open(os.path.join(root, name), 'w').close()
+            manifest = os.path.join(root, 'manifest.txt')
+            with open(manifest, 'w') as f:
+                f.write("# back catalog\n\ncatalog/a.mp4\nhttp://minio/raw/c.mp4\n")
+
+            videos = discover([os.path.join(root, 'catalog')], manifest)
+
+        self.assertEqual([os.path.relpath(v, root) if '://' not in v else v for v in videos],
+                         ['catalog/a.mp4', 'catalog/season1/b.MKV', 'http://minio/raw/c.mp4'])
+
+
+class TestResolutionsForHeight(unittest.TestCase):
+    def test_matches_transcoder_ladder_pruning(self):
+        ladder = ['240', '360', '480', '720', '1080']
+        self.assertEqual(resolutions_for_height(ladder, 720), ['240', '360', '480', '720'])
+        self.assertEqual(resolutions_for_height(ladder, 144), ['240'])
+        self.assertEqual(resolutions_for_height(ladder, None), ladder)
+        self.assertEqual(resolutions_for_height(['480p', 'source'], 360), ['source'])
+
+
+class TestAnalyzeCatalog(unittest.TestCase):
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_writes_json_lines_and_summary(self, mock_run):
+        output = json.loads(ffprobe_output([i * 2.0 for i in range(60)], 120.0))
+        output["streams"] = [{"codec_name": "h264", "width": 1280, "height": 720}]
+        mock_run.return_value = Mock(stdout=json.dumps(output))
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        with tempfile.TemporaryDirectory() as root:
+            summary_path = os.path.join(root, 'summary.json')
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                status = main(['a.mp4', 'b.mp4', '--workers', '1', '--summary', summary_path, '--message-span', '60'])
+            with open(summary_path) as f:
+                summary = json.load(f)
+
+        self.assertEqual(status, 0)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([line["path"] for line in lines], ['a.mp4', 'b.mp4'])
+        self.assertEqual(lines[0]["keyframes_per_minute"], 30.0)
+        self.assertEqual(lines[0]["cut_points"][-1], 118.0)
+        self.assertEqual(lines[0]["jobs_per_resolution"], {r: len(lines[0]["batches"]) for r in ['240', '360', '480', '720']})
+        self.assertEqual(summary["videos"], 2)
+        self.assertEqual(summary["jobs_per_resolution"]["720"], 2 * len(lines[0]["batches"]))
+        self.assertNotIn("1080", summary["jobs_per_resolution"])
+        self.assertIn("keyframes per minute", stderr.getvalue())
+
+    def test_summary_counts_failures(self):
+        results = [
+            {"path": "a.mp4", "error": "probe failed", "probe_seconds": 0.5},
+            {"path": "b.mp4", "duration": 60.0, "probe_seconds": 1.5, "keyframes": 30, "segments": 8,
+             "batches": [[0.0, 30.0], [30.0, 58.0]], "jobs_per_resolution": {"240": 2, "360": 2}},
+        ]
+
+        summary = summarize(results)
+
+        self.assertEqual((summary["videos"], summary["failed"]), (2, 1))
+        self.assertEqual(summary["probe_seconds_total"], 1.5)
+        self.assertEqual(summary["keyframes_per_minute"], 30.0)
+        self.assertEqual(summary["video_seconds_per_resolution"], {"240": 58.0, "360": 58.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from async_main import AsyncIFrameBreakerApp
+from config.config import Config
+from infrastructure.async_video_analyzer import AsyncFFProbeVideoAnalyzer
+from services.async_message_handler import AsyncMessageHandler
+from services.video_service import VideoService
+from storage.minio_client import MinioClient
+from messaging.async_rabbitmq_client import AsyncRabbitMQClient
+from tests.test_message_handler import ffprobe_output, upload_event
+
+
+class FakeProcess:
+    """Stands in for an asyncio subprocess, tracking how many probes overlap."""
+
+    running = 0
+    peak = 0
+
+    def __init__(self, stdout: str, delay: float = 0.05, returncode: int = 0):
+        self._stdout = stdout
+        self._delay = delay
+        self.returncode = None
+        self._exit_code = returncode
+        self.killed = False
+
+    async def communicate(self):
+        FakeProcess.running += 1
+        FakeProcess.peak = max(FakeProcess.peak, FakeProcess.running)
+        try:
+            await asyncio.sleep(self._delay)
+        finally:
+            FakeProcess.running -= 1
+        self.returncode = self._exit_code
+        return self._stdout.encode('utf-8'), b'probe error'
+
+    def kill(self):
+        self.killed = True
+
+    async def wait(self):
+        return self.returncode
+
+
+class TestAsyncFFProbeVideoAnalyzer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        FakeProcess.running = 0
+        FakeProcess.peak = 0
+
+    async def test_semaphore_bounds_concurrent_probes(self):
+        analyzer = AsyncFFProbeVideoAnalyzer(max_concurrent_probes=2)
+        stdout = ffprobe_output([0.0, 2.0, 4.0], 6.0)
+
+        with patch('infrastructure.async_video_analyzer.asyncio.create_subprocess_exec',
+                   AsyncMock(side_effect=lambda *args, **kwargs: FakeProcess(stdout))):
+            results = await asyncio.gather(*(analyzer.extract_keyframes_async(f'http://video/{i}') for i in range(6)))
+
+        self.assertEqual(FakeProcess.peak, 2)
+        self.assertEqual(results[0], ([0.0, 2.0, 4.0], 6.0))
+
+    async def test_timeout_kills_probe(self):
+        analyzer = AsyncFFProbeVideoAnalyzer(max_concurrent_probes=1)
+        analyzer.config.FFPROBE_TIMEOUT_SECONDS = 0.01
+        process = FakeProcess(ffprobe_output([0.0], 1.0), delay=1.0)
+
+        with patch('infrastructure.async_video_analyzer.asyncio.create_subprocess_exec', AsyncMock(return_value=process)):
+            result = await analyzer.extract_keyframes_async('http://video')
+
+        self.assertEqual(result, (None, None))
+        self.assertTrue(process.killed)
+
+    async def test_failed_probe_returns_none(self):
+        analyzer = AsyncFFProbeVideoAnalyzer(max_concurrent_probes=1)
+        process = FakeProcess('', delay=0, returncode=1)
+
+        with patch('infrastructure.async_video_analyzer.asyncio.create_subprocess_exec', AsyncMock(return_value=process)):
+            result = await analyzer.extract_keyframes_async('http://video')
+
+        self.assertEqual(result, (None, None))
+
+
+class TestAsyncMessageHandler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config = Config()
+        self.minio_client = Mock(spec=MinioClient)
+        self.minio_client.find_presigned_url.return_value = ('http://minio/raw/session123/movie.mp4', 'session123/movie.mp4')
+        self.rabbitmq_client = Mock(spec=AsyncRabbitMQClient)
+        self.rabbitmq_client.publish_status = AsyncMock(return_value=True)
+        self.rabbitmq_client.publish_segments = AsyncMock(return_value=True)
+        self.analyzer = Mock(spec=AsyncFFProbeVideoAnalyzer)
+        self.handler = AsyncMessageHandler(
+            self.config, self.minio_client, self.rabbitmq_client, VideoService(self.config), self.analyzer
+        )
+
+    def message(self, body):
+        return Mock(body=body, ack=AsyncMock(), nack=AsyncMock())
+
+    async def test_publishes_batches_and_acks(self):
+        keyframes = [i * 2.0 for i in range(100)]
+        self.analyzer.probe_async = AsyncMock(return_value=(keyframes, 200.0, None))
+        message = self.message(upload_event())
+
+        await self.handler.handle_message(message)
+
+        payloads = self.rabbitmq_client.publish_segments.call_args.args[0]
+        self.assertTrue(payloads)
+        self.assertEqual(payloads[0]["total_messages"], len(payloads))
+        self.assertEqual(payloads[0]["video_id"], 'session123')
+        message.ack.assert_awaited_once()
+        message.nack.assert_not_awaited()
+
+    async def test_probe_failure_rejects_message(self):
+        self.analyzer.probe_async = AsyncMock(return_value=(None, None, None))
+        message = self.message(upload_event())
+
+        await self.handler.handle_message(message)
+
+        message.nack.assert_awaited_once_with(requeue=False)
+        self.rabbitmq_client.publish_status.assert_awaited_with('session123', 'failed', error='Failed to get video info for session123/movie.mp4')
+
+    async def test_malformed_body_is_dropped(self):
+        message = self.message(json.dumps({"Records": [{"s3": {"bucket": {"name": "raw"}}}]}).encode("utf-8"))
+
+        await self.handler.handle_message(message)
+
+        message.nack.assert_awaited_once_with(requeue=False)
+        self.rabbitmq_client.publish_segments.assert_not_awaited()
+
+
+class TestAsyncIFrameBreakerApp(unittest.TestCase):
+    def test_warns_about_analyzer_settings_it_ignores(self):
+        config = Config()
+        config.MP4_INDEX_READER = True
+        config.VIDEO_ANALYZER = 'streaming'
+
+        with self.assertLogs(level='WARNING') as logs:
+            AsyncIFrameBreakerApp._warn_unsupported_settings(Mock(config=config))
+
+        output = "\n".join(logs.output)
+        self.assertIn("MP4_INDEX_READER", output)
+        self.assertIn("VIDEO_ANALYZER=streaming", output)
+
+    def test_supported_analyzers_do_not_warn(self):
+        config = Config()
+        for analyzer in ('ffprobe', 'packets'):
+            config.VIDEO_ANALYZER = analyzer
+            with self.assertNoLogs(level='WARNING'):
+                AsyncIFrameBreakerApp._warn_unsupported_settings(Mock(config=config))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import unittest
+from unittest.mock import Mock
+from pika.exceptions import NackError, UnroutableError
+from messaging.confirm_channel import ConfirmChannel
+
+
+class FakeBroker:
+    """Plays the broker side of a BlockingChannel in confirm mode: acks, nacks or returns each publish."""
+
+    def __init__(self, nack_indices=(), unroutable_indices=()):
+        self.nack_indices = set(nack_indices)
+        self.unroutable_indices = set(unroutable_indices)
+        self.published = []
+
+        self.channel = Mock(is_open=True)
+        self.channel.basic_publish.side_effect = self._basic_publish
+        self.connection = Mock(is_open=True)
+        self.connection.channel.return_value = self.channel
+
+    def _basic_publish(self, exchange, routing_key, body, properties, mandatory):
+        index = len(self.published)
+        self.published.append((json.loads(body), mandatory))
+        if index in self.nack_indices:
+            raise NackError([])
+        if index in self.unroutable_indices:
+            raise UnroutableError([])
+
+
+class TestConfirmChannel(unittest.TestCase):
+    def test_channel_is_put_in_confirm_mode(self):
+        broker = FakeBroker()
+
+        ConfirmChannel(broker.connection)
+
+        broker.channel.confirm_delivery.assert_called_once_with()
+
+    def test_batch_is_published_mandatory(self):
+        broker = FakeBroker()
+        channel = ConfirmChannel(broker.connection)
+
+        unconfirmed = channel.publish_batch('video_segments', 'segment.process', [{'message_id': i} for i in range(5)])
+
+        self.assertEqual(unconfirmed, [])
+        self.assertEqual([payload['message_id'] for payload, _ in broker.published], list(range(5)))
+        self.assertTrue(all(mandatory for _, mandatory in broker.published))
+
+    def test_returns_nacked_and_unroutable_indices(self):
+        broker = FakeBroker(nack_indices={1}, unroutable_indices={3})
+        channel = ConfirmChannel(broker.connection)
+
+        unconfirmed = channel.publish_batch('x', 'y', [{'message_id': i} for i in range(5)])
+
+        self.assertEqual(unconfirmed, [1, 3])
+        self.assertEqual(len(broker.published), 5)
+
+    def test_connection_errors_propagate(self):
+        broker = FakeBroker()
+        broker.channel.basic_publish.side_effect = ConnectionResetError('broker went away')
+        channel = ConfirmChannel(broker.connection)
+
+        with self.assertRaises(ConnectionResetError):
+            channel.publish_batch('x', 'y', [{}])
+
+
+if __name__ == '__main__':
+    unittest.main()
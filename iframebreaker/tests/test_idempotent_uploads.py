@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import Mock, patch
+from config.config import Config
+from services.message_handler import MessageHandler
+from services.video_service import VideoService
+from storage.minio_client import MinioClient
+from storage.redis_client import RedisClient
+from messaging.rabbitmq_client import RabbitMQClient
+from tests.test_message_handler import ffprobe_output, upload_event
+
+
+class FakeRedis:
+    """The subset of redis-py (decode_responses=True) used for upload state."""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value)
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hsetnx(self, key, field, value):
+        fields = self.hashes.setdefault(key, {})
+        if field in fields:
+            return 0
+        fields[field] = str(value)
+        return 1
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({field: str(value) for field, value in mapping.items()})
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+class TestIdempotentUploads(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.IDEMPOTENT_UPLOADS = True
+        self.config.PUBLISH_CHECKPOINT_MESSAGES = 2
+        self.config.MESSAGE_SPAN_SECONDS = 10.0
+        self.redis_client = RedisClient(self.config)
+        self.redis_client.client = FakeRedis()
+        self.minio_client = Mock(spec=MinioClient)
+        self.minio_client.find_presigned_url.return_value = ('http://minio/raw/session123/movie.mp4', 'session123/movie.mp4')
+        self.rabbitmq_client = Mock(spec=RabbitMQClient)
+        self.rabbitmq_client.publish_status.return_value = True
+        self.rabbitmq_client.publish_segments.return_value = True
+        self.handler = MessageHandler(self.config, self.minio_client, self.rabbitmq_client, VideoService(self.config), self.redis_client)
+        self.channel = Mock()
+
+        patcher = patch('infrastructure.video_analyzer.subprocess.run')
+        self.ffprobe = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ffprobe.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(26)], 50.0))
+
+    def deliver(self, redelivered=False, etag='etag-1'):
+        method = Mock(delivery_tag=1, redelivered=redelivered)
+        self.handler.process_video_message(self.channel, method, None, upload_event(etag=etag))
+
+    def published_ids(self):
+        return [payload["message_id"] for call in self.rabbitmq_client.publish_segments.call_args_list for payload in call.args[0]]
+
+    def test_duplicate_of_published_upload_is_acked_without_work(self):
+        self.deliver()
+        total = len(self.published_ids())
+        self.deliver()
+
+        self.assertEqual(self.ffprobe.call_count, 1)
+        self.assertEqual(len(self.published_ids()), total)
+        self.assertEqual(self.channel.basic_ack.call_count, 2)
+        self.assertEqual(self.rabbitmq_client.publish_status.call_count, 1)
+        progress = self.redis_client.get_upload_progress('session123', 'etag-1')
+        self.assertTrue(progress.is_published)
+        self.assertEqual(progress.total, total)
+
+    def test_duplicate_while_another_worker_holds_the_lease_is_acked(self):
+        self.redis_client.claim_upload('session123', 'etag-1', 60, 60)
+
+        self.deliver()
+
+        self.ffprobe.assert_not_called()
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+
+    def test_upload_published_while_claiming_is_not_republished(self):
+        claim = self.redis_client.claim_upload
+
+        def finished_by_other_worker(*args, **kwargs):
+            # The other worker publishes everything and releases its lease between our read and claim
+            self.redis_client.record_upload_progress('session123', 'etag-1', 13, 13, 60)
+            return claim(*args, **kwargs)
+
+        with patch.object(self.redis_client, 'claim_upload', side_effect=finished_by_other_worker):
+            self.deliver()
+
+        self.ffprobe.assert_not_called()
+        self.rabbitmq_client.publish_segments.assert_not_called()
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+        self.assertNotIn(self.redis_client.upload_lease_key('session123', 'etag-1'), self.redis_client.client.values)
+
+    def test_redelivery_takes_over_the_lease(self):
+        self.redis_client.claim_upload('session123', 'etag-1', 60, 60)
+
+        self.deliver(redelivered=True)
+
+        self.assertEqual(self.ffprobe.call_count, 1)
+        self.assertTrue(self.redis_client.get_upload_progress('session123', 'etag-1').is_published)
+        self.assertNotIn(self.redis_client.upload_lease_key('session123', 'etag-1'), self.redis_client.client.values)
+
+    def test_partially_published_upload_resumes_from_first_unpublished_message(self):
+        self.rabbitmq_client.publish_segments.side_effect = [True, False]
+        self.deliver()
+        total = self.rabbitmq_client.publish_segments.call_args.args[0][0]["total_messages"]
+        self.channel.basic_nack.assert_called_once_with(delivery_tag=1, requeue=True)
+        self.assertEqual(self.redis_client.get_upload_progress('session123', 'etag-1').published, 2)
+
+        self.rabbitmq_client.publish_segments.reset_mock(side_effect=True)
+        self.rabbitmq_client.publish_segments.return_value = True
+        self.deliver(redelivered=True)
+
+        self.assertEqual(self.published_ids(), list(range(3, total + 1)))
+        self.assertTrue(self.redis_client.get_upload_progress('session123', 'etag-1').is_published)
+
+    def test_new_etag_is_a_new_upload(self):
+        self.deliver(etag='etag-1')
+        self.deliver(etag='etag-2')
+
+        self.assertEqual(self.ffprobe.call_count, 2)
+
+    def test_events_without_etag_are_processed_every_time(self):
+        self.deliver(etag=None)
+        self.deliver(etag=None)
+
+        self.assertEqual(self.ffprobe.call_count, 2)
+        self.assertEqual(self.redis_client.client.hashes, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
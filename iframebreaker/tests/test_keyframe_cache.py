@@ -0,0 +1,144 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+from config.config import Config
+from domain.models import SourceInfo
+from services.message_handler import MessageHandler
+from services.video_service import VideoService
+from storage.keyframe_cache import RedisKeyframeCache
+from storage.minio_client import MinioClient
+from messaging.rabbitmq_client import RabbitMQClient
+from tests.test_message_handler import ffprobe_output, upload_event
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class TestRedisKeyframeCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = RedisKeyframeCache(Config())
+        self.cache.client = FakeRedis()
+
+    def test_round_trip_is_exact(self):
+        keyframes = [0.0, 2.002, 4.004, 1234.567891]
+        self.cache.put('raw/s/movie.mp4@abc', keyframes, 1300.123456)
+
+        self.assertEqual(self.cache.get('raw/s/movie.mp4@abc'), (keyframes, 1300.123456))
+
+    def test_entries_are_packed_float64(self):
+        self.cache.put('k', [float(i) for i in range(1000)], 1000.0)
+
+        self.assertEqual(len(self.cache.client.values['iframebreaker:keyframes:k']), 8 * 1001)
+
+    def test_source_is_cached_with_keyframes(self):
+        source = SourceInfo(width=854, height=480, codec='h264', bitrate=1200000, fps=29.97)
+        self.cache.put('k', [0.0, 2.0], 4.0, source)
+
+        self.assertEqual(self.cache.get_source('k'), source)
+
+        self.cache.put('k', [0.0, 2.0], 4.0)
+        self.assertIsNone(self.cache.get_source('k'))
+
+    def test_redis_errors_are_misses(self):
+        self.cache.client = Mock()
+        self.cache.client.get.side_effect = ConnectionError('redis down')
+        self.cache.client.set.side_effect = ConnectionError('redis down')
+
+        self.cache.put('k', [0.0], 1.0)
+        self.assertIsNone(self.cache.get('k'))
+
+
+class TestCachedAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.cache = RedisKeyframeCache(self.config)
+        self.cache.client = FakeRedis()
+        self.minio_client = Mock(spec=MinioClient)
+        self.minio_client.find_presigned_url.return_value = ('http://minio/raw/session123/movie.mp4', 'session123/movie.mp4')
+        self.rabbitmq_client = Mock(spec=RabbitMQClient)
+        self.rabbitmq_client.publish_status.return_value = True
+        self.rabbitmq_client.publish_segments.return_value = True
+        self.handler = MessageHandler(self.config, self.minio_client, self.rabbitmq_client, VideoService(self.config, self.cache))
+        self.channel = Mock()
+        self.method = Mock(delivery_tag=1)
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_redelivered_upload_is_not_probed_again(self, mock_run):
+        mock_run.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(100)], 200.0))
+
+        for _ in range(2):
+            self.handler.process_video_message(self.channel, self.method, None, upload_event(etag='"9b2cf535f27731c9"'))
+
+        self.assertEqual(mock_run.call_count, 1)
+        first, second = (call.args[0] for call in self.rabbitmq_client.publish_segments.call_args_list)
+        self.assertEqual(first, second)
+        self.assertIn('iframebreaker:keyframes:raw/session123/movie.mp4@9b2cf535f27731c9', self.cache.client.values)
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_redelivered_upload_keeps_source(self, mock_run):
+        output = json.loads(ffprobe_output([i * 2.0 for i in range(100)], 200.0))
+        output["streams"] = [{"codec_name": "h264", "width": 854, "height": 480, "avg_frame_rate": "30/1"}]
+        mock_run.return_value = Mock(stdout=json.dumps(output))
+
+        for _ in range(2):
+            self.handler.process_video_message(self.channel, self.method, None, upload_event(etag='v1'))
+
+        self.assertEqual(mock_run.call_count, 1)
+        for call in self.rabbitmq_client.publish_segments.call_args_list:
+            self.assertEqual({payload["source"]["height"] for payload in call.args[0]}, {480})
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_new_etag_is_probed(self, mock_run):
+        mock_run.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(100)], 200.0))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event(etag='v1'))
+        self.handler.process_video_message(self.channel, self.method, None, upload_event(etag='v2'))
+
+        self.assertEqual(mock_run.call_count, 2)
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_event_without_etag_is_not_cached(self, mock_run):
+        mock_run.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(100)], 200.0))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.assertEqual(self.cache.client.values, {})
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_failed_probe_is_not_cached(self, mock_run):
+        mock_run.side_effect = RuntimeError('ffprobe crashed')
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event(etag='v1'))
+
+        self.assertEqual(self.cache.client.values, {})
+        self.channel.basic_nack.assert_called_once_with(delivery_tag=1, requeue=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
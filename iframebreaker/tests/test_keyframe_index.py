@@ -0,0 +1,75 @@
+import math
+import struct
+import unittest
+from unittest.mock import Mock
+from minio.error import S3Error
+from storage.keyframe_index import (
+    KeyframeIndex, KeyframeIndexError, decode, encode, is_sidecar, read_keyframe_index, sidecar_name
+)
+
+
+class TestKeyframeIndex(unittest.TestCase):
+    def test_round_trip_with_offsets(self):
+        index = KeyframeIndex([0.0, 2.002, 4.004], 5.5, [48, 90000, -1])
+
+        decoded = decode(encode(index))
+
+        self.assertEqual(list(decoded.keyframes), [0.0, 2.002, 4.004])
+        self.assertEqual(decoded.duration, 5.5)
+        self.assertEqual(list(decoded.offsets), [48, 90000, -1])
+
+    def test_round_trip_without_offsets_or_duration(self):
+        data = encode(KeyframeIndex([0.0, 1.0]))
+
+        self.assertEqual(len(data), 24 + 2 * 8)
+        decoded = decode(data)
+        self.assertIsNone(decoded.duration)
+        self.assertIsNone(decoded.offsets)
+
+    def test_layout_is_little_endian(self):
+        data = encode(KeyframeIndex([0.5], 1.0, [7]))
+
+        self.assertEqual(data[:8], b'KFIX\x01\x01\x00\x00')
+        self.assertEqual(struct.unpack('<Qddq', data[8:]), (1, 1.0, 0.5, 7))
+
+    def test_seek_returns_keyframe_at_or_before(self):
+        index = KeyframeIndex([0.0, 2.0, 4.0], 6.0, [10, -1, 30])
+
+        self.assertEqual(index.seek(3.9), (2.0, None))
+        self.assertEqual(index.seek(4.0), (4.0, 30))
+        self.assertEqual(index.seek(-1.0), (0.0, 10))
+        self.assertEqual(KeyframeIndex([0.0, 2.0]).seek(5.0), (2.0, None))
+
+    def test_rejects_foreign_and_truncated_data(self):
+        data = encode(KeyframeIndex([0.0, 2.0], 4.0, [0, 1]))
+        for bad in (b'', b'RIFF' + data[4:], data[:-1], data[:4] + b'\x02' + data[5:]):
+            with self.subTest(bad=bad[:8]):
+                with self.assertRaises(KeyframeIndexError):
+                    decode(bad)
+        with self.assertRaises(KeyframeIndexError):
+            encode(KeyframeIndex([0.0, 2.0], 4.0, [0]))
+
+    def test_sidecar_names(self):
+        self.assertEqual(sidecar_name('session/movie.mp4'), 'session/movie.mp4.kfidx')
+        self.assertTrue(is_sidecar('session/movie.mp4.kfidx'))
+        self.assertFalse(is_sidecar('session/movie.mp4'))
+
+    def test_read_from_minio(self):
+        client = Mock()
+        client.get_object.return_value.read.return_value = encode(KeyframeIndex([0.0, 2.0], math.pi))
+
+        index = read_keyframe_index(client, 'raw', 'session/movie.mp4')
+
+        client.get_object.assert_called_once_with('raw', 'session/movie.mp4.kfidx')
+        client.get_object.return_value.release_conn.assert_called_once()
+        self.assertEqual(index.duration, math.pi)
+
+    def test_missing_sidecar_reads_as_none(self):
+        client = Mock()
+        client.get_object.side_effect = S3Error('NoSuchKey', 'missing', 'session/movie.mp4.kfidx', None, None, None)
+
+        self.assertIsNone(read_keyframe_index(client, 'raw', 'session/movie.mp4'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,374 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+from config.config import Config
+from domain.models import SourceInfo, VideoAnalysis
+from main import warn_unsupported_settings
+from services.message_handler import MessageHandler
+from services.video_service import VideoService
+from storage.minio_client import MinioClient
+from storage.redis_client import RedisClient
+from messaging.rabbitmq_client import RabbitMQClient
+
+
+def ffprobe_output(keyframes, duration):
+    frames = [{"pts_time": f"{ts:.6f}"} for ts in keyframes]
+    return json.dumps({"frames": frames, "format": {"duration": f"{duration:.6f}"}})
+
+
+def upload_event(bucket='raw', key='session123/movie.mp4', etag=None):
+    s3_object = {"key": key, "eTag": etag} if etag else {"key": key}
+    return json.dumps({"Records": [{"s3": {"bucket": {"name": bucket}, "object": s3_object}}]}).encode('utf-8')
+
+
+class TestMessageHandler(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.minio_client = Mock(spec=MinioClient)
+        self.minio_client.find_presigned_url.return_value = ('http://minio/raw/session123/movie.mp4', 'session123/movie.mp4')
+        self.rabbitmq_client = Mock(spec=RabbitMQClient)
+        self.rabbitmq_client.publish_status.return_value = True
+        self.rabbitmq_client.publish_segments.return_value = True
+        self.handler = MessageHandler(self.config, self.minio_client, self.rabbitmq_client, VideoService(self.config))
+        self.channel = Mock()
+        self.method = Mock(delivery_tag=1)
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_probes_video_once_per_message(self, mock_run):
+        keyframes = [i * 2.0 for i in range(100)]
+        mock_run.return_value = Mock(stdout=ffprobe_output(keyframes, 200.0))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.assertEqual(mock_run.call_count, 1)
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+        self.rabbitmq_client.publish_segments.assert_called_once()
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_segment_payload_uses_probed_duration(self, mock_run):
+        keyframes = [i * 2.0 for i in range(50)]
+        mock_run.return_value = Mock(stdout=ffprobe_output(keyframes, 100.0))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        payloads = self.rabbitmq_client.publish_segments.call_args.args[0]
+        self.assertEqual(payloads[0]["total_video_duration"], 100.0)
+        self.assertEqual(payloads[0]["total_messages"], len(payloads))
+        self.assertEqual(payloads[0]["video_id"], 'session123')
+        self.assertNotIn("source", payloads[0])
+        self.assertNotIn("passthrough", payloads[0])
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_segment_payload_carries_source(self, mock_run):
+        output = json.loads(ffprobe_output([i * 2.0 for i in range(50)], 100.0))
+        output["streams"] = [{"codec_name": "h264", "width": 854, "height": 480, "avg_frame_rate": "25/1"}]
+        output["format"]["bit_rate"] = "1500000"
+        mock_run.return_value = Mock(stdout=json.dumps(output))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.assertEqual(mock_run.call_count, 1)
+        payloads = self.rabbitmq_client.publish_segments.call_args.args[0]
+        self.assertEqual(payloads[-1]["source"], {
+            "width": 854, "height": 480, "codec": "h264", "bitrate": 1500000, "fps": 25.0, "profile": None, "level": None
+        })
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_segments_are_published_with_duration_priority(self, mock_run):
+        mock_run.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(100)], 200.0))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.assertEqual(self.rabbitmq_client.publish_segments.call_args.kwargs['priority'], 7)
+
+    def test_filename_variants_resolve_with_one_lookup(self):
+        presigned_url, key = self.handler._resolve_presigned_url('raw', 'session123/My+Movie.mp4')
+
+        self.assertEqual(key, 'session123/movie.mp4')
+        self.minio_client.find_presigned_url.assert_called_once()
+        bucket, prefix, candidates = self.minio_client.find_presigned_url.call_args.args
+        self.assertEqual((bucket, prefix), ('raw', 'session123/'))
+        self.assertEqual(list(candidates), [
+            'session123/My+Movie.mp4', 'session123/My Movie.mp4', 'session123/my+movie.mp4', 'session123/my movie.mp4'
+        ])
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_unconfirmed_batch_requeues_upload(self, mock_run):
+        mock_run.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(50)], 100.0))
+        self.rabbitmq_client.publish_segments.return_value = False
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.channel.basic_nack.assert_called_once_with(delivery_tag=1, requeue=True)
+        self.assertEqual(self.rabbitmq_client.publish_status.call_args.args[1], 'failed')
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_keyframe_index_sidecar_is_written(self, mock_run):
+        self.config.KEYFRAME_INDEX_SIDECAR = True
+        self.minio_client.object_exists.return_value = False
+        mock_run.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(50)], 100.0))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        bucket, key, index = self.minio_client.put_keyframe_index.call_args.args
+        self.assertEqual((bucket, key), ('raw', 'session123/movie.mp4'))
+        self.assertEqual((len(index), index.duration, index.offsets), (50, 100.0, None))
+        self.minio_client.object_exists.assert_called_once_with('raw', 'session123/movie.mp4.kfidx')
+
+    def test_sidecar_takes_offsets_from_the_analysis(self):
+        self.config.KEYFRAME_INDEX_SIDECAR = True
+        self.minio_client.object_exists.return_value = True
+        analysis = VideoAnalysis(keyframes=[0.0, 2.0, 4.0], duration=6.0, cut_points=[0.0, 2.0, 4.0, 6.0], offsets=[48, 9000, -1])
+
+        with patch.object(self.handler.video_service, 'analyze_video', return_value=analysis):
+            self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        index = self.minio_client.put_keyframe_index.call_args.args[2]
+        self.assertEqual(list(index.offsets), [48, 9000, -1])
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_sidecar_without_offsets_does_not_replace_existing(self, mock_run):
+        self.config.KEYFRAME_INDEX_SIDECAR = True
+        self.minio_client.object_exists.return_value = True
+        mock_run.return_value = Mock(stdout=ffprobe_output([i * 2.0 for i in range(50)], 100.0))
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.minio_client.put_keyframe_index.assert_not_called()
+        self.rabbitmq_client.publish_segments.assert_called_once()
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_sidecar_upload_events_are_ignored(self, mock_run):
+        self.handler.process_video_message(self.channel, self.method, None, upload_event(key='session123/movie.mp4.kfidx'))
+
+        mock_run.assert_not_called()
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+        self.rabbitmq_client.publish_status.assert_not_called()
+
+
+class TestPipelinedMessageHandler(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.PIPELINED_PUBLISHING = True
+        self.minio_client = Mock(spec=MinioClient)
+        self.minio_client.find_presigned_url.return_value = ('http://minio/raw/session123/movie.mp4', 'session123/movie.mp4')
+        self.rabbitmq_client = Mock(spec=RabbitMQClient)
+        self.rabbitmq_client.publish_status.return_value = True
+        self.redis_client = Mock(spec=RedisClient)
+        self.redis_client.set_total_jobs.return_value = True
+        self.redis_client.get_completed_jobs.return_value = {}
+        self.video_service = Mock(spec=VideoService)
+        self.video_service.extract_video_id.side_effect = VideoService.extract_video_id
+        self.video_service.get_video_header.return_value = (200.0, None)
+        self.handler = MessageHandler(
+            self.config, self.minio_client, self.rabbitmq_client, self.video_service, self.redis_client
+        )
+        self.channel = Mock()
+        self.method = Mock(delivery_tag=1)
+        self.events = []
+
+    def _batches(self, batches):
+        for batch in batches:
+            self.events.append(('batch', batch))
+            yield batch
+
+    def test_publishes_each_batch_before_next_is_produced(self):
+        batches = [[0.0, 8.0, 60.0], [60.0, 68.0, 120.0], [120.0, 128.0]]
+        self.video_service.stream_batches.return_value = self._batches(batches)
+        self.rabbitmq_client.publish_segments.side_effect = lambda payloads, **kwargs: self.events.append(('publish', payloads[0]['timestamps'])) or True
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.assertEqual(self.events, [
+            ('batch', batches[0]), ('publish', batches[0]),
+            ('batch', batches[1]), ('publish', batches[1]),
+            ('batch', batches[2]), ('publish', batches[2]),
+        ])
+        payloads = [call.args[0][0] for call in self.rabbitmq_client.publish_segments.call_args_list]
+        self.assertEqual([p['message_id'] for p in payloads], [1, 2, 3])
+        self.assertTrue(all(p['total_messages'] == 0 for p in payloads))
+        self.redis_client.set_total_jobs.assert_called_once_with('session123', 3)
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=1)
+
+    def test_header_probe_source_is_in_every_payload(self):
+        self.video_service.get_video_header.return_value = (200.0, SourceInfo(width=640, height=360, codec='h264'))
+        self.video_service.stream_batches.return_value = iter([[0.0, 8.0], [8.0, 16.0]])
+        self.rabbitmq_client.publish_segments.return_value = True
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        payloads = [call.args[0][0] for call in self.rabbitmq_client.publish_segments.call_args_list]
+        self.assertEqual([p['source']['height'] for p in payloads], [360, 360])
+
+    def test_announces_resolutions_finished_before_total_was_known(self):
+        self.video_service.stream_batches.return_value = iter([[0.0, 8.0], [8.0, 16.0]])
+        self.rabbitmq_client.publish_segments.return_value = True
+        self.redis_client.get_completed_jobs.return_value = {'240': 2, '720': 1}
+        self.redis_client.claim_playlist_notification.return_value = True
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.redis_client.claim_playlist_notification.assert_called_once_with('session123', '240')
+        self.rabbitmq_client.publish_playlist_ready.assert_called_once_with('session123', '240')
+
+    def test_probe_failure_mid_stream_marks_video_failed(self):
+        def failing_batches():
+            yield [0.0, 8.0]
+            raise RuntimeError("ffprobe died")
+
+        self.video_service.stream_batches.return_value = failing_batches()
+        self.rabbitmq_client.publish_segments.return_value = True
+
+        self.handler.process_video_message(self.channel, self.method, None, upload_event())
+
+        self.channel.basic_nack.assert_called_once_with(delivery_tag=1, requeue=False)
+        self.redis_client.set_total_jobs.assert_not_called()
+        self.assertEqual(self.rabbitmq_client.publish_status.call_args.args[1], 'failed')
+
+    def test_settings_needing_all_cut_points_are_warned_about(self):
+        self.config.BATCH_STRATEGY = 'balanced'
+        self.config.PASSTHROUGH = True
+
+        with self.assertLogs(level='WARNING') as logs:
+            warn_unsupported_settings(self.config)
+
+        output = "\n".join(logs.output)
+        self.assertIn("BATCH_STRATEGY=balanced", output)
+        self.assertIn("PASSTHROUGH", output)
+
+
+class TestBatchTimestamps(unittest.TestCase):
+    def test_iter_batches_matches_batch_timestamps(self):
+        timestamps = [float(t) for t in range(0, 400, 7)]
+        for span in (10.0, 60.0, 500.0):
+            self.assertEqual(list(VideoService.iter_batches(iter(timestamps), span)),
+                             VideoService.batch_timestamps(timestamps, span))
+
+    def test_batches_overlap_on_boundaries(self):
+        batches = VideoService.batch_timestamps([0.0, 30.0, 60.0, 90.0, 120.0], 60.0)
+        self.assertEqual(batches, [[0.0, 30.0, 60.0], [60.0, 90.0, 120.0]])
+
+
+class TestBalancedBatches(unittest.TestCase):
+    def assert_covers(self, batches, timestamps):
+        joined = batches[0] + [ts for batch in batches[1:] for ts in batch[1:]]
+        self.assertEqual(joined, timestamps)
+        for previous, batch in zip(batches, batches[1:]):
+            self.assertEqual(previous[-1], batch[0])
+
+    def test_short_tail_is_spread_across_jobs(self):
+        timestamps = [float(t) for t in range(0, 61, 5)] + [61.0]
+        self.assertEqual([b[-1] - b[0] for b in VideoService.batch_timestamps(timestamps, 60.0)], [60.0, 1.0])
+
+        batches = VideoService.batches_within(timestamps, 60.0)
+
+        self.assert_covers(batches, timestamps)
+        self.assertEqual([b[-1] - b[0] for b in batches], [30.0, 31.0])
+
+    def test_target_jobs_have_near_equal_duration(self):
+        # three hours of 5-8 second segments
+        timestamps, ts = [0.0], 0.0
+        while ts < 3 * 3600:
+            ts += 5.0 + (len(timestamps) * 7919 % 31) / 10
+            timestamps.append(round(ts, 3))
+
+        batches = VideoService.balanced_batches(timestamps, 8)
+
+        self.assertEqual(len(batches), 8)
+        self.assert_covers(batches, timestamps)
+        share = (timestamps[-1] - timestamps[0]) / 8
+        for batch in batches:
+            self.assertLessEqual(abs(batch[-1] - batch[0] - share), 8.0)
+
+    def test_more_jobs_than_segments(self):
+        self.assertEqual(VideoService.balanced_batches([0.0, 5.0, 10.0], 10), [[0.0, 5.0], [5.0, 10.0]])
+
+    def test_batches_within_respects_max_job_duration(self):
+        timestamps = [0.0, 8.0, 9.0, 17.0, 18.0, 26.0, 27.0]
+
+        batches = VideoService.batches_within(timestamps, 10.0)
+
+        self.assert_covers(batches, timestamps)
+        self.assertTrue(all(b[-1] - b[0] <= 10.0 for b in batches))
+
+    def test_batches_within_long_video_uses_fewest_fitting_jobs(self):
+        timestamps = [float(t) for t in range(0, 6 * 3600, 6)]
+
+        batches = VideoService.batches_within(timestamps, 60.0)
+
+        self.assert_covers(batches, timestamps)
+        self.assertEqual(len(batches), 360)
+        self.assertTrue(all(b[-1] - b[0] <= 60.0 for b in batches))
+
+    def test_batches_within_rejects_non_positive_limit(self):
+        for limit in (0.0, -5.0):
+            with self.assertRaises(ValueError):
+                VideoService.batches_within([0.0, 5.0, 10.0], limit)
+
+    def test_non_positive_max_job_seconds_is_rejected_by_config(self):
+        with patch.dict('os.environ', {'BATCH_MAX_JOB_SECONDS': '0'}):
+            with self.assertRaises(ValueError):
+                Config()
+
+    def test_strategy_is_configurable(self):
+        config = Config()
+        config.BATCH_STRATEGY = 'balanced'
+        config.BATCH_TARGET_JOBS = 4
+        timestamps = [float(t) for t in range(0, 200, 5)]
+
+        self.assertEqual(len(VideoService(config).batch_cut_points(timestamps)), 4)
+        config.BATCH_STRATEGY = 'span'
+        self.assertEqual(VideoService(config).batch_cut_points(timestamps), VideoService.batch_timestamps(timestamps, config.MESSAGE_SPAN_SECONDS))
+
+
+
+class TestPassthrough(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.PASSTHROUGH = True
+        self.service = VideoService(self.config)
+
+    def analysis(self, cut_points=(0.0, 6.0, 12.0, 18.0), **source):
+        fields = dict(width=1280, height=720, codec='h264', profile='High', level=31)
+        fields.update(source)
+        return VideoAnalysis(keyframes=list(cut_points), duration=cut_points[-1], cut_points=list(cut_points), source=SourceInfo(**fields))
+
+    def test_compliant_h264_is_copied(self):
+        self.assertTrue(self.service.passthrough_compatible(self.analysis()))
+
+    def test_disabled_by_default(self):
+        self.assertFalse(VideoService(Config()).passthrough_compatible(self.analysis()))
+
+    def test_incompatible_sources_are_encoded(self):
+        for source in (dict(codec='hevc'), dict(profile='High 10'), dict(level=51), dict(level=None), dict(height=None)):
+            with self.subTest(**source):
+                self.assertFalse(self.service.passthrough_compatible(self.analysis(**source)))
+
+    def test_sparse_keyframes_are_encoded(self):
+        self.assertFalse(self.service.passthrough_compatible(self.analysis(cut_points=(0.0, 6.0, 18.0))))
+
+    def test_no_source_is_encoded(self):
+        analysis = VideoAnalysis(keyframes=[0.0, 6.0], duration=6.0, cut_points=[0.0, 6.0])
+        self.assertFalse(self.service.passthrough_compatible(analysis))
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_payloads_are_marked(self, mock_run):
+        output = json.loads(ffprobe_output([i * 2.0 for i in range(50)], 100.0))
+        output["streams"] = [{"codec_name": "h264", "profile": "Main", "level": 40, "width": 1920, "height": 1080}]
+        mock_run.return_value = Mock(stdout=json.dumps(output))
+        rabbitmq_client = Mock(spec=RabbitMQClient)
+        rabbitmq_client.publish_status.return_value = True
+        rabbitmq_client.publish_segments.return_value = True
+        minio_client = Mock(spec=MinioClient)
+        minio_client.find_presigned_url.return_value = ('http://minio/raw/session123/movie.mp4', 'session123/movie.mp4')
+        handler = MessageHandler(self.config, minio_client, rabbitmq_client, self.service)
+
+        handler.process_video_message(Mock(), Mock(delivery_tag=1), None, upload_event())
+
+        payloads = rabbitmq_client.publish_segments.call_args.args[0]
+        self.assertTrue(all(p["passthrough"] for p in payloads))
+        self.assertEqual((payloads[0]["source"]["profile"], payloads[0]["source"]["level"]), ("Main", 40))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+from unittest.mock import Mock, patch
+from minio.error import S3Error
+from config.config import Config
+from storage.keyframe_index import KeyframeIndex, decode
+from storage.minio_client import MinioClient
+
+
+def no_such_key():
+    return S3Error('NoSuchKey', 'missing', None, None, None, Mock())
+
+
+class TestMinioClientCaches(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        patcher = patch('storage.minio_client.Minio')
+        self.minio = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.minio.bucket_exists.return_value = True
+        self.minio.presigned_get_object.side_effect = lambda bucket, key, expires: f'http://minio/{bucket}/{key}?sig'
+        self.client = MinioClient(self.config)
+
+    def test_repeated_key_is_signed_once(self):
+        first = self.client.get_presigned_url('raw', 'session/movie.mp4')
+        second = self.client.get_presigned_url('raw', 'session/movie.mp4')
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.minio.stat_object.call_count, 1)
+        self.assertEqual(self.minio.presigned_get_object.call_count, 1)
+        self.assertEqual(self.client.cache_stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_bucket_existence_is_checked_once_per_ttl(self):
+        for i in range(4):
+            self.client.get_presigned_url('raw', f'session/movie{i}.mp4')
+
+        self.assertEqual(self.minio.bucket_exists.call_count, 1)
+
+        with patch('storage.minio_client.time.monotonic', return_value=10**9):
+            self.client.get_presigned_url('raw', 'session/other.mp4')
+        self.assertEqual(self.minio.bucket_exists.call_count, 2)
+
+    def test_missing_bucket_is_not_cached(self):
+        self.minio.bucket_exists.return_value = False
+
+        self.assertIsNone(self.client.get_presigned_url('raw', 'session/movie.mp4'))
+        self.assertIsNone(self.client.get_presigned_url('raw', 'session/movie.mp4'))
+        self.assertEqual(self.minio.bucket_exists.call_count, 2)
+
+    def test_missing_object_is_not_cached(self):
+        self.minio.stat_object.side_effect = no_such_key()
+
+        self.assertIsNone(self.client.get_presigned_url('raw', 'session/movie.mp4'))
+        self.minio.stat_object.side_effect = None
+        self.assertIsNotNone(self.client.get_presigned_url('raw', 'session/movie.mp4'))
+
+    def test_url_is_resigned_within_safety_margin(self):
+        self.config.PRESIGNED_URL_CACHE_SECONDS = 10**6
+        client = MinioClient(self.config)
+        lifetime = self.config.PRESIGNED_URL_EXPIRY_HOURS * 3600 - self.config.PRESIGNED_URL_CACHE_MARGIN_SECONDS
+
+        with patch('storage.minio_client.time.monotonic', return_value=1000):
+            client.get_presigned_url('raw', 'session/movie.mp4')
+        with patch('storage.minio_client.time.monotonic', return_value=1000 + lifetime - 1):
+            client.get_presigned_url('raw', 'session/movie.mp4')
+        self.assertEqual(self.minio.presigned_get_object.call_count, 1)
+
+        with patch('storage.minio_client.time.monotonic', return_value=1000 + lifetime):
+            client.get_presigned_url('raw', 'session/movie.mp4')
+        self.assertEqual(self.minio.presigned_get_object.call_count, 2)
+
+    def test_url_is_only_reused_for_the_cache_window(self):
+        window = self.config.PRESIGNED_URL_CACHE_SECONDS
+        self.assertLessEqual(window, 3600)
+
+        with patch('storage.minio_client.time.monotonic', return_value=1000):
+            self.client.get_presigned_url('raw', 'session/movie.mp4')
+        with patch('storage.minio_client.time.monotonic', return_value=1000 + window):
+            self.client.get_presigned_url('raw', 'session/movie.mp4')
+
+        self.assertEqual(self.minio.presigned_get_object.call_count, 2)
+
+    def test_cache_is_bounded(self):
+        self.config.PRESIGNED_URL_CACHE_SIZE = 2
+        client = MinioClient(self.config)
+
+        for name in ('a', 'b', 'c'):
+            client.get_presigned_url('raw', f'session/{name}.mp4')
+        client.get_presigned_url('raw', 'session/a.mp4')
+
+        self.assertEqual(client.cache_stats()['size'], 2)
+        self.assertEqual(client.cache_stats()['hits'], 0)
+
+
+class TestFindPresignedUrl(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('storage.minio_client.Minio')
+        self.minio = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.minio.presigned_get_object.side_effect = lambda bucket, key, expires: f'http://minio/{bucket}/{key}?sig'
+        self.client = MinioClient(Config())
+
+    def listing(self, *names):
+        self.minio.list_objects.return_value = [Mock(object_name=name) for name in names]
+
+    def test_matches_variant_with_one_listing(self):
+        self.listing('session/my movie.mp4', 'session/other.mp4')
+
+        url, name = self.client.find_presigned_url(
+            'raw', 'session/', ['session/my+movie.mp4', 'session/my movie.mp4', 'session/my_movie.mp4']
+        )
+
+        self.assertEqual(name, 'session/my movie.mp4')
+        self.assertEqual(url, 'http://minio/raw/session/my movie.mp4?sig')
+        self.minio.list_objects.assert_called_once_with('raw', prefix='session/', recursive=True)
+        self.minio.bucket_exists.assert_not_called()
+        self.minio.stat_object.assert_not_called()
+
+    def test_cached_variant_skips_listing(self):
+        self.listing('session/movie.mp4')
+        self.client.find_presigned_url('raw', 'session/', ['session/movie.mp4'])
+        self.client.find_presigned_url('raw', 'session/', ['session/movie.mp4'])
+
+        self.assertEqual(self.minio.list_objects.call_count, 1)
+
+    def test_each_lookup_counts_one_hit_or_miss(self):
+        self.listing('session/my_movie.mp4')
+        candidates = ['session/my+movie.mp4', 'session/my movie.mp4', 'session/my_movie.mp4']
+
+        self.client.find_presigned_url('raw', 'session/', candidates)
+        self.client.find_presigned_url('raw', 'session/', candidates)
+
+        self.assertEqual(self.client.cache_stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_no_match_returns_none(self):
+        self.listing('session/other.mp4')
+
+        self.assertEqual(self.client.find_presigned_url('raw', 'session/', ['session/movie.mp4']), (None, None))
+
+    def test_missing_bucket_returns_none(self):
+        self.minio.list_objects.side_effect = S3Error('NoSuchBucket', 'missing', None, None, None, Mock())
+
+        self.assertEqual(self.client.find_presigned_url('raw', 'session/', ['session/movie.mp4']), (None, None))
+
+
+
+class TestKeyframeIndexSidecar(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('storage.minio_client.Minio')
+        self.minio = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.client = MinioClient(Config())
+
+    def test_sidecar_is_put_next_to_upload(self):
+        self.assertTrue(self.client.put_keyframe_index('raw', 'session/movie.mp4', KeyframeIndex([0.0, 2.0], 4.0)))
+
+        bucket, name, stream, length = self.minio.put_object.call_args.args
+        self.assertEqual((bucket, name), ('raw', 'session/movie.mp4.kfidx'))
+        self.assertEqual(list(decode(stream.read()).keyframes), [0.0, 2.0])
+        self.assertEqual(length, 24 + 16)
+
+    def test_put_failure_is_reported_not_raised(self):
+        self.minio.put_object.side_effect = S3Error('AccessDenied', 'denied', None, None, None, Mock())
+
+        self.assertFalse(self.client.put_keyframe_index('raw', 'session/movie.mp4', KeyframeIndex([0.0])))
+
+    def test_object_exists(self):
+        self.assertTrue(self.client.object_exists('raw', 'session/movie.mp4.kfidx'))
+        self.minio.stat_object.side_effect = no_such_key()
+        self.assertFalse(self.client.object_exists('raw', 'session/movie.mp4.kfidx'))
+
+
+if __name__ == '__main__':
+    unittest.main()
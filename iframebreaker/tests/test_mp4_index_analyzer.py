@@ -0,0 +1,225 @@
+import re
+import struct
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+from domain.interfaces import VideoAnalyzer
+from domain.models import SourceInfo
+from infrastructure.mp4_index_analyzer import Mp4IndexVideoAnalyzer
+
+
+def box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+
+def full_box(kind: bytes, payload: bytes, version: int = 0) -> bytes:
+    return box(kind, struct.pack('>B3x', version) + payload)
+
+
+def build_mp4(sample_count, sample_delta, timescale, sync_every=None, ctts_offset=None, edits=None,
+              movie_timescale=1000, mdat_size=1 << 20, moov_first=False, sample_entry=None, samples_per_chunk=None):
+    """Minimal progressive MP4: ftyp, mdat and a moov with one audio and one video track.
+
+    With ``samples_per_chunk`` the track gets chunk tables: 1000-byte samples in
+    chunks starting every 10000 bytes from offset 4096.
+    """
+    duration_in_media = sample_count * sample_delta
+    movie_duration = duration_in_media * movie_timescale // timescale
+
+    stbl = [
+        full_box(b'stsd', struct.pack('>I', 1) + sample_entry if sample_entry else struct.pack('>I', 0)),
+        full_box(b'stts', struct.pack('>III', 1, sample_count, sample_delta)),
+        full_box(b'stsz', struct.pack('>II', 1000, sample_count)),
+    ]
+    if sync_every:
+        syncs = list(range(1, sample_count + 1, sync_every))
+        stbl.append(full_box(b'stss', struct.pack(f'>I{len(syncs)}I', len(syncs), *syncs)))
+    if ctts_offset is not None:
+        stbl.append(full_box(b'ctts', struct.pack('>III', 1, sample_count, ctts_offset)))
+    if samples_per_chunk:
+        chunks = -(-sample_count // samples_per_chunk)
+        stbl.append(full_box(b'stsc', struct.pack('>IIII', 1, 1, samples_per_chunk, 1)))
+        stbl.append(full_box(b'stco', struct.pack(f'>I{chunks}I', chunks, *(4096 + c * 10000 for c in range(chunks)))))
+
+    def track(handler: bytes, tables) -> bytes:
+        mdia = box(b'mdia', b''.join([
+            full_box(b'mdhd', struct.pack('>IIII', 0, 0, timescale, duration_in_media) + b'\0' * 4),
+            full_box(b'hdlr', struct.pack('>I4s12x', 0, handler) + b'name\0'),
+            box(b'minf', box(b'stbl', b''.join(tables))),
+        ]))
+        parts = [full_box(b'tkhd', b'\0' * 80)]
+        if edits and handler == b'vide':
+            entries = b''.join(struct.pack('>Iihh', duration, media_time, 1, 0) for duration, media_time in edits)
+            parts.append(box(b'edts', full_box(b'elst', struct.pack('>I', len(edits)) + entries)))
+        return box(b'trak', b''.join(parts + [mdia]))
+
+    moov = box(b'moov', b''.join([
+        full_box(b'mvhd', struct.pack('>IIII', 0, 0, movie_timescale, movie_duration) + b'\0' * 80),
+        track(b'soun', [full_box(b'stts', struct.pack('>I', 0)), full_box(b'stsz', struct.pack('>II', 0, 0))]),
+        track(b'vide', stbl),
+    ]))
+    ftyp = box(b'ftyp', b'isom\0\0\2\0isomiso2avc1mp41')
+    mdat = struct.pack('>I4s', 8 + mdat_size, b'mdat') + b'\0' * mdat_size
+    return ftyp + moov + mdat if moov_first else ftyp + mdat + moov
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serves ``server.files`` with single-range support and records every request."""
+
+    def do_GET(self):
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if not match or not self.server.honor_range:
+            self.server.requests.append((self.path, None))
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+        self.server.requests.append((self.path, (start, end)))
+        self.send_response(206)
+        self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(data[start:end + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_range_server(files, honor_range=True):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+    server.files = files
+    server.honor_range = honor_range
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestMp4IndexVideoAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.files = {}
+        self.server = start_range_server(self.files)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.fallback = Mock(spec=VideoAnalyzer)
+        self.fallback.extract_keyframes.return_value = ([0.0], 1.0)
+        self.analyzer = Mp4IndexVideoAnalyzer(fallback=self.fallback)
+
+    def url(self, name, data):
+        self.files[f'/{name}'] = data
+        return f'http://127.0.0.1:{self.server.server_port}/{name}'
+
+    def test_reads_keyframes_from_moov_at_end(self):
+        # 25 fps in a 12800 timescale, keyframe every 2 seconds
+        url = self.url('movie.mp4', build_mp4(250, 512, 12800, sync_every=50, mdat_size=4 << 20))
+
+        keyframes, duration = self.analyzer.extract_keyframes(url)
+
+        self.assertEqual(keyframes, [0.0, 2.0, 4.0, 6.0, 8.0])
+        self.assertEqual(duration, 10.0)
+        self.fallback.extract_keyframes.assert_not_called()
+        fetched = sum(end - start + 1 for _, (start, end) in self.server.requests)
+        self.assertLessEqual(len(self.server.requests), 3)
+        self.assertLess(fetched, 128 * 1024)
+
+    def test_probe_reads_source_from_sample_entry(self):
+        hvc1 = box(b'hvc1', b'\0' * 6 + struct.pack('>H', 1) + b'\0' * 16 + struct.pack('>HH', 1920, 1080) + b'\0' * 50)
+        url = self.url('hevc.mp4', build_mp4(250, 512, 12800, sync_every=50, mdat_size=1 << 20, sample_entry=hvc1))
+
+        _, duration, source = self.analyzer.probe(url)
+
+        self.assertEqual(duration, 10.0)
+        self.assertEqual((source.width, source.height, source.codec, source.fps), (1920, 1080, 'hevc', 25.0))
+        # No stream bitrate in the index, so the container's: file size over duration
+        self.assertAlmostEqual(source.bitrate, len(self.files['/hevc.mp4']) * 8 / 10.0, delta=1)
+
+    def test_probe_reads_avc_profile_and_level(self):
+        avcc = box(b'avcC', struct.pack('>BBBB', 1, 66, 0xC0, 30) + b'\xff\xe0\x00')
+        avc1 = box(b'avc1', b'\0' * 6 + struct.pack('>H', 1) + b'\0' * 16 + struct.pack('>HH', 640, 360) + b'\0' * 50 + avcc)
+        url = self.url('avc.mp4', build_mp4(250, 512, 12800, sync_every=50, sample_entry=avc1))
+
+        source = self.analyzer.probe(url)[2]
+
+        self.assertEqual((source.codec, source.height, source.profile, source.level), ('h264', 360, 'Constrained Baseline', 30))
+
+    def test_source_without_sample_entry_has_only_frame_rate(self):
+        url = self.url('movie.mp4', build_mp4(250, 512, 12800, sync_every=50))
+        source = self.analyzer.probe(url)[2]
+        self.assertEqual((source.width, source.height, source.codec, source.fps), (None, None, None, 25.0))
+
+    def test_keyframe_byte_offsets_from_chunk_tables(self):
+        url = self.url('chunked.mp4', build_mp4(250, 512, 12800, sync_every=50, samples_per_chunk=4))
+
+        keyframes, _, _, offsets = self.analyzer.probe_with_offsets(url)
+
+        self.assertEqual(keyframes, [0.0, 2.0, 4.0, 6.0, 8.0])
+        # Sample 50 is the third sample of chunk 12, sample 100 the first of chunk 25, ...
+        self.assertEqual(offsets, [4096, 126096, 254096, 376096, 504096])
+        self.assertEqual(len(self.analyzer.probe(url)), 3)
+
+    def test_offsets_come_from_fallback_for_other_containers(self):
+        url = self.url('movie.mkv', b'\x1a\x45\xdf\xa3' + b'\0' * 1024)
+        self.fallback.probe_with_offsets.return_value = ([0.0], 1.0, None, None)
+
+        self.assertEqual(self.analyzer.probe_with_offsets(url), ([0.0], 1.0, None, None))
+        self.fallback.probe_with_offsets.assert_called_once_with(url)
+
+    def test_moov_before_mdat_is_served_from_first_range(self):
+        url = self.url('faststart.mp4', build_mp4(250, 512, 12800, sync_every=50, moov_first=True))
+
+        keyframes, _ = self.analyzer.extract_keyframes(url)
+
+        self.assertEqual(keyframes, [0.0, 2.0, 4.0, 6.0, 8.0])
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_composition_offsets_and_edit_list_match_presentation_time(self):
+        # B-frame stream: every sample delayed by two frames, trimmed back by the edit list
+        url = self.url('bframes.mp4', build_mp4(250, 512, 12800, sync_every=50, ctts_offset=1024, edits=[(10000, 1024)]))
+
+        keyframes, _ = self.analyzer.extract_keyframes(url)
+
+        self.assertEqual(keyframes, [0.0, 2.0, 4.0, 6.0, 8.0])
+
+    def test_leading_empty_edit_delays_keyframes(self):
+        url = self.url('delayed.mp4', build_mp4(100, 1001, 30000, sync_every=30, edits=[(500, -1), (3336, 0)]))
+
+        keyframes, _ = self.analyzer.extract_keyframes(url)
+
+        self.assertEqual(keyframes, [0.0, 0.5, 1.501, 2.502, 3.503])
+
+    def test_track_without_stss_is_all_keyframes(self):
+        url = self.url('intra.mp4', build_mp4(5, 1, 25))
+
+        keyframes, _ = self.analyzer.extract_keyframes(url)
+
+        self.assertEqual(keyframes, [0.0, 0.04, 0.08, 0.12, 0.16])
+
+    def test_other_containers_fall_back(self):
+        url = self.url('movie.mkv', b'\x1a\x45\xdf\xa3' + b'\0' * 1024)
+
+        self.assertEqual(self.analyzer.extract_keyframes(url), ([0.0], 1.0))
+        self.fallback.extract_keyframes.assert_called_once_with(url)
+
+    def test_server_without_range_support_falls_back(self):
+        server = start_range_server({'/movie.mp4': build_mp4(250, 512, 12800, sync_every=50)}, honor_range=False)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_port}/movie.mp4'
+
+        self.analyzer.extract_keyframes(url)
+
+        self.fallback.extract_keyframes.assert_called_once_with(url)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import json
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from config.config import Config
+from messaging.scheduler import FairScheduler
+from messaging.worker_pool import ScheduledWorkerPool
+from services.cost_estimator import UploadCostEstimator
+from services.video_service import VideoService
+from storage.minio_client import MinioClient
+from tests.test_worker_pool import fake_channel
+
+
+def sized_event(key, size=None, user=None, etag=None):
+    s3_object = {"key": key}
+    if size is not None:
+        s3_object["size"] = size
+    if user:
+        s3_object["userMetadata"] = {"X-Amz-Meta-User-Id": user}
+    if etag:
+        s3_object["eTag"] = etag
+    return json.dumps({"Records": [{"s3": {"bucket": {"name": "raw"}, "object": s3_object}}]}).encode('utf-8')
+
+
+class TestFairScheduler(unittest.TestCase):
+    def test_shortest_job_first_within_a_user(self):
+        scheduler = FairScheduler(aging_seconds=0)
+        for name, cost in [("film", 7200.0), ("clip", 30.0), ("episode", 1500.0)]:
+            scheduler.push("alice", cost, name)
+
+        self.assertEqual([scheduler.pop() for _ in range(3)], ["clip", "episode", "film"])
+
+    def test_users_are_served_in_turn_by_cost(self):
+        scheduler = FairScheduler(aging_seconds=0)
+        for i in range(3):
+            scheduler.push("studio", 7200.0, f"film-{i}")
+        for i in range(3):
+            scheduler.push("bob", 30.0, f"clip-{i}")
+
+        order = [scheduler.pop() for _ in range(6)]
+
+        # one film costs the studio more than all of bob's clips together
+        self.assertEqual(order, ["film-0", "clip-0", "clip-1", "clip-2", "film-1", "film-2"])
+
+    def test_returning_user_does_not_bank_idle_time(self):
+        scheduler = FairScheduler(aging_seconds=0)
+        scheduler.push("alice", 100.0, "a1")
+        scheduler.push("alice", 100.0, "a2")
+        scheduler.push("alice", 100.0, "a3")
+        self.assertEqual(scheduler.pop(), "a1")
+        self.assertEqual(scheduler.pop(), "a2")
+
+        scheduler.push("bob", 100.0, "b1")
+        scheduler.push("bob", 100.0, "b2")
+
+        self.assertEqual([scheduler.pop() for _ in range(3)], ["a3", "b1", "b2"])
+
+    def test_waiting_discounts_cost(self):
+        scheduler = FairScheduler(aging_seconds=10)
+        with patch('messaging.scheduler.time.monotonic', return_value=0.0):
+            scheduler.push("alice", 100.0, "old-film")
+        with patch('messaging.scheduler.time.monotonic', return_value=990.0):
+            scheduler.push("alice", 5.0, "new-clip")
+            self.assertEqual(scheduler.pop(), "old-film")
+
+    def test_empty_scheduler_raises(self):
+        with self.assertRaises(IndexError):
+            FairScheduler(aging_seconds=0).pop()
+
+
+class TestScheduledWorkerPool(unittest.TestCase):
+    def test_waiting_deliveries_run_cheapest_first(self):
+        release = threading.Event()
+        started = threading.Event()
+        finished = threading.Event()
+        order = []
+
+        def callback(ch, method, properties, body):
+            if body == b'blocker':
+                started.set()
+                release.wait(5)
+            order.append(body)
+            if len(order) == 4:
+                finished.set()
+
+        costs = {b'blocker': 0.0, b'film': 7200.0, b'clip': 30.0, b'episode': 1500.0}
+        pool = ScheduledWorkerPool(callback, 1, lambda body: ("alice", costs[body]), aging_seconds=0)
+        self.addCleanup(pool.shutdown)
+
+        pool.dispatch(fake_channel(), Mock(delivery_tag=1), None, b'blocker')
+        self.assertTrue(started.wait(5))
+        for body in (b'film', b'clip', b'episode'):
+            pool.dispatch(fake_channel(), Mock(delivery_tag=2), None, body)
+        release.set()
+        self.assertTrue(finished.wait(5))
+
+        self.assertEqual(order, [b'blocker', b'clip', b'episode', b'film'])
+
+
+class TestUploadCostEstimator(unittest.TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.SCHEDULER_BYTES_PER_SECOND = 1_000_000
+        self.minio_client = Mock(spec=MinioClient)
+        self.keyframe_cache = Mock()
+        self.keyframe_cache.get.return_value = None
+        self.estimator = UploadCostEstimator(self.config, self.minio_client, self.keyframe_cache)
+
+    def test_size_from_event_and_user_from_metadata(self):
+        self.assertEqual(self.estimator.estimate(sized_event('s1/film.mp4', size=3_000_000_000, user='u42')), ('u42', 3000.0))
+        self.minio_client.object_size.assert_not_called()
+
+    def test_cached_duration_wins(self):
+        self.keyframe_cache.get.return_value = ([0.0, 2.0], 95.5)
+
+        self.assertEqual(self.estimator.estimate(sized_event('s1/film.mp4', size=3_000_000_000, etag='e1')), ('s1', 95.5))
+
+    def test_stat_when_event_has_no_size(self):
+        self.minio_client.object_size.return_value = 50_000_000
+
+        self.assertEqual(self.estimator.estimate(sized_event('s1/clip.mp4')), ('s1', 50.0))
+        self.minio_client.object_size.assert_called_once_with('raw', 's1/clip.mp4')
+
+    def test_malformed_event_is_cheapest(self):
+        self.assertEqual(self.estimator.estimate(b'not json'), ('', 0.0))
+
+
+class TestSegmentPriority(unittest.TestCase):
+    def test_shorter_videos_rank_higher(self):
+        service = VideoService(Config())
+        priorities = [service.segment_priority(seconds) for seconds in (30, 90, 600, 3600, 3 * 3600, 48 * 3600)]
+
+        self.assertEqual(priorities, [9, 8, 6, 4, 2, 0])
+
+    def test_disabled(self):
+        config = Config()
+        config.SEGMENT_MAX_PRIORITY = 0
+        self.assertIsNone(VideoService(config).segment_priority(30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from domain.interfaces import VideoAnalyzer
+from infrastructure.scratch_download import DiskBudget, ScratchDownloadVideoAnalyzer
+from tests.test_mp4_index_analyzer import start_range_server
+
+
+class TestScratchDownloadVideoAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.data = os.urandom(300 * 1024 + 17)
+        self.server = start_range_server({'/movie.mkv': self.data})
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/movie.mkv'
+
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        self.scratch_dir = scratch.name
+
+        self.probed = []
+        self.inner = Mock(spec=VideoAnalyzer)
+        self.inner.extract_keyframes.side_effect = self._probe
+
+    def _probe(self, source):
+        if os.path.exists(source):
+            with open(source, 'rb') as f:
+                self.probed.append((source, f.read()))
+        else:
+            self.probed.append((source, None))
+        return [0.0, 4.0], 8.0
+
+    def analyzer(self, min_size=1024, budget=1 << 30, chunk=64 * 1024):
+        analyzer = ScratchDownloadVideoAnalyzer(inner=self.inner, budget=DiskBudget(budget))
+        analyzer.config.SCRATCH_DIR = self.scratch_dir
+        analyzer.config.SCRATCH_MIN_SIZE_BYTES = min_size
+        analyzer.downloader.chunk_bytes = chunk
+        analyzer.downloader.workers = 4
+        return analyzer
+
+    def test_large_object_is_probed_from_local_copy_and_deleted(self):
+        analyzer = self.analyzer()
+
+        self.assertEqual(analyzer.extract_keyframes(self.url), ([0.0, 4.0], 8.0))
+
+        source, content = self.probed[0]
+        self.assertTrue(source.startswith(self.scratch_dir))
+        self.assertEqual(content, self.data)
+        self.assertEqual(os.listdir(self.scratch_dir), [])
+        self.assertEqual(analyzer.budget.reserved_bytes, 0)
+        # one sizing request plus one ranged GET per 64 KiB chunk
+        self.assertEqual(len(self.server.requests), 1 + 5)
+
+    def test_small_object_is_probed_over_http(self):
+        self.analyzer(min_size=len(self.data) + 1).extract_keyframes(self.url)
+
+        self.assertEqual(self.probed, [(self.url, None)])
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_object_over_budget_is_probed_over_http(self):
+        budget = DiskBudget(len(self.data) * 2)
+        self.assertTrue(budget.try_reserve(len(self.data) + 1))
+        analyzer = ScratchDownloadVideoAnalyzer(inner=self.inner, budget=budget)
+        analyzer.config.SCRATCH_DIR = self.scratch_dir
+        analyzer.config.SCRATCH_MIN_SIZE_BYTES = 0
+
+        analyzer.extract_keyframes(self.url)
+
+        self.assertEqual(self.probed, [(self.url, None)])
+        self.assertEqual(budget.reserved_bytes, len(self.data) + 1)
+
+    def test_server_without_range_support_is_probed_over_http(self):
+        server = start_range_server({'/movie.mkv': self.data}, honor_range=False)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_port}/movie.mkv'
+
+        self.analyzer().extract_keyframes(url)
+
+        self.assertEqual(self.probed, [(url, None)])
+
+    def test_failed_download_cleans_up_and_probes_over_http(self):
+        analyzer = self.analyzer()
+        analyzer.downloader.download = Mock(side_effect=IOError('connection reset'))
+
+        analyzer.extract_keyframes(self.url)
+
+        self.assertEqual(self.probed, [(self.url, None)])
+        self.assertEqual(os.listdir(self.scratch_dir), [])
+        self.assertEqual(analyzer.budget.reserved_bytes, 0)
+
+    def test_unwritable_scratch_dir_releases_budget_and_probes_over_http(self):
+        analyzer = self.analyzer()
+
+        with patch('infrastructure.scratch_download.tempfile.mkstemp', side_effect=OSError(28, 'No space left on device')):
+            self.assertEqual(analyzer.extract_keyframes(self.url), ([0.0, 4.0], 8.0))
+
+        self.assertEqual(self.probed, [(self.url, None)])
+        self.assertEqual(analyzer.budget.reserved_bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
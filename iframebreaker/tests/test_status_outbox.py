@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from messaging.rabbitmq_client import RabbitMQClient
+from messaging.status_outbox import StatusOutbox
+
+
+class RecordingPublisher:
+    """publish_statuses stand-in: records batches and fails while ``failing`` is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.failing = False
+        self.gate = threading.Event()
+        self.gate.set()
+        self.published = threading.Event()
+
+    def publish_statuses(self, payloads):
+        self.gate.wait(5)
+        if self.failing:
+            self.failing = False
+            return list(payloads)
+        self.batches.append([(p['video_id'], p['status']) for p in payloads])
+        self.published.set()
+        return []
+
+    def keepalive(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestStatusOutbox(unittest.TestCase):
+    def setUp(self):
+        self.publisher = RecordingPublisher()
+        self.outbox = StatusOutbox(self.publisher, max_pending=3, batch_size=10, flush_interval=0.05)
+
+    def wait_for(self, predicate):
+        deadline = time.monotonic() + 5
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(predicate())
+
+    def test_publish_never_blocks_on_the_broker(self):
+        self.publisher.gate.clear()
+        self.outbox.start()
+        self.addCleanup(self.outbox.close)
+        self.outbox.publish_status('v1', 'processing')
+        self.wait_for(lambda: self.outbox.stats()['pending'] == 0)
+
+        start = time.perf_counter()
+        self.assertTrue(self.outbox.publish_status('v2', 'processing'))
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.publisher.gate.set()
+
+    def test_superseded_status_is_coalesced(self):
+        self.outbox.publish_status('v1', 'processing')
+        self.outbox.publish_status('v2', 'processing')
+        self.outbox.publish_status('v1', 'failed', error='probe failed')
+        self.outbox.start()
+        self.addCleanup(self.outbox.close)
+
+        self.assertTrue(self.publisher.published.wait(5))
+        self.assertEqual(self.publisher.batches[0], [('v2', 'processing'), ('v1', 'failed')])
+        self.assertEqual(self.outbox.stats()['coalesced'], 1)
+
+    def test_full_outbox_drops_oldest(self):
+        for video_id in ('v1', 'v2', 'v3', 'v4'):
+            self.outbox.publish_status(video_id, 'processing')
+
+        self.assertEqual(self.outbox.stats()['dropped'], 1)
+        self.outbox.start()
+        self.outbox.close()
+        self.assertEqual(self.publisher.batches, [[('v2', 'processing'), ('v3', 'processing'), ('v4', 'processing')]])
+
+    def test_unconfirmed_events_are_retried_unless_superseded(self):
+        self.publisher.failing = True
+        self.publisher.gate.clear()
+        self.outbox.publish_status('v1', 'processing')
+        self.outbox.publish_status('v2', 'processing')
+        self.outbox.start()
+        self.addCleanup(self.outbox.close)
+        self.wait_for(lambda: self.outbox.stats()['pending'] == 0)
+
+        self.outbox.publish_status('v1', 'failed')
+        self.publisher.gate.set()
+        self.wait_for(lambda: self.outbox.stats()['published'] == 2)
+
+        self.assertEqual(len(self.publisher.batches), 1)
+        self.assertEqual(sorted(self.publisher.batches[0]), [('v1', 'failed'), ('v2', 'processing')])
+
+    def test_close_flushes_pending_events(self):
+        self.outbox.start()
+        self.outbox.publish_status('v1', 'processing')
+        self.outbox.close()
+
+        self.assertEqual(self.publisher.batches, [[('v1', 'processing')]])
+
+
+class TestPublishStatuses(unittest.TestCase):
+    def test_unconfirmed_payloads_are_returned(self):
+        client = RabbitMQClient.__new__(RabbitMQClient)
+        client._ensure_connection = Mock(return_value=True)
+        client._record_success = Mock()
+        client.connection = Mock()
+        client._confirm_channel = Mock(connection=client.connection, is_open=True)
+        client._confirm_channel.publish_batch.return_value = [1]
+        payloads = [RabbitMQClient.status_payload('v1', 'processing'), RabbitMQClient.status_payload('v2', 'failed')]
+
+        self.assertEqual(client.publish_statuses(payloads), [payloads[1]])
+        client._confirm_channel.publish_batch.assert_called_once_with("video", "video.status", payloads)
+
+
+if __name__ == '__main__':
+    unittest.main()
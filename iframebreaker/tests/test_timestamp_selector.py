@@ -0,0 +1,204 @@
+import math
+import random
+import unittest
+from infrastructure.balanced_timestamp_selector import BalancedTimestampSelector
+from infrastructure.timestamp_selector import OptimalTimestampSelector, TwoPointerTimestampSelector
+from infrastructure.vectorized_timestamp_selector import NumpyTimestampSelector
+
+
+def random_keyframes(rng, count):
+    """Mix of regular GOPs, jittered GOPs and sparse scene-cut keyframes."""
+    kind = rng.choice(['regular', 'jittered', 'sparse'])
+    if kind == 'regular':
+        gop = rng.choice([0.04, 0.5, 1.0, 2.0, 4.0, 10.0])
+        return [round(i * gop, 6) for i in range(count)]
+    if kind == 'jittered':
+        gop = rng.choice([1.0, 2.0, 3.0])
+        return sorted(round(i * gop + rng.uniform(-0.4, 0.4), 3) for i in range(count))
+    return sorted(round(rng.uniform(0, count * 3.0), 3) for _ in range(count))
+
+
+class TestOptimalTimestampSelector(unittest.TestCase):
+    def setUp(self):
+        self.selector = OptimalTimestampSelector()
+
+    def test_empty_keyframes(self):
+        self.assertEqual(self.selector.select_optimal_timestamps([], 5.0, 8.0), [])
+
+    def test_single_keyframe(self):
+        self.assertEqual(self.selector.select_optimal_timestamps([0.0], 5.0, 8.0), [0.0])
+
+    def test_regular_gop_picks_last_candidate_in_window(self):
+        keyframes = [float(i * 2) for i in range(13)]
+        self.assertEqual(self.selector.select_optimal_timestamps(keyframes, 5.0, 8.0), [0.0, 8.0, 16.0, 24.0])
+
+    def test_sparse_keyframes_take_next_natural(self):
+        self.assertEqual(self.selector.select_optimal_timestamps([0.0, 20.0, 40.0], 5.0, 8.0), [0.0, 20.0, 40.0])
+
+    def test_streaming_matches_batch_selection(self):
+        rng = random.Random(1234)
+        for _ in range(500):
+            keyframes = random_keyframes(rng, rng.randint(0, 300))
+            min_period = rng.choice([1.0, 2.0, 5.0])
+            max_period = min_period + rng.choice([0.0, 1.0, 3.0, 6.0])
+
+            expected = self.selector.select_optimal_timestamps(keyframes, min_period, max_period)
+            streamed = list(self.selector.iter_optimal_timestamps(
+                iter(sorted(set(keyframes))), min_period, max_period
+            ))
+            self.assertEqual(streamed, expected, (keyframes, min_period, max_period))
+
+    def test_streaming_emits_before_input_ends(self):
+        def keyframes():
+            for i in range(10):
+                yield float(i * 2)
+            raise AssertionError("selector consumed more frames than needed")
+
+        iterator = self.selector.iter_optimal_timestamps(keyframes(), 5.0, 8.0)
+        self.assertEqual(next(iterator), 0.0)
+        self.assertEqual(next(iterator), 8.0)
+
+
+
+class TestFastSelectorsMatchReference(unittest.TestCase):
+    """Property test: the fast selectors must reproduce the reference selector exactly."""
+
+    def setUp(self):
+        self.reference = OptimalTimestampSelector()
+        self.selectors = [TwoPointerTimestampSelector(), NumpyTimestampSelector()]
+
+    def assert_same_selection(self, keyframes, min_period, max_period):
+        expected = self.reference.select_optimal_timestamps(keyframes, min_period, max_period)
+        for selector in self.selectors:
+            result = selector.select_optimal_timestamps(keyframes, min_period, max_period)
+            self.assertEqual(result, expected, (type(selector).__name__, keyframes, min_period, max_period))
+
+    def test_random_keyframes(self):
+        rng = random.Random(42)
+        for _ in range(2000):
+            keyframes = random_keyframes(rng, rng.randint(0, 200))
+            min_period = rng.choice([0.0, 0.1, 1.0, 2.0, 5.0])
+            max_period = min_period + rng.choice([0.0, 0.3, 1.0, 3.0, 6.0])
+            self.assert_same_selection(keyframes, min_period, max_period)
+
+    def test_unsorted_keyframes_with_duplicates(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            keyframes = random_keyframes(rng, rng.randint(1, 100))
+            keyframes = keyframes + rng.sample(keyframes, len(keyframes) // 3)
+            rng.shuffle(keyframes)
+            self.assert_same_selection(keyframes, 5.0, 8.0)
+
+    def test_float_rounding_at_window_edges(self):
+        keyframes = [round(i * 0.1, 10) for i in range(500)]
+        for min_period, max_period in [(0.2, 0.3), (0.3, 0.3), (0.1, 0.7), (5.0, 8.0)]:
+            self.assert_same_selection(keyframes, min_period, max_period)
+        self.assert_same_selection([0.0, 0.1, 0.30000000000000004, 0.7], 0.2, 0.3)
+
+    def test_inverted_and_degenerate_periods(self):
+        keyframes = [float(i) for i in range(30)]
+        for min_period, max_period in [(8.0, 5.0), (0.0, 0.0), (3.0, 0.0)]:
+            self.assert_same_selection(keyframes, min_period, max_period)
+
+
+def segment_cost(duration, target, weight):
+    return 1.0 + weight * ((duration - target) / target) ** 2
+
+
+def exhaustive_cost(frames, min_period, max_period, weight):
+    """Quadratic DP over every pair of keyframes, for checking the windowed one."""
+    span = frames[-1] - frames[0]
+    target = min(max(span / math.ceil(span / max_period), min_period), max_period)
+    cost = [0.0] + [math.inf] * (len(frames) - 1)
+    for i in range(len(frames)):
+        in_window = [j for j in range(i + 1, len(frames)) if min_period <= frames[j] - frames[i] <= max_period]
+        if not in_window:
+            in_window = [j for j in range(i + 1, len(frames)) if frames[j] - frames[i] > max_period][:1]
+        for j in in_window:
+            cost[j] = min(cost[j], cost[i] + segment_cost(frames[j] - frames[i], target, weight))
+    return cost[-1] if math.isfinite(cost[-1]) else None, target
+
+
+class TestBalancedTimestampSelector(unittest.TestCase):
+    def setUp(self):
+        self.selector = BalancedTimestampSelector(variance_weight=10.0)
+
+    def test_empty_and_single_keyframe(self):
+        self.assertEqual(self.selector.select_optimal_timestamps([], 5.0, 8.0), [])
+        self.assertEqual(self.selector.select_optimal_timestamps([3.0], 5.0, 8.0), [3.0])
+
+    def test_regular_gop_uses_fewest_segments(self):
+        keyframes = [float(i * 2) for i in range(13)]
+        self.assertEqual(self.selector.select_optimal_timestamps(keyframes, 5.0, 8.0), [0.0, 8.0, 16.0, 24.0])
+
+    def test_evens_out_segment_durations(self):
+        keyframes = [float(i) for i in range(26)]
+        cuts = self.selector.select_optimal_timestamps(keyframes, 5.0, 8.0)
+        durations = [b - a for a, b in zip(cuts, cuts[1:])]
+
+        self.assertEqual((cuts[0], cuts[-1]), (0.0, 25.0))
+        self.assertEqual(sorted(durations), [6.0, 6.0, 6.0, 7.0])
+
+    def test_sparse_keyframes_take_next_natural(self):
+        self.assertEqual(self.selector.select_optimal_timestamps([0.0, 20.0, 40.0], 5.0, 8.0), [0.0, 20.0, 40.0])
+        self.assertEqual(self.selector.select_optimal_timestamps([0.0, 0.1, 20.0], 5.0, 8.0), [0.0, 20.0])
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(99)
+        for _ in range(300):
+            keyframes = sorted(set(random_keyframes(rng, rng.randint(2, 120))))
+            if len(keyframes) < 2:
+                continue
+            min_period = rng.choice([1.0, 2.0, 5.0])
+            max_period = min_period + rng.choice([0.0, 1.0, 3.0])
+            cuts = self.selector.select_optimal_timestamps(keyframes, min_period, max_period)
+            expected, target = exhaustive_cost(keyframes, min_period, max_period, 10.0)
+
+            self.assertEqual(cuts[0], keyframes[0])
+            if expected is not None:
+                self.assertEqual(cuts[-1], keyframes[-1])
+                actual = sum(segment_cost(b - a, target, 10.0) for a, b in zip(cuts, cuts[1:]))
+                self.assertAlmostEqual(actual, expected, places=6, msg=(keyframes, min_period, max_period))
+            else:
+                self.assertLess(keyframes[-1] - cuts[-1], min_period)
+
+    def test_window_bounds_match_greedy_gaps(self):
+        # 9.91 - 8 rounds above 1.91, but the gap 9.91 - 1.91 is exactly 8.0
+        keyframes = [1.91, 2.49, 3.94, 9.91, 12.3, 15.5, 20.1]
+        self.assertEqual(self.selector.select_optimal_timestamps(keyframes, 3.0, 8.0), [1.91, 9.91, 15.5, 20.1])
+
+        greedy = TwoPointerTimestampSelector()
+        rng = random.Random(7)
+        for _ in range(500):
+            keyframes = sorted({round(rng.uniform(0, 60), 2) for _ in range(rng.randint(2, 40))})
+            min_period, max_period = rng.choice([(3.0, 8.0), (2.0, 4.0), (5.0, 5.1)])
+            reference = greedy.select_optimal_timestamps(keyframes, min_period, max_period)
+            if any(b - a > max_period for a, b in zip(reference, reference[1:])):
+                continue
+            cuts = self.selector.select_optimal_timestamps(keyframes, min_period, max_period)
+            for a, b in zip(cuts, cuts[1:]):
+                self.assertLessEqual(b - a, max_period, msg=(keyframes, min_period, max_period))
+
+    def test_dense_keyframes_are_relaxed_in_blocks(self):
+        keyframes = [round(i * 0.04, 6) for i in range(700)]
+        cuts = self.selector.select_optimal_timestamps(keyframes, 5.0, 8.0)
+        expected, target = exhaustive_cost(keyframes, 5.0, 8.0, 10.0)
+        durations = [b - a for a, b in zip(cuts, cuts[1:])]
+
+        self.assertEqual((cuts[0], cuts[-1]), (keyframes[0], keyframes[-1]))
+        self.assertEqual(len(durations), math.ceil(keyframes[-1] / 8.0))
+        self.assertLessEqual(max(durations) - min(durations), 0.04 + 1e-9)
+        self.assertAlmostEqual(sum(segment_cost(d, target, 10.0) for d in durations), expected, places=6)
+
+    def test_degenerate_periods_fall_back_to_greedy(self):
+        keyframes = [float(i) for i in range(30)]
+        reference = OptimalTimestampSelector()
+        for min_period, max_period in [(0.0, 3.0), (8.0, 5.0)]:
+            self.assertEqual(
+                self.selector.select_optimal_timestamps(keyframes, min_period, max_period),
+                reference.select_optimal_timestamps(keyframes, min_period, max_period)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import json
+import subprocess
+import sys
+import unittest
+from array import array
+from unittest.mock import Mock, patch
+from domain.models import SourceInfo
+from infrastructure.video_analyzer import FFProbeVideoAnalyzer, KeyframeStream, PacketFFProbeVideoAnalyzer, StreamingFFProbeVideoAnalyzer
+
+REAL_POPEN = subprocess.Popen
+
+
+def fake_ffprobe(script):
+    """Replace the ffprobe command with a Python one-liner producing the given output."""
+    def popen(command, **kwargs):
+        return REAL_POPEN([sys.executable, '-c', script], **kwargs)
+    return popen
+
+
+COMPACT_OUTPUT = (
+    "import sys\n"
+    "for i in range(1, 6):\n"
+    "    print(f'frame|pts_time={i * 2.0:.6f}', flush=True)\n"
+    "print('frame|pts_time=N/A')\n"
+    "print('stream|codec_name=h264|width=854|height=480|bit_rate=N/A|avg_frame_rate=30000/1001')\n"
+    "print('format|duration=11.500000|bit_rate=1200000')\n"
+)
+
+
+class TestKeyframeStream(unittest.TestCase):
+    def test_parse_frame_line(self):
+        self.assertEqual(KeyframeStream._parse_line('frame|pts_time=1.001000\n'), ('frame', 1.001))
+
+    def test_parse_format_line(self):
+        self.assertEqual(KeyframeStream._parse_line('format|duration=61.5'), ('format', 61.5))
+
+    def test_parse_unavailable_value(self):
+        self.assertEqual(KeyframeStream._parse_line('frame|pts_time=N/A'), ('frame', None))
+
+    def test_fields(self):
+        self.assertEqual(KeyframeStream._fields('stream|codec_name=hevc|width=3840\n'), {'codec_name': 'hevc', 'width': '3840'})
+
+
+class TestFFProbeVideoAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = FFProbeVideoAnalyzer()
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_probe_reads_source_from_same_run(self, mock_run):
+        mock_run.return_value = Mock(stdout=json.dumps({
+            "frames": [{"pts_time": "0.000000"}, {"pts_time": "2.000000"}],
+            "streams": [{"codec_name": "vp9", "width": 1280, "height": 720, "avg_frame_rate": "25/1"}],
+            "format": {"duration": "4.000000", "bit_rate": "2500000"}
+        }))
+
+        keyframes, duration, source = self.analyzer.probe('http://minio/video.webm')
+
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertEqual((keyframes, duration), ([0.0, 2.0], 4.0))
+        self.assertEqual(source, SourceInfo(width=1280, height=720, codec='vp9', bitrate=2500000, fps=25.0))
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_missing_stream_section_gives_no_source(self, mock_run):
+        mock_run.return_value = Mock(stdout=json.dumps({"frames": [{"pts_time": "0.0"}], "format": {"duration": "1.0"}}))
+        self.assertIsNone(self.analyzer.probe('http://minio/video.mp4')[2])
+
+    def test_unknown_frame_rate(self):
+        source = FFProbeVideoAnalyzer()._extract_source({"streams": [{"height": 480, "avg_frame_rate": "0/0"}]})
+        self.assertEqual(source, SourceInfo(height=480))
+
+    def test_profile_and_level(self):
+        source = FFProbeVideoAnalyzer()._extract_source({"streams": [{"codec_name": "h264", "profile": "High", "level": 41}]})
+        self.assertEqual((source.profile, source.level), ("High", 41))
+
+    def test_unknown_level(self):
+        source = FFProbeVideoAnalyzer()._extract_source({"streams": [{"codec_name": "vp9", "profile": "Profile 0", "level": -99}]})
+        self.assertIsNone(source.level)
+
+
+class TestStreamingFFProbeVideoAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = StreamingFFProbeVideoAnalyzer()
+
+    @patch('infrastructure.video_analyzer.subprocess.Popen', side_effect=fake_ffprobe(COMPACT_OUTPUT))
+    def test_stream_yields_keyframes_incrementally(self, _):
+        stream = self.analyzer.stream_keyframes('http://minio/video.mp4')
+        iterator = iter(stream)
+
+        self.assertEqual(next(iterator), 2.0)
+        self.assertIsNone(stream.duration)
+
+        remaining = list(iterator)
+        self.assertEqual(remaining, [4.0, 6.0, 8.0, 10.0])
+        self.assertEqual(stream.duration, 11.5)
+        self.assertIsInstance(stream.keyframes, array)
+
+    @patch('infrastructure.video_analyzer.subprocess.Popen', side_effect=fake_ffprobe(COMPACT_OUTPUT))
+    def test_extract_keyframes_starts_at_zero(self, _):
+        keyframes, duration = self.analyzer.extract_keyframes('http://minio/video.mp4')
+
+        self.assertEqual(list(keyframes), [0.0, 2.0, 4.0, 6.0, 8.0, 10.0])
+        self.assertEqual(duration, 11.5)
+
+    @patch('infrastructure.video_analyzer.subprocess.Popen', side_effect=fake_ffprobe(COMPACT_OUTPUT))
+    def test_probe_reads_source_after_frames(self, _):
+        _, _, source = self.analyzer.probe('http://minio/video.mp4')
+        self.assertEqual(source, SourceInfo(width=854, height=480, codec='h264', bitrate=1200000, fps=29.97))
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_probe_header(self, mock_run):
+        mock_run.return_value = Mock(stdout=(
+            "stream|codec_name=hevc|width=3840|height=2160|bit_rate=16000000|avg_frame_rate=60/1\n"
+            "format|duration=95.500000|bit_rate=16200000\n"
+        ))
+
+        duration, source = self.analyzer.probe_header('http://minio/video.mp4')
+
+        self.assertEqual(duration, 95.5)
+        self.assertEqual(source, SourceInfo(width=3840, height=2160, codec='hevc', bitrate=16000000, fps=60.0))
+        self.assertNotIn("frame=pts_time", " ".join(mock_run.call_args.args[0]))
+
+    @patch('infrastructure.video_analyzer.subprocess.Popen',
+           side_effect=fake_ffprobe("import sys; print('boom', file=sys.stderr); sys.exit(1)"))
+    def test_extract_keyframes_failure(self, _):
+        self.assertEqual(self.analyzer.extract_keyframes('http://minio/video.mp4'), (None, None))
+
+    @patch('infrastructure.video_analyzer.subprocess.Popen', side_effect=fake_ffprobe(
+        "import sys\n"
+        "for i in range(20000):\n"
+        "    print(f'[h264] error while decoding MB {i}', file=sys.stderr)\n"
+        "    print(f'frame|pts_time={i * 2.0:.6f}')\n"
+        "sys.exit(1)\n"
+    ))
+    def test_stderr_flood_does_not_block_stdout(self, _):
+        self.analyzer.config.FFPROBE_TIMEOUT_SECONDS = 10
+        stream = self.analyzer.stream_keyframes('http://minio/video.mp4')
+
+        with self.assertRaises(subprocess.CalledProcessError) as caught:
+            for _ in stream:
+                pass
+
+        self.assertEqual(len(stream.keyframes), 20000)
+        self.assertIn('error while decoding MB 19999', caught.exception.stderr)
+
+    @patch('infrastructure.video_analyzer.subprocess.Popen',
+           side_effect=fake_ffprobe("import time; print('frame|pts_time=0.0', flush=True); time.sleep(30)"))
+    def test_extract_keyframes_timeout(self, _):
+        self.analyzer.config.FFPROBE_TIMEOUT_SECONDS = 1
+        self.assertEqual(self.analyzer.extract_keyframes('http://minio/video.mp4'), (None, None))
+
+
+class TestPacketFFProbeVideoAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = PacketFFProbeVideoAnalyzer()
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_keeps_only_packets_flagged_keyframe(self, mock_run):
+        # Decode order with B-frames: keyframe packets are not sorted by pts
+        packets = [
+            {"pts_time": "0.080000", "flags": "K__"},
+            {"pts_time": "0.000000", "flags": "___"},
+            {"pts_time": "4.080000", "flags": "K_"},
+            {"pts_time": "2.080000", "flags": "K__"},
+            {"pts_time": "N/A", "flags": "K__"},
+            {"pts_time": "3.000000", "flags": "__"},
+        ]
+        mock_run.return_value = Mock(stdout=json.dumps({"packets": packets, "format": {"duration": "6.000000"}}))
+
+        keyframes, duration = self.analyzer.extract_keyframes('http://minio/video.mp4')
+
+        self.assertEqual(keyframes, [0.0, 0.08, 2.08, 4.08])
+        self.assertEqual(duration, 6.0)
+
+    @patch('infrastructure.video_analyzer.subprocess.run')
+    def test_does_not_decode_frames(self, mock_run):
+        mock_run.return_value = Mock(stdout=json.dumps({"packets": [], "format": {"duration": "1.0"}}))
+
+        self.analyzer.extract_keyframes('http://minio/video.mp4')
+
+        command = mock_run.call_args.args[0]
+        self.assertNotIn("-skip_frame", command)
+        self.assertTrue(any(arg.startswith("packet=pts_time,flags:") for arg in command))
+
+
+if __name__ == '__main__':
+    unittest.main()
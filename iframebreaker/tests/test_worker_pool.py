@@ -0,0 +1,132 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from config.config import Config
+from messaging.rabbitmq_client import RabbitMQClient
+from messaging.worker_pool import ThreadLocalRabbitMQClient, ThreadSafeChannel, WorkerPool
+
+
+class FakeConnection:
+    """Collects thread-safe callbacks so the test can run them as the connection thread would."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def add_callback_threadsafe(self, callback):
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def process_callbacks(self):
+        with self.lock:
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def fake_channel():
+    channel = Mock(is_open=True)
+    channel.connection = FakeConnection()
+    return channel
+
+
+class TestThreadSafeChannel(unittest.TestCase):
+    def test_ack_is_deferred_to_connection_thread(self):
+        channel = fake_channel()
+        proxy = ThreadSafeChannel(channel)
+
+        proxy.basic_ack(delivery_tag=7)
+        proxy.basic_nack(delivery_tag=8, requeue=False)
+
+        channel.basic_ack.assert_not_called()
+        channel.connection.process_callbacks()
+        channel.basic_ack.assert_called_once_with(delivery_tag=7, multiple=False)
+        channel.basic_nack.assert_called_once_with(delivery_tag=8, multiple=False, requeue=False)
+
+    def test_ack_skipped_when_channel_closed(self):
+        channel = fake_channel()
+        proxy = ThreadSafeChannel(channel)
+
+        proxy.basic_ack(delivery_tag=1)
+        channel.is_open = False
+        channel.connection.process_callbacks()
+
+        channel.basic_ack.assert_not_called()
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_messages_are_processed_concurrently(self):
+        workers = 4
+        barrier = threading.Barrier(workers, timeout=5)
+
+        def callback(ch, method, properties, body):
+            barrier.wait()
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+
+        channel = fake_channel()
+        pool = WorkerPool(callback, workers)
+        for tag in range(1, workers + 1):
+            pool.dispatch(channel, Mock(delivery_tag=tag), None, b'{}')
+        pool.shutdown(wait=True)
+
+        self.assertFalse(barrier.broken)
+        channel.connection.process_callbacks()
+        acked = sorted(call.kwargs['delivery_tag'] for call in channel.basic_ack.call_args_list)
+        self.assertEqual(acked, [1, 2, 3, 4])
+
+    def test_unhandled_error_requeues_message(self):
+        channel = fake_channel()
+        pool = WorkerPool(Mock(side_effect=RuntimeError("boom")), 1)
+
+        pool.dispatch(channel, Mock(delivery_tag=3), None, b'{}')
+        pool.shutdown(wait=True)
+        channel.connection.process_callbacks()
+
+        channel.basic_nack.assert_called_once_with(delivery_tag=3, multiple=False, requeue=True)
+
+
+class TestThreadLocalRabbitMQClient(unittest.TestCase):
+    def test_each_thread_gets_its_own_client(self):
+        clients = []
+        publisher = ThreadLocalRabbitMQClient(lambda: clients.append(Mock()) or clients[-1])
+
+        publisher.publish_status('video', 'processing')
+        publisher.publish_status('video', 'completed')
+        thread = threading.Thread(target=lambda: publisher.publish_status('video', 'processing'))
+        thread.start()
+        thread.join()
+        publisher.close()
+
+        self.assertEqual(len(clients), 2)
+        self.assertEqual(clients[0].publish_status.call_count, 2)
+        self.assertEqual(clients[1].publish_status.call_count, 1)
+        for client in clients:
+            client.close.assert_called_once_with()
+
+    def test_idle_connection_is_dropped_before_reuse(self):
+        client = Mock()
+        publisher = ThreadLocalRabbitMQClient(lambda: client, max_idle_seconds=30)
+
+        with patch('messaging.worker_pool.time.monotonic', side_effect=[100.0, 110.0, 200.0]):
+            publisher.publish_segments([{}])
+            publisher.publish_segments([{}])
+            client.disconnect.assert_not_called()
+            publisher.publish_segments([{}])
+
+        client.disconnect.assert_called_once_with()
+        self.assertEqual(client.publish_segments.call_count, 3)
+
+    def test_disconnect_does_not_count_a_failure(self):
+        client = RabbitMQClient(Config())
+        connection = Mock(is_open=True)
+        client.connection = connection
+
+        client.disconnect()
+
+        connection.close.assert_called_once_with()
+        self.assertIsNone(client.connection)
+        self.assertEqual(client.failure_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
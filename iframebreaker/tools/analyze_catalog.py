@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Add project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.video_service import VideoService
+from config.config import Config
+
+VIDEO_EXTENSIONS = {'.mp4', '.m4v', '.mov', '.mkv', '.webm', '.avi', '.ts', '.mts', '.mpg', '.mpeg', '.flv', '.wmv'}
+# The transcoder's default RESOLUTIONS
+DEFAULT_RESOLUTIONS = "240,360,480,720,1080"
+
+# One per worker process, built by init_worker
+_video_service: Optional[VideoService] = None
+
+
+def discover(inputs: Iterable[str], manifest: Optional[str] = None) -> List[str]:
+    """Video paths from directories (recursively, by extension), single files and a manifest.
+
+    Manifest lines are paths or URLs; blank lines and ``#`` comments are skipped and
+    relative paths are taken from the manifest's directory.
+    """
+    videos = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, _, files in os.walk(entry):
+                videos.extend(
+                    os.path.join(root, name) for name in sorted(files)
+                    if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS
+                )
+        else:
+            videos.append(entry)
+
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, encoding='utf-8') as lines:
+            for line in lines:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if '://' not in line and not os.path.isabs(line):
+                    line = os.path.join(base, line)
+                videos.append(line)
+
+    return list(dict.fromkeys(videos))
+
+
+def resolution_order(resolution: str):
+    match = re.fullmatch(r'(\d+)p?', resolution.strip())
+    return (0, int(match.group(1)), resolution) if match else (1, 0, resolution)
+
+
+def resolutions_for_height(resolutions: List[str], source_height: Optional[int]) -> List[str]:
+    """The renditions the transcoder produces for a source, as utils.ResolutionsUpToHeight picks them."""
+    if not source_height:
+        return list(resolutions)
+
+    kept, lowest = [], None
+    for resolution in resolutions:
+        named, height, _ = resolution_order(resolution)
+        if named or height <= source_height:
+            kept.append(resolution)
+        elif lowest is None or height < resolution_order(lowest)[1]:
+            lowest = resolution
+    if not kept and lowest:
+        kept.append(lowest)
+    return kept
+
+
+def init_worker(overrides: Dict[str, object]) -> None:
+    global _video_service
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    config = Config()
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    _video_service = VideoService(config)
+
+
+def analyze(path: str, resolutions: List[str]) -> dict:
+    """Probe one video and derive its cut points, segment messages and transcode jobs."""
+    start = time.perf_counter()
+    try:
+        analysis = _video_service.analyze_video(path)
+    except Exception as e:
+        return {"path": path, "error": str(e), "probe_seconds": time.perf_counter() - start}
+    probe_seconds = time.perf_counter() - start
+
+    if analysis is None:
+        return {"path": path, "error": "probe failed", "probe_seconds": probe_seconds}
+
+    cut_points = analysis.cut_points if analysis.has_valid_cut_points else []
+    batches = _video_service.batch_cut_points(cut_points) if cut_points else []
+    source = analysis.source
+    renditions = resolutions_for_height(resolutions, source.height if source else None)
+    return {
+        "path": path,
+        "duration": analysis.duration,
+        "probe_seconds": probe_seconds,
+        "keyframes": len(analysis.keyframes),
+        "keyframes_per_minute": len(analysis.keyframes) * 60 / analysis.duration if analysis.duration else None,
+        "source": source.to_payload() if source else None,
+        "cut_points": cut_points,
+        "segments": max(len(cut_points) - 1, 0),
+        "batches": batches,
+        "jobs_per_resolution": {resolution: len(batches) for resolution in renditions},
+    }
+
+
+def analyze_all(paths: List[str], workers: int, overrides: Dict[str, object], resolutions: List[str]) -> Iterator[dict]:
+    """Yield results as videos finish; ``workers`` of 1 runs in this process."""
+    if workers <= 1:
+        init_worker(overrides)
+        for path in paths:
+            yield analyze(path, resolutions)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(overrides,)) as executor:
+        futures = [executor.submit(analyze, path, resolutions) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))] if ordered else 0.0
+
+
+def summarize(results: List[dict]) -> dict:
+    """Catalog totals for sizing the transcoder: probe cost, keyframe density, segments and jobs."""
+    analyzed = [r for r in results if "error" not in r]
+    probe_times = [r["probe_seconds"] for r in analyzed]
+    duration = sum(r["duration"] for r in analyzed)
+    keyframes = sum(r["keyframes"] for r in analyzed)
+
+    jobs: Dict[str, int] = {}
+    video_seconds: Dict[str, float] = {}
+    for r in analyzed:
+        for resolution, count in r["jobs_per_resolution"].items():
+            jobs[resolution] = jobs.get(resolution, 0) + count
+            video_seconds[resolution] = video_seconds.get(resolution, 0.0) + sum(b[-1] - b[0] for b in r["batches"])
+
+    return {
+        "videos": len(results),
+        "failed": len(results) - len(analyzed),
+        "duration_seconds": duration,
+        "probe_seconds_total": sum(probe_times),
+        "probe_seconds_mean": sum(probe_times) / len(probe_times) if probe_times else 0.0,
+        "probe_seconds_p95": percentile(probe_times, 0.95),
+        "keyframes_per_minute": keyframes * 60 / duration if duration else 0.0,
+        "segments": sum(r["segments"] for r in analyzed),
+        "messages": sum(len(r["batches"]) for r in analyzed),
+        "jobs_per_resolution": jobs,
+        "video_seconds_per_resolution": video_seconds,
+    }
+
+
+def print_summary(summary: dict, out) -> None:
+    print(f"videos analyzed      {summary['videos'] - summary['failed']} ({summary['failed']} failed)", file=out)
+    print(f"total duration       {summary['duration_seconds'] / 3600:.1f}h", file=out)
+    print(f"probe time           {summary['probe_seconds_total']:.1f}s total, {summary['probe_seconds_mean']:.2f}s mean, "
+          f"{summary['probe_seconds_p95']:.2f}s p95", file=out)
+    print(f"keyframes per minute {summary['keyframes_per_minute']:.1f}", file=out)
+    print(f"segments             {summary['segments']} in {summary['messages']} messages", file=out)
+    print(f"{'resolution':>10} {'jobs':>10} {'video hours':>12}", file=out)
+    for resolution, jobs in sorted(summary["jobs_per_resolution"].items(), key=lambda item: resolution_order(item[0])):
+        hours = summary["video_seconds_per_resolution"][resolution] / 3600
+        print(f"{resolution:>10} {jobs:>10} {hours:>12.1f}", file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Analyze a catalog of local videos offline: cut points and batches as JSON Lines, "
+                    "plus aggregate stats for sizing the transcoder. Batching follows the same "
+                    "environment variables as the service (BATCH_STRATEGY, MESSAGE_SPAN_SECONDS, ...)."
+    )
+    parser.add_argument("inputs", nargs="*", help="Video files or directories to scan recursively.")
+    parser.add_argument("--manifest", help="File with one video path or URL per line.")
+    parser.add_argument("-o", "--output", default="-", help="JSON Lines output file (default: stdout).")
+    parser.add_argument("--summary", help="Also write the aggregate stats as JSON to this file.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parallel probe processes (default: CPU count).")
+    parser.add_argument("--resolutions", default=os.environ.get("RESOLUTIONS", DEFAULT_RESOLUTIONS),
+                        help=f"Transcoder rendition ladder (default: $RESOLUTIONS or {DEFAULT_RESOLUTIONS}).")
+    parser.add_argument("--min-duration", type=float, help="Minimum segment duration in seconds (default: MIN_PERIOD_SECONDS).")
+    parser.add_argument("--max-duration", type=float, help="Maximum segment duration in seconds (default: MAX_PERIOD_SECONDS).")
+    parser.add_argument("--message-span", type=float, help="Seconds span per message window (default: MESSAGE_SPAN_SECONDS).")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    paths = discover(args.inputs, args.manifest)
+    if not paths:
+        parser.error("no videos found")
+
+    overrides = {
+        name: value for name, value in (
+            ("MIN_PERIOD_SECONDS", args.min_duration),
+            ("MAX_PERIOD_SECONDS", args.max_duration),
+            ("MESSAGE_SPAN_SECONDS", args.message_span),
+        ) if value is not None
+    }
+    resolutions = [r.strip() for r in args.resolutions.split(",") if r.strip()]
+
+    logging.info(f"Analyzing {len(paths)} videos with {args.workers} workers")
+    results = []
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for result in analyze_all(paths, args.workers, overrides, resolutions):
+            if "error" in result:
+                logging.warning(f"Failed to analyze {result['path']}: {result['error']}")
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            results.append(result)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    summary = summarize(results)
+    print_summary(summary, sys.stderr)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["failed"] == len(results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
+import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from io import BytesIO
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, Optional
+import certifi
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 
@@ -11,18 +17,26 @@ class MinioClient:
         self.config = config
         self.client: Optional[Minio] = None
         self.bucket_name = config['bucket']
+        self.upload_workers = max(1, config.get('upload_workers', 16))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._http: Optional[urllib3.PoolManager] = None
         
     def connect(self) -> Minio:
         """
         Creates MinIO client connection and validates bucket existence.
         Initializes secure or insecure connection based on configuration.
         Validates that the target bucket exists and is accessible.
+        The blocking SDK calls later run on a bounded thread pool, one pooled
+        HTTP connection per thread, so they never stall the event loop.
         """
+        self._executor = ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix='minio')
+        self._http = self._create_http_client()
         self.client = Minio(
             self.config['endpoint'],
             access_key=self.config['access_key'],
             secret_key=self.config['secret_key'],
-            secure=self.config['use_ssl']
+            secure=self.config['use_ssl'],
+            http_client=self._http
         )
         
         if not self._validate_bucket():
@@ -31,6 +45,40 @@ class MinioClient:
         logger.info(f"Connected to MinIO at {self.config['endpoint']}, bucket: {self.bucket_name}")
         return self.client
     
+    def _create_http_client(self) -> urllib3.PoolManager:
+        """
+        Connection pool sized to the upload workers, with short timeouts for small
+        playlist objects. Retries mirror the MinIO SDK defaults.
+        """
+        return urllib3.PoolManager(
+            maxsize=self.upload_workers,
+            block=True,
+            timeout=urllib3.Timeout(
+                connect=self.config.get('connect_timeout', 5.0),
+                read=self.config.get('read_timeout', 30.0)
+            ),
+            cert_reqs='CERT_REQUIRED',
+            ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+            retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+        )
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a blocking SDK call on the MinIO thread pool and awaits its result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """
+        Waits for in-flight uploads, then releases the thread pool and connections.
+        """
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._http:
+            self._http.clear()
+
     def _validate_bucket(self) -> bool:
         """
         Validates that the configured bucket exists and is accessible.
@@ -62,7 +110,8 @@ class MinioClient:
             content_stream = BytesIO(content_bytes)
             content_length = len(content_bytes)
             
-            self.client.put_object(
+            await self._run(
+                self.client.put_object,
                 bucket_name=self.bucket_name,
                 object_name=object_name,
                 data=content_stream,
@@ -119,7 +168,7 @@ class MinioClient:
             return False
             
         try:
-            list(self.client.list_buckets())
+            await self._run(self.client.list_buckets)
             return True
         except Exception as e:
             logger.error(f'MinIO health check failed: {e}')
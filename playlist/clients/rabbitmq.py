@@ -28,7 +28,7 @@ class RabbitMQClient:
         )
         
         self.channel = await self.connection.channel()
-        await self.channel.set_qos(prefetch_count=1)
+        await self.channel.set_qos(prefetch_count=self.config['prefetch_count'])
         
         self.exchange = await self.channel.get_exchange(name=self.config['exchange'])
         
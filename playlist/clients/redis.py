@@ -2,14 +2,30 @@ import json
 import logging
 from typing import Dict, List, Optional, Any
 from redis.asyncio import Redis, from_url
-from models import Segment, VideoMetadata
+from redis.commands.core import AsyncScript
+from models import Segment
 
 logger = logging.getLogger(__name__)
 
+# KEYS: completed set, bandwidth hash, master claim; ARGV: resolution, claim TTL in seconds.
+# Returns the bandwidth hash to exactly one caller, the first to see every resolution completed.
+COMPLETE_PLAYLIST_SCRIPT = """
+redis.call('SADD', KEYS[1], ARGV[1])
+local expected = redis.call('HLEN', KEYS[2])
+if expected == 0 or redis.call('SCARD', KEYS[1]) < expected then
+    return nil
+end
+if not redis.call('SET', KEYS[3], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return nil
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
 class RedisClient:
     def __init__(self, config: Dict[str, Any]) -> None:
         self.config = config
         self.client: Optional[Redis] = None
+        self._complete_playlist_script: Optional[AsyncScript] = None
         
     async def connect(self) -> Redis:
         """
@@ -18,6 +34,7 @@ class RedisClient:
         """
         url = self._build_redis_url()
         self.client = await from_url(url, encoding='utf-8', decode_responses=True)
+        self._complete_playlist_script = self.client.register_script(COMPLETE_PLAYLIST_SCRIPT)
         
         await self.client.ping()
         logger.info(f"Connected to Redis at {self.config['host']}:{self.config['port']}")
@@ -76,53 +93,65 @@ class RedisClient:
         
         return segments if segments else None
     
-    async def get_video_metadata(self, video_id: str) -> Optional[VideoMetadata]:
+    async def complete_playlist(self, video_id: str, resolution: str) -> Optional[Dict[str, str]]:
         """
-        Retrieves comprehensive video metadata including resolution bandwidths,
-        completed playlists, and expected completion count.
+        Marks a resolution playlist as completed and claims the master playlist in one round trip.
+        Returns the resolution bandwidths only to the caller whose completion finished the video
+        and who claimed it first; every other caller gets None. The claim expires unless confirmed.
+        Redis errors are raised so the request fails instead of passing as "not the last one".
         """
-        if not self.client:
+        if not self.client or not self._complete_playlist_script:
             raise RuntimeError("Redis client not connected")
             
-        metadata_key = f'transcode:playlists:{video_id}:meta'
-        completed_key = f'transcode:playlists:{video_id}:completed'
+        keys = [
+            f'transcode:playlists:{video_id}:completed',
+            f'transcode:playlists:{video_id}:meta',
+            f'transcode:playlists:{video_id}:master',
+        ]
         
         try:
-            resolution_bandwidths = await self.client.hgetall(metadata_key)
-            completed_resolutions = await self.client.smembers(completed_key)
-            expected_count = await self.client.hlen(metadata_key)
+            result = await self._complete_playlist_script(keys=keys, args=[resolution, self.config['master_claim_ttl']])
+            logger.info(f"Marked playlist completed: {video_id}/{resolution}")
             
-            if not resolution_bandwidths:
-                logger.warning(f"No metadata found for video {video_id}")
+            if not result:
                 return None
+            return dict(zip(result[::2], result[1::2]))
+            
+        except Exception as e:
+            # Unlike a nil result this may have been the last resolution; let the message be retried
+            logger.error(f"Failed to mark playlist completed for {video_id}/{resolution}: {e}")
+            raise
+    
+    async def confirm_master_playlist(self, video_id: str) -> bool:
+        """
+        Keeps the master playlist claim for good once the master playlist is published.
+        Until then the claim expires, so a crash after claiming cannot block the video.
+        """
+        if not self.client:
+            raise RuntimeError("Redis client not connected")
             
-            return VideoMetadata(
-                resolution_bandwidths=resolution_bandwidths,
-                completed_resolutions=list(completed_resolutions),
-                expected_count=expected_count
-            )
+        try:
+            await self.client.persist(f'transcode:playlists:{video_id}:master')
+            return True
             
         except Exception as e:
-            logger.error(f"Failed to retrieve video metadata for {video_id}: {e}")
-            return None
+            logger.error(f"Failed to confirm master playlist claim for {video_id}: {e}")
+            return False
     
-    async def mark_playlist_completed(self, video_id: str, resolution: str) -> bool:
+    async def release_master_playlist(self, video_id: str) -> bool:
         """
-        Marks a specific resolution playlist as completed for a video.
-        Updates the completed resolutions set in Redis.
+        Drops the master playlist claim so a later completion can create it again.
+        Used when creating the master playlist failed after the claim was taken.
         """
         if not self.client:
             raise RuntimeError("Redis client not connected")
             
-        completed_key = f'transcode:playlists:{video_id}:completed'
-        
         try:
-            await self.client.sadd(completed_key, resolution)
-            logger.info(f"Marked playlist completed: {video_id}/{resolution}")
+            await self.client.delete(f'transcode:playlists:{video_id}:master')
             return True
             
         except Exception as e:
-            logger.error(f"Failed to mark playlist completed for {video_id}/{resolution}: {e}")
+            logger.error(f"Failed to release master playlist claim for {video_id}: {e}")
             return False
     
     async def check_health(self) -> bool:
@@ -12,7 +12,9 @@ def get_rabbitmq_config():
         'vhost': os.getenv('RABBITMQ_VHOST', '/'),
         'queue': os.getenv('RABBITMQ_PLAYLIST_QUEUE', 'playlist'),
         'exchange': os.getenv('RABBITMQ_EXCHANGE_NAME', 'video'),
-        'routing_key': os.getenv('RABBITMQ_ROUTING_KEY', 'video.finish')
+        'routing_key': os.getenv('RABBITMQ_ROUTING_KEY', 'video.finish'),
+        # Unacked playlist messages delivered at once; each runs as its own task
+        'prefetch_count': int(os.getenv('RABBITMQ_PREFETCH_COUNT', 16))
     }
 
 def get_redis_config():
@@ -20,7 +22,9 @@ def get_redis_config():
         'host': os.getenv('REDIS_HOST', 'localhost'),
         'port': int(os.getenv('REDIS_PORT', 6379)),
         'password': os.getenv('REDIS_PASSWORD', 'password'),
-        'db': int(os.getenv('REDIS_DB', 0))
+        'db': int(os.getenv('REDIS_DB', 0)),
+        # Seconds a master playlist claim survives without being confirmed
+        'master_claim_ttl': int(os.getenv('REDIS_MASTER_CLAIM_TTL', 300))
     }
 
 def get_minio_config():
@@ -29,8 +33,16 @@ def get_minio_config():
         'access_key': os.getenv('MINIO_ACCESS_KEY', 'minio'),
         'secret_key': os.getenv('MINIO_SECRET_KEY', 'minio123'),
         'bucket': os.getenv('MINIO_TRANSCODE_BUCKET', 'stream'),
-        'use_ssl': os.getenv('MINIO_USE_SSL', 'False').lower() == 'true'
+        'use_ssl': os.getenv('MINIO_USE_SSL', 'False').lower() == 'true',
+        # Threads (and pooled connections) for the blocking MinIO SDK calls
+        'upload_workers': int(os.getenv('MINIO_UPLOAD_WORKERS', 16)),
+        'connect_timeout': float(os.getenv('MINIO_CONNECT_TIMEOUT', 5)),
+        'read_timeout': float(os.getenv('MINIO_READ_TIMEOUT', 30))
     }
 
+def get_worker_count():
+    # Playlists built concurrently, defaulting to one per prefetched message
+    return int(os.getenv('PLAYLIST_WORKERS', get_rabbitmq_config()['prefetch_count']))
+
 def get_health_port():
     return int(os.getenv('HEALTH_PORT', 8080))
\ No newline at end of file
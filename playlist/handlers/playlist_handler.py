@@ -1,6 +1,8 @@
+import asyncio
 import json
 import logging
-from typing import Callable, Awaitable
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Awaitable, Dict
 from pydantic import ValidationError
 import aio_pika
 from models import PlaylistMessage
@@ -8,31 +10,61 @@ from services.playlist import PlaylistService
 
 logger = logging.getLogger(__name__)
 
+class KeyedLock:
+    def __init__(self) -> None:
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._holders: Dict[str, int] = {}
+    
+    @asynccontextmanager
+    async def acquire(self, key: str) -> AsyncIterator[None]:
+        """
+        Serializes tasks sharing a key while tasks with other keys run concurrently.
+        Locks are created on first use and dropped once no task holds or waits on them.
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._holders[key] = self._holders.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._holders[key] -= 1
+            if not self._holders[key]:
+                del self._holders[key]
+                del self._locks[key]
+    
+    def __len__(self) -> int:
+        return len(self._locks)
+
 class PlaylistHandler:
-    def __init__(self, playlist_service: PlaylistService) -> None:
+    def __init__(self, playlist_service: PlaylistService, workers: int = 1) -> None:
         self.playlist_service = playlist_service
+        self.workers = asyncio.Semaphore(max(workers, 1))
+        self.video_locks = KeyedLock()
         
     async def handle_playlist_message(self, message: aio_pika.IncomingMessage) -> None:
         """
         Handles incoming playlist generation messages from RabbitMQ.
         Parses message content, processes playlist request through service layer,
         and manages message acknowledgment or rejection based on processing results.
-        Provides comprehensive error handling for malformed messages and processing failures.
+        Messages for one video run one at a time; others share the bounded worker pool,
+        and a message waiting on its video does not hold a worker.
         """
         async with message.process(ignore_processed=True):
             try:
                 playlist_msg = self._parse_message(message)
                 
-                success = await self.playlist_service.process_playlist_request(
-                    playlist_msg.video_id,
-                    playlist_msg.resolution
-                )
+                async with self.video_locks.acquire(playlist_msg.video_id), self.workers:
+                    success = await self.playlist_service.process_playlist_request(
+                        playlist_msg.video_id,
+                        playlist_msg.resolution
+                    )
                 
                 if success:
                     await message.ack()
                     logger.info(f'Successfully processed playlist: {playlist_msg.video_id}/{playlist_msg.resolution}')
                 else:
-                    await message.nack(requeue=False)
+                    # One more delivery covers transient failures without looping on permanent ones
+                    await message.nack(requeue=not message.redelivered)
                     logger.error(f'Failed to process playlist: {playlist_msg.video_id}/{playlist_msg.resolution}')
                     
             except (json.JSONDecodeError, ValidationError) as e:
@@ -3,7 +3,7 @@ import logging
 import os
 import signal
 from typing import Optional
-from config import get_rabbitmq_config, get_redis_config, get_minio_config, get_health_port
+from config import get_rabbitmq_config, get_redis_config, get_minio_config, get_health_port, get_worker_count
 from clients.redis import RedisClient
 from clients.minio import MinioClient
 from clients.rabbitmq import RabbitMQClient
@@ -57,7 +57,7 @@ class PlaylistApp:
             self.rabbitmq_client
         )
         
-        self.playlist_handler = PlaylistHandler(self.playlist_service)
+        self.playlist_handler = PlaylistHandler(self.playlist_service, get_worker_count())
 
     async def _setup_redis(self) -> None:
         """
@@ -73,7 +73,7 @@ class PlaylistApp:
         """
         minio_config = get_minio_config()
         self.minio_client = MinioClient(minio_config)
-        self.minio_client.connect()
+        await asyncio.to_thread(self.minio_client.connect)
 
     async def _setup_rabbitmq(self) -> None:
         """
@@ -141,6 +141,9 @@ class PlaylistApp:
         
         if self.rabbitmq_client:
             await self.rabbitmq_client.close()
+
+        if self.minio_client:
+            await asyncio.to_thread(self.minio_client.close)
             
         if self.redis_client:
             await self.redis_client.close()
@@ -14,11 +14,6 @@ class PlaylistContent(BaseModel):
     content: str
     target_duration: int
 
-class VideoMetadata(BaseModel):
-    resolution_bandwidths: Dict[str, str]
-    completed_resolutions: List[str]
-    expected_count: int
-
 class HealthStatus(Enum):
     HEALTHY = 'healthy'
     UNHEALTHY = 'unhealthy'
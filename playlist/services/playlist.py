@@ -1,7 +1,7 @@
 import math
 import logging
 from typing import List, Dict, Tuple, Optional
-from models import Segment, PlaylistContent, VideoMetadata
+from models import Segment, PlaylistContent
 from clients.redis import RedisClient
 from clients.minio import MinioClient
 from clients.rabbitmq import RabbitMQClient
@@ -37,10 +37,11 @@ class PlaylistService:
                 logger.error(f'Failed to upload media playlist for {video_id}/{resolution}')
                 return False
             
-            await self.redis_client.mark_playlist_completed(video_id, resolution)
+            resolution_bandwidths = await self.redis_client.complete_playlist(video_id, resolution)
             
-            if await self._should_create_master_playlist(video_id):
-                await self._create_master_playlist(video_id)
+            if resolution_bandwidths and not await self._create_master_playlist(video_id, resolution_bandwidths):
+                logger.error(f'Failed to create master playlist for {video_id}')
+                return False
             
             logger.info(f'Successfully processed playlist request for {video_id}/{resolution}')
             return True
@@ -81,48 +82,34 @@ class PlaylistService:
         
         return PlaylistContent(content=content, target_duration=target_duration)
     
-    async def _should_create_master_playlist(self, video_id: str) -> bool:
-        """
-        Determines if master playlist should be created by checking completion status.
-        Compares number of completed playlists against expected count from metadata.
-        """
-        try:
-            metadata = await self.redis_client.get_video_metadata(video_id)
-            if not metadata:
-                return False
-            
-            completed_count = len(metadata.completed_resolutions)
-            return completed_count >= metadata.expected_count and metadata.expected_count > 0
-            
-        except Exception as e:
-            logger.error(f'Error checking master playlist creation condition for {video_id}: {e}')
-            return False
-    
-    async def _create_master_playlist(self, video_id: str) -> bool:
+    async def _create_master_playlist(self, video_id: str, resolution_bandwidths: Dict[str, str]) -> bool:
         """
         Creates and uploads master playlist containing all resolution variants.
-        Retrieves video metadata, generates master playlist content with bandwidth info,
-        uploads to MinIO, and publishes completion notification via RabbitMQ.
+        Generates master playlist content from the claimed bandwidth info, uploads to MinIO,
+        and publishes completion notification via RabbitMQ. Confirms the claim on success
+        and releases it on failure so the redelivered message can try again.
         """
         try:
-            metadata = await self.redis_client.get_video_metadata(video_id)
-            if not metadata:
-                logger.error(f'No metadata found for master playlist creation: {video_id}')
-                return False
-            
-            master_content = self._generate_master_playlist_content(metadata.resolution_bandwidths)
+            master_content = self._generate_master_playlist_content(resolution_bandwidths)
             
             success = await self.minio_client.upload_master_playlist(video_id, master_content)
             if not success:
                 logger.error(f'Failed to upload master playlist for {video_id}')
+                await self.redis_client.release_master_playlist(video_id)
+                return False
+            
+            if not await self.rabbitmq_client.publish_video_completion(video_id):
+                logger.error(f'Failed to publish completion for {video_id}')
+                await self.redis_client.release_master_playlist(video_id)
                 return False
             
-            await self.rabbitmq_client.publish_video_completion(video_id)
+            await self.redis_client.confirm_master_playlist(video_id)
             logger.info(f'Master playlist created and completion published for {video_id}')
             return True
             
         except Exception as e:
             logger.error(f'Error creating master playlist for {video_id}: {e}')
+            await self.redis_client.release_master_playlist(video_id)
             return False
     
     def _generate_master_playlist_content(self, resolution_bandwidths: Dict[str, str]) -> str:
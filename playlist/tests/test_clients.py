@@ -1,12 +1,15 @@
+import asyncio
+import threading
 import unittest
 from unittest.mock import AsyncMock, Mock, patch
+from redis.exceptions import RedisError
 from clients.redis import RedisClient
 from clients.minio import MinioClient
 from clients.rabbitmq import RabbitMQClient
 
 class TestRedisClient(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
-        config = {'host': 'localhost', 'port': 6379, 'db': 0, 'password': 'secret'}
+        config = {'host': 'localhost', 'port': 6379, 'db': 0, 'password': 'secret', 'master_claim_ttl': 300}
         self.redis_client = RedisClient(config)
     
     def test_build_redis_url_with_password(self):
@@ -23,14 +26,50 @@ class TestRedisClient(unittest.IsolatedAsyncioTestCase):
         result = await self.redis_client.check_health()
         self.assertFalse(result)
 
-class TestMinioClient(unittest.TestCase):
+    async def test_complete_playlist_returns_bandwidths_to_claimer(self):
+        self.redis_client.client = Mock()
+        self.redis_client._complete_playlist_script = AsyncMock(return_value=['720', '1500000', '1080', '3000000'])
+        
+        result = await self.redis_client.complete_playlist('video123', '720')
+        
+        self.assertEqual(result, {'720': '1500000', '1080': '3000000'})
+        self.redis_client._complete_playlist_script.assert_awaited_once_with(
+            keys=[
+                'transcode:playlists:video123:completed',
+                'transcode:playlists:video123:meta',
+                'transcode:playlists:video123:master',
+            ],
+            args=['720', 300]
+        )
+
+    async def test_complete_playlist_returns_none_until_complete(self):
+        self.redis_client.client = Mock()
+        self.redis_client._complete_playlist_script = AsyncMock(return_value=None)
+        
+        result = await self.redis_client.complete_playlist('video123', '720')
+        
+        self.assertIsNone(result)
+
+    async def test_complete_playlist_raises_redis_errors(self):
+        self.redis_client.client = Mock()
+        self.redis_client._complete_playlist_script = AsyncMock(side_effect=RedisError('NOSCRIPT No matching script'))
+        
+        with self.assertRaises(RedisError):
+            await self.redis_client.complete_playlist('video123', '720')
+
+    async def test_complete_playlist_not_connected(self):
+        with self.assertRaises(RuntimeError):
+            await self.redis_client.complete_playlist('video123', '720')
+
+class TestMinioClient(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         config = {
             'endpoint': 'localhost:9000',
             'access_key': 'test',
             'secret_key': 'test',
             'use_ssl': False,
-            'bucket': 'test-bucket'
+            'bucket': 'test-bucket',
+            'upload_workers': 8
         }
         self.minio_client = MinioClient(config)
     
@@ -38,6 +77,41 @@ class TestMinioClient(unittest.TestCase):
         result = await self.minio_client.check_health()
         self.assertFalse(result)
 
+    def connect(self):
+        patcher = patch('clients.minio.Minio')
+        sdk = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.minio_client.close)
+        sdk.bucket_exists.return_value = True
+        self.minio_client.connect()
+        return sdk
+
+    async def test_uploads_run_concurrently_off_the_event_loop(self):
+        sdk = self.connect()
+        # Only releases once all eight uploads are inside put_object at the same time
+        barrier = threading.Barrier(8)
+        sdk.put_object.side_effect = lambda **kwargs: barrier.wait(timeout=5)
+
+        results = await asyncio.gather(*(
+            self.minio_client.upload_media_playlist(f'video{i}', '720', '#EXTM3U') for i in range(8)
+        ))
+
+        self.assertEqual(results, [True] * 8)
+        self.assertFalse(barrier.broken)
+        self.assertEqual(sdk.put_object.call_count, 8)
+
+    async def test_check_health_runs_in_executor(self):
+        sdk = self.connect()
+        threads = []
+        sdk.list_buckets.side_effect = lambda: threads.append(threading.current_thread().name)
+
+        self.assertTrue(await self.minio_client.check_health())
+        self.assertTrue(threads[0].startswith('minio'))
+
+    def test_connection_pool_matches_workers(self):
+        self.connect()
+        self.assertEqual(self.minio_client._http.connection_pool_kw['maxsize'], 8)
+
 class TestRabbitMQClient(unittest.TestCase):
     def setUp(self):
         config = {
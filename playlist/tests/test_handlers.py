@@ -1,9 +1,13 @@
+import asyncio
 import unittest
 import json
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, Mock, patch
 from aiohttp.test_utils import AioHTTPTestCase
 from handlers.health_handler import create_health_app, determine_status_code
+from handlers.playlist_handler import PlaylistHandler
 from services.health import HealthService
+from services.playlist import PlaylistService
 from clients.redis import RedisClient
 from clients.minio import MinioClient
 from clients.rabbitmq import RabbitMQClient
@@ -17,6 +21,82 @@ class TestPlaylistMessage(unittest.TestCase):
         self.assertEqual(playlist_msg.video_id, 'test')
         self.assertEqual(playlist_msg.resolution, '720')
 
+class TestPlaylistHandler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.running = {}
+        self.peak = 0
+        self.peak_per_video = 0
+        self.playlist_service = Mock(spec=PlaylistService)
+        self.playlist_service.process_playlist_request = AsyncMock(side_effect=self.process)
+    
+    async def process(self, video_id, resolution):
+        self.running[video_id] = self.running.get(video_id, 0) + 1
+        self.peak = max(self.peak, sum(self.running.values()))
+        self.peak_per_video = max(self.peak_per_video, self.running[video_id])
+        await asyncio.sleep(0.05)
+        self.running[video_id] -= 1
+        return True
+    
+    def message(self, video_id, resolution='720'):
+        @asynccontextmanager
+        async def process(ignore_processed=False):
+            yield
+        
+        message = Mock()
+        message.body = json.dumps({'video_id': video_id, 'resolution': resolution}).encode('utf-8')
+        message.process = process
+        message.ack = AsyncMock()
+        message.nack = AsyncMock()
+        message.reject = AsyncMock()
+        message.redelivered = False
+        return message
+    
+    async def drain(self, handler, messages):
+        await asyncio.gather(*(handler.handle_playlist_message(message) for message in messages))
+    
+    async def test_different_videos_run_on_worker_pool(self):
+        handler = PlaylistHandler(self.playlist_service, workers=8)
+        messages = [self.message(f'video{i}') for i in range(16)]
+        
+        await self.drain(handler, messages)
+        
+        self.assertEqual(self.peak, 8)
+        for message in messages:
+            message.ack.assert_awaited_once()
+    
+    async def test_same_video_is_serialized(self):
+        handler = PlaylistHandler(self.playlist_service, workers=8)
+        messages = [self.message('video1', resolution) for resolution in ('240', '480', '720', '1080')]
+        messages.append(self.message('video2'))
+        
+        await self.drain(handler, messages)
+        
+        self.assertEqual(self.peak_per_video, 1)
+        self.assertEqual(self.peak, 2)
+        self.assertEqual(len(handler.video_locks), 0)
+    
+    async def test_failed_message_is_requeued_once(self):
+        self.playlist_service.process_playlist_request = AsyncMock(return_value=False)
+        handler = PlaylistHandler(self.playlist_service, workers=2)
+        first, second = self.message('video1'), self.message('video1')
+        second.redelivered = True
+        
+        await handler.handle_playlist_message(first)
+        await handler.handle_playlist_message(second)
+        
+        first.nack.assert_awaited_once_with(requeue=True)
+        second.nack.assert_awaited_once_with(requeue=False)
+    
+    async def test_invalid_message_is_rejected(self):
+        handler = PlaylistHandler(self.playlist_service, workers=2)
+        message = self.message('video1')
+        message.body = b'not json'
+        
+        await handler.handle_playlist_message(message)
+        
+        message.reject.assert_awaited_once_with(requeue=False)
+        self.playlist_service.process_playlist_request.assert_not_awaited()
+
 class TestHealthHandler(AioHTTPTestCase):
     async def get_application(self):
         redis_client = Mock(spec=RedisClient)
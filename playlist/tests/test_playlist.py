@@ -1,10 +1,11 @@
 import unittest
 from unittest.mock import AsyncMock, Mock
+from redis.exceptions import RedisError
 from services.playlist import PlaylistService
 from clients.redis import RedisClient
 from clients.minio import MinioClient
 from clients.rabbitmq import RabbitMQClient
-from models import Segment, VideoMetadata
+from models import Segment
 
 class TestPlaylistService(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -64,5 +65,68 @@ class TestPlaylistService(unittest.IsolatedAsyncioTestCase):
         self.assertFalse(result)
         self.redis_client.get_video_segments.assert_called_once_with('video123', '720')
 
+    def stub_media_playlist(self):
+        self.redis_client.get_video_segments = AsyncMock(return_value=[Segment(path='segment_0000.ts', duration=10.0)])
+        self.minio_client.upload_media_playlist = AsyncMock(return_value=True)
+        self.minio_client.upload_master_playlist = AsyncMock(return_value=True)
+        self.rabbitmq_client.publish_video_completion = AsyncMock(return_value=True)
+        self.redis_client.release_master_playlist = AsyncMock(return_value=True)
+        self.redis_client.confirm_master_playlist = AsyncMock(return_value=True)
+    
+    async def test_process_playlist_request_creates_master_when_claimed(self):
+        self.stub_media_playlist()
+        self.redis_client.complete_playlist = AsyncMock(return_value={'720': '1500000', '1080': '3000000'})
+        
+        result = await self.playlist_service.process_playlist_request('video123', '1080')
+        
+        self.assertTrue(result)
+        self.redis_client.complete_playlist.assert_awaited_once_with('video123', '1080')
+        content = self.minio_client.upload_master_playlist.await_args.args[1]
+        self.assertIn('BANDWIDTH=1500000', content)
+        self.assertIn('BANDWIDTH=3000000', content)
+        self.rabbitmq_client.publish_video_completion.assert_awaited_once_with('video123')
+        self.redis_client.confirm_master_playlist.assert_awaited_once_with('video123')
+        self.redis_client.release_master_playlist.assert_not_awaited()
+    
+    async def test_process_playlist_request_fails_when_master_fails(self):
+        self.stub_media_playlist()
+        self.redis_client.complete_playlist = AsyncMock(return_value={'720': '1500000'})
+        self.minio_client.upload_master_playlist = AsyncMock(return_value=False)
+        
+        result = await self.playlist_service.process_playlist_request('video123', '720')
+        
+        self.assertFalse(result)
+        self.redis_client.release_master_playlist.assert_awaited_once_with('video123')
+        self.redis_client.confirm_master_playlist.assert_not_awaited()
+    
+    async def test_process_playlist_request_fails_when_completion_fails(self):
+        self.stub_media_playlist()
+        self.redis_client.complete_playlist = AsyncMock(side_effect=RedisError('connection reset'))
+        
+        result = await self.playlist_service.process_playlist_request('video123', '720')
+        
+        self.assertFalse(result)
+        self.minio_client.upload_master_playlist.assert_not_awaited()
+    
+    async def test_process_playlist_request_skips_master_when_not_claimed(self):
+        self.stub_media_playlist()
+        self.redis_client.complete_playlist = AsyncMock(return_value=None)
+        
+        result = await self.playlist_service.process_playlist_request('video123', '720')
+        
+        self.assertTrue(result)
+        self.minio_client.upload_master_playlist.assert_not_awaited()
+        self.rabbitmq_client.publish_video_completion.assert_not_awaited()
+    
+    async def test_master_playlist_upload_failure_releases_claim(self):
+        self.stub_media_playlist()
+        self.minio_client.upload_master_playlist = AsyncMock(return_value=False)
+        
+        result = await self.playlist_service._create_master_playlist('video123', {'720': '1500000'})
+        
+        self.assertFalse(result)
+        self.redis_client.release_master_playlist.assert_awaited_once_with('video123')
+        self.rabbitmq_client.publish_video_completion.assert_not_awaited()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
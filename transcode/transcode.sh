@@ -23,6 +23,8 @@ ${BOLD}Optional:${RESET}
   ${BOLD}--preset${RESET}=PRESET     x264 preset (default: medium)
   ${BOLD}--resolution${RESET}=HEIGHT Output height in pixels (default: 240)
   ${BOLD}--allow-http${RESET}        Allow HTTP URLs for input video (HTTPS is always allowed)
+  ${BOLD}--copy${RESET}              Stream-copy the video instead of re-encoding (source already at --resolution;
+                      CRF and preset are ignored, AAC audio is copied too)
   ${BOLD}--help${RESET}              Show this message"
   exit 0
 }
@@ -59,6 +61,7 @@ for arg in "$@"; do
     --resolution=*)     VIDEO_HEIGHT="${arg#*=}" ;;
     --help)             show_help ;;
     --allow-http)       ALLOW_HTTP=true ;;
+    --copy)             COPY=true ;;
     *)                  error_exit "Unknown option: $arg" ;;
   esac
 done
@@ -68,6 +71,7 @@ VIDEO_CRF="${VIDEO_CRF:-28}"
 VIDEO_PRESET="${VIDEO_PRESET:-medium}"
 VIDEO_HEIGHT="${VIDEO_HEIGHT:-240}"
 ALLOW_HTTP="${ALLOW_HTTP:-false}"
+COPY="${COPY:-false}"
 OUTPUT_DIR="output"
 SEGMENT_PREFIX="segment_"
 SEGMENT_EXT="ts"
@@ -88,6 +92,7 @@ REDIS_DB="${REDIS_DB:-0}"
 REDIS_PLAYLIST_KEY="transcode:playlists:${VIDEO_ID}:data:${VIDEO_HEIGHT}"
 REDIS_TOTAL_JOBS_KEY="transcode:jobs:${VIDEO_ID}:total"
 REDIS_COMPLETED_JOBS_KEY="transcode:jobs:${VIDEO_ID}:completed"
+REDIS_NOTIFIED_JOBS_KEY="transcode:jobs:${VIDEO_ID}:notified"
 REDIS_FIELD="${VIDEO_HEIGHT}"
 
 REDIS_CMD="redis-cli -h $REDIS_HOST -p $REDIS_PORT -n $REDIS_DB"
@@ -176,6 +181,24 @@ validate_timestamps
 validate_number "$TOTAL_DURATION"
 
 
+# Passthrough renditions keep the source bitstream: no scaling, no encoder settings.
+# Segments start on source keyframes, so input seeking lands exactly on them.
+if [[ "$COPY" == "true" ]]; then
+  VIDEO_CODEC="copy"
+  SOURCE_AUDIO_CODEC=$(ffprobe -v error -select_streams a:0 -show_entries stream=codec_name -of default=noprint_wrappers=1:nokey=1 "$INPUT_VIDEO")
+  VIDEO_ARGS=(-c:v copy)
+  if [[ -z "$SOURCE_AUDIO_CODEC" || "$SOURCE_AUDIO_CODEC" == "aac" ]]; then
+    AUDIO_CODEC="copy"
+    AUDIO_ARGS=(-c:a copy)
+  else
+    AUDIO_ARGS=(-c:a "$AUDIO_CODEC" -b:a "$AUDIO_BITRATE")
+  fi
+else
+  VIDEO_ARGS=(-vf "scale=-2:$VIDEO_HEIGHT" -c:v "$VIDEO_CODEC" -preset "$VIDEO_PRESET" -crf "$VIDEO_CRF")
+  AUDIO_ARGS=(-c:a "$AUDIO_CODEC" -b:a "$AUDIO_BITRATE")
+fi
+
+
 ##############################################
 #        Processing Segments
 ##############################################
@@ -197,7 +220,7 @@ log_debug "Processing:              From ${TIMESTAMPS[0]}s to ${TIMESTAMPS[-1]}s
 log_debug "Total Duration:          $FORMATTED_DURATION (HH:MM:SS.MMM)"
 log_debug "Output Folder:           $OUTPUT_DIR"
 log_debug "Resolution:              ${VIDEO_HEIGHT}p"
-log_debug "Video Codec:             $VIDEO_CODEC"
+log_debug "Video Codec:             $VIDEO_CODEC$([[ "$COPY" == "true" ]] && echo " (passthrough)")"
 log_debug "CRF:                     $VIDEO_CRF (Lower = Better Quality)"
 log_debug "Preset:                  $VIDEO_PRESET"
 log_debug "Audio:                   $AUDIO_CODEC @ $AUDIO_BITRATE"
@@ -251,15 +274,23 @@ for ((i=0; i<TOTAL; i++)); do
     printf "\r\033[KProcessing segment %d: %s - %s (%.2f seconds)" "$i" "$START" "$END" "$DURATION"
   fi
 
+  if [[ "$COPY" == "true" ]]; then
+    SEEK_BEFORE_INPUT=(-ss "$START")
+    SEEK_AFTER_INPUT=(-t "$DURATION")
+  else
+    SEEK_BEFORE_INPUT=()
+    SEEK_AFTER_INPUT=(-ss "$START" -t "$DURATION")
+  fi
+
   ffmpeg -hide_banner -loglevel error \
     -fflags +genpts \
+    "${SEEK_BEFORE_INPUT[@]}" \
     -i "$INPUT_VIDEO" \
-    -ss "$START" -t "$DURATION" \
+    "${SEEK_AFTER_INPUT[@]}" \
     -reset_timestamps 1 \
     -map 0 \
-    -vf "scale=-2:$VIDEO_HEIGHT" \
-    -c:v "$VIDEO_CODEC" -preset "$VIDEO_PRESET" -crf "$VIDEO_CRF" \
-    -c:a "$AUDIO_CODEC" -b:a "$AUDIO_BITRATE" \
+    "${VIDEO_ARGS[@]}" \
+    "${AUDIO_ARGS[@]}" \
     -f mpegts \
     -mpegts_flags +resend_headers+initial_discontinuity \
     "$SEGMENT_PATH" || continue
@@ -361,6 +392,15 @@ if [[ $redis_hget_status -ne 0 ]]; then
     error_exit "Failed to execute Redis GET '$REDIS_TOTAL_JOBS_KEY' (Exit Code: $redis_hget_status)."
 fi
 
+if [[ -z "$total_jobs" ]]; then
+    # Pipelined uploads: iframebreaker sets the total once probing ends and announces
+    # any resolution that already finished by then.
+    log_info "Total jobs not known yet for '$REDIS_TOTAL_JOBS_KEY'. No notification sent."
+    echo ""
+    echo "Finished!"
+    exit 0
+fi
+
 if ! [[ "$total_jobs" =~ ^[0-9]+$ ]]; then
     error_exit "Could not retrieve a valid total jobs count from Redis. Key: '$REDIS_TOTAL_JOBS_KEY'. Received: '$total_jobs'."
 fi
@@ -368,6 +408,14 @@ fi
 log_info "Total jobs required: $total_jobs"
 
 if [[ "$current_completed_jobs" -ge "$total_jobs" ]]; then
+  notification_claimed=$($REDIS_CMD HSETNX "$REDIS_NOTIFIED_JOBS_KEY" "$REDIS_FIELD" 1)
+  if [[ "$notification_claimed" != "1" ]]; then
+    log_info "Resolution ${VIDEO_HEIGHT}p already announced. No notification sent."
+    echo ""
+    echo "Finished!"
+    exit 0
+  fi
+
   log_info "All jobs completed ($current_completed_jobs/$total_jobs). Publishing notification to RabbitMQ."
 
   # get rabbitmqadmin
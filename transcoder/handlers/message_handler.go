@@ -13,6 +13,7 @@ import (
 	"transcoder/models"
 	"transcoder/rabbitmq"
 	"transcoder/redis"
+	"transcoder/utils"
 	"transcoder/validation"
 )
 
@@ -105,12 +106,13 @@ func (h *MessageHandler) formatTimestamps(timestamps []float64) string {
 }
 
 func (h *MessageHandler) processTranscodeJobs(ctx context.Context, message *models.Message, timestampData string) error {
-	resolutions := h.configuration.Transcode.Resolutions
+	resolutions := h.resolutionsForSource(message)
+	masterPlaylist := h.masterPlaylistFor(resolutions)
 	errorChannel := make(chan error, len(resolutions))
 	workGroup := &sync.WaitGroup{}
 
 	for _, resolution := range resolutions {
-		h.processResolutionAsync(ctx, message, timestampData, resolution, workGroup, errorChannel)
+		h.processResolutionAsync(ctx, message, timestampData, resolution, masterPlaylist, workGroup, errorChannel)
 	}
 
 	workGroup.Wait()
@@ -119,7 +121,34 @@ func (h *MessageHandler) processTranscodeJobs(ctx context.Context, message *mode
 	return h.handleJobErrors(errorChannel)
 }
 
-func (h *MessageHandler) ensureVideoInitialized(ctx context.Context, videoID, resolution string, totalMessages int) error {
+// resolutionsForSource skips renditions above the source height. Every message
+// of a video carries the same source, so all of them agree on the ladder.
+func (h *MessageHandler) resolutionsForSource(message *models.Message) []string {
+	configured := h.configuration.Transcode.Resolutions
+	if message.Source == nil {
+		return configured
+	}
+
+	resolutions := utils.ResolutionsUpToHeight(configured, message.Source.Height)
+	if len(resolutions) < len(configured) && message.MessageID == 1 {
+		log.Printf("Video %s is %dp, transcoding %v of %v", message.VideoID, message.Source.Height, resolutions, configured)
+	}
+	return resolutions
+}
+
+// masterPlaylistFor limits the master playlist to the transcoded renditions;
+// the playlist service waits for as many media playlists as it has entries.
+func (h *MessageHandler) masterPlaylistFor(resolutions []string) config.MasterPlaylistMap {
+	masterPlaylist := make(config.MasterPlaylistMap, len(resolutions))
+	for _, resolution := range resolutions {
+		if bitrate, exists := h.configuration.Transcode.MasterPlaylist[resolution]; exists {
+			masterPlaylist[resolution] = bitrate
+		}
+	}
+	return masterPlaylist
+}
+
+func (h *MessageHandler) ensureVideoInitialized(ctx context.Context, videoID, resolution string, totalMessages int, masterPlaylist config.MasterPlaylistMap) error {
 	initializationKey := h.createInitializationKey(videoID, resolution)
 
 	if h.isVideoInitialized(initializationKey) {
@@ -128,7 +157,7 @@ func (h *MessageHandler) ensureVideoInitialized(ctx context.Context, videoID, re
 
 	h.markVideoAsInitialized(initializationKey)
 
-	if err := h.initializeRedisState(ctx, videoID, resolution, totalMessages); err != nil {
+	if err := h.initializeRedisState(ctx, videoID, resolution, totalMessages, masterPlaylist); err != nil {
 		return err
 	}
 
@@ -184,12 +213,12 @@ func (h *MessageHandler) buildTimestampString(timestamps []float64) string {
 	return builder.String()
 }
 
-func (h *MessageHandler) processResolutionAsync(ctx context.Context, message *models.Message, timestampData, resolution string, wg *sync.WaitGroup, errorChannel chan error) {
+func (h *MessageHandler) processResolutionAsync(ctx context.Context, message *models.Message, timestampData, resolution string, masterPlaylist config.MasterPlaylistMap, wg *sync.WaitGroup, errorChannel chan error) {
 	wg.Add(1)
 	go func(res string) {
 		defer wg.Done()
 
-		if err := h.ensureVideoInitialized(ctx, message.VideoID, res, message.TotalMessages); err != nil {
+		if err := h.ensureVideoInitialized(ctx, message.VideoID, res, message.TotalMessages, masterPlaylist); err != nil {
 			errorChannel <- err
 			return
 		}
@@ -231,8 +260,8 @@ func (h *MessageHandler) markVideoAsInitialized(key string) {
 	h.initializedVideos[key] = true
 }
 
-func (h *MessageHandler) initializeRedisState(ctx context.Context, videoID, resolution string, totalMessages int) error {
-	if err := h.storeMasterPlaylistMetadata(ctx, videoID); err != nil {
+func (h *MessageHandler) initializeRedisState(ctx context.Context, videoID, resolution string, totalMessages int, masterPlaylist config.MasterPlaylistMap) error {
+	if err := h.storeMasterPlaylistMetadata(ctx, videoID, masterPlaylist); err != nil {
 		return err
 	}
 
@@ -243,8 +272,8 @@ func (h *MessageHandler) initializeRedisState(ctx context.Context, videoID, reso
 	return nil
 }
 
-func (h *MessageHandler) storeMasterPlaylistMetadata(ctx context.Context, videoID string) error {
-	if err := h.redisClient.StoreMasterPaylistMetadata(ctx, videoID, h.configuration.Transcode.MasterPlaylist); err != nil {
+func (h *MessageHandler) storeMasterPlaylistMetadata(ctx context.Context, videoID string, masterPlaylist config.MasterPlaylistMap) error {
+	if err := h.redisClient.StoreMasterPaylistMetadata(ctx, videoID, masterPlaylist); err != nil {
 		log.Printf("Redis master playlist creation failed for video %s: %v", videoID, err)
 		return fmt.Errorf("master playlist metadata storage failed for video %s: %w", videoID, err)
 	}
@@ -299,7 +328,18 @@ func (h *MessageHandler) buildJobConfig(message *models.Message, timestampData,
 		RabbitMQExchange:        h.configuration.RabbitMQ.Exchange,
 		RabbitMQRoutingKey:      h.configuration.RabbitMQ.RoutingKey,
 		AllowHTTP:               h.configuration.Kubernetes.AllowHTTPJobArg,
+		Copy:                    h.isPassthroughResolution(message, resolution),
+	}
+}
+
+// isPassthroughResolution reports whether this rendition is the source itself:
+// iframebreaker found the stream copyable and the rendition has the source height.
+func (h *MessageHandler) isPassthroughResolution(message *models.Message, resolution string) bool {
+	if !message.Passthrough || message.Source == nil {
+		return false
 	}
+	height, err := utils.ResolutionHeight(resolution)
+	return err == nil && height == message.Source.Height
 }
 
 func (h *MessageHandler) logJobCreationError(message *models.Message, resolution string, err error) {
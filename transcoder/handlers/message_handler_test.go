@@ -151,3 +151,97 @@ func TestMessageHandler_Process_SubmitJobError(t *testing.T) {
 	mockJobSubmitter.AssertExpectations(t)
 	mockRedisClient.AssertExpectations(t)
 }
+
+func TestMessageHandler_Process_SkipsRenditionsAboveSource(t *testing.T) {
+	// Arrange
+	mockJobSubmitter := new(MockJobSubmitter)
+	mockRedisClient := new(MockRedisClient)
+
+	cfg := &config.Config{
+		Transcode: config.TranscodeConfig{
+			Resolutions:    []string{"360", "720", "1080"},
+			CRFMap:         config.CRFMapping{"360": 34, "720": 30, "1080": 28},
+			MasterPlaylist: config.MasterPlaylistMap{"360": 800000, "720": 2000000, "1080": 5000000},
+		},
+	}
+
+	messageHandler := NewMessageHandler(cfg, mockJobSubmitter, mockRedisClient)
+
+	msg := &models.Message{
+		VideoID:            "testVideo",
+		MessageID:          1,
+		VideoURL:           "https://example.com/video.mp4",
+		Timestamps:         []float64{0, 1, 2},
+		TotalVideoDuration: 60.0,
+		TotalMessages:      1,
+		Source:             &models.SourceInfo{Width: 1280, Height: 720, Codec: "h264"},
+	}
+	body, _ := json.Marshal(msg)
+
+	prunedPlaylist := config.MasterPlaylistMap{"360": 800000, "720": 2000000}
+	mockRedisClient.On("StoreMasterPaylistMetadata", mock.Anything, msg.VideoID, prunedPlaylist).Return(nil)
+	mockRedisClient.On("InitializeJobCounters", mock.Anything, msg.VideoID, "360", msg.TotalMessages).Return(nil)
+	mockRedisClient.On("InitializeJobCounters", mock.Anything, msg.VideoID, "720", msg.TotalMessages).Return(nil)
+	mockRedisClient.On("GetTotalJobsKey", msg.VideoID).Return("transcode:jobs:testVideo:total")
+	mockRedisClient.On("GetCompletedJobsKey", msg.VideoID).Return("transcode:jobs:testVideo:completed")
+	mockRedisClient.On("GetMasterPlaylistKey", msg.VideoID).Return("transcode:playlists:testVideo:meta")
+	mockJobSubmitter.On("SubmitJob", mock.Anything, mock.AnythingOfType("models.JobConfig")).Return(nil)
+
+	// Act
+	err := messageHandler.Process(context.Background(), body)
+
+	// Assert
+	assert.NoError(t, err)
+	mockJobSubmitter.AssertNumberOfCalls(t, "SubmitJob", 2)
+	for _, call := range mockJobSubmitter.Calls {
+		assert.NotEqual(t, "1080", call.Arguments.Get(1).(models.JobConfig).Resolution)
+	}
+	mockRedisClient.AssertExpectations(t)
+}
+
+func TestMessageHandler_Process_PassthroughCopiesSourceHeightOnly(t *testing.T) {
+	// Arrange
+	mockJobSubmitter := new(MockJobSubmitter)
+	mockRedisClient := new(MockRedisClient)
+
+	cfg := &config.Config{
+		Transcode: config.TranscodeConfig{
+			Resolutions:    []string{"360", "720"},
+			CRFMap:         config.CRFMapping{"360": 34, "720": 30},
+			MasterPlaylist: config.MasterPlaylistMap{"360": 800000, "720": 2000000},
+		},
+	}
+
+	messageHandler := NewMessageHandler(cfg, mockJobSubmitter, mockRedisClient)
+
+	msg := &models.Message{
+		VideoID:            "testVideo",
+		MessageID:          2,
+		VideoURL:           "https://example.com/video.mp4",
+		Timestamps:         []float64{0, 6, 12},
+		TotalVideoDuration: 60.0,
+		TotalMessages:      2,
+		Source:             &models.SourceInfo{Width: 1280, Height: 720, Codec: "h264", Profile: "High", Level: 31},
+		Passthrough:        true,
+	}
+	body, _ := json.Marshal(msg)
+
+	mockRedisClient.On("StoreMasterPaylistMetadata", mock.Anything, msg.VideoID, cfg.Transcode.MasterPlaylist).Return(nil)
+	mockRedisClient.On("InitializeJobCounters", mock.Anything, msg.VideoID, mock.Anything, msg.TotalMessages).Return(nil)
+	mockRedisClient.On("GetTotalJobsKey", msg.VideoID).Return("transcode:jobs:testVideo:total")
+	mockRedisClient.On("GetCompletedJobsKey", msg.VideoID).Return("transcode:jobs:testVideo:completed")
+	mockRedisClient.On("GetMasterPlaylistKey", msg.VideoID).Return("transcode:playlists:testVideo:meta")
+	mockJobSubmitter.On("SubmitJob", mock.Anything, mock.AnythingOfType("models.JobConfig")).Return(nil)
+
+	// Act
+	err := messageHandler.Process(context.Background(), body)
+
+	// Assert
+	assert.NoError(t, err)
+	copied := map[string]bool{}
+	for _, call := range mockJobSubmitter.Calls {
+		jobConfig := call.Arguments.Get(1).(models.JobConfig)
+		copied[jobConfig.Resolution] = jobConfig.Copy
+	}
+	assert.Equal(t, map[string]bool{"360": false, "720": true}, copied)
+}
@@ -329,6 +329,10 @@ func (c *Client) buildTranscodeArgs(jobConfig models.JobConfig, timestampFilePat
 		args = append(args, "--allow-http")
 	}
 
+	if jobConfig.Copy {
+		args = append(args, "--copy")
+	}
+
 	return args
 }
 
@@ -108,6 +108,25 @@ func TestClient_BuildTranscodeArgs_NoHTTP(t *testing.T) {
 	assert.Len(t, args, 7)
 }
 
+func TestClient_BuildTranscodeArgs_Copy(t *testing.T) {
+	client := &Client{}
+
+	jobConfig := models.JobConfig{
+		SegmentID:  1,
+		VideoURL:   "https://example.com/video.mp4",
+		CRF:        30,
+		Preset:     "medium",
+		Resolution: "720",
+		VideoID:    "test-video",
+		Copy:       true,
+	}
+
+	args := client.buildTranscodeArgs(jobConfig, "/data/timestamps.txt")
+
+	assert.Contains(t, args, "--copy")
+	assert.Len(t, args, 8)
+}
+
 func TestClient_FilterEmptyRedisPassword(t *testing.T) {
 	client := &Client{}
 
@@ -7,6 +7,20 @@ type Message struct {
 	Timestamps         []float64 `json:"timestamps"`
 	TotalVideoDuration float64   `json:"total_video_duration"`
 	TotalMessages      int       `json:"total_messages"`
+	// Source is set by iframebreaker from its probe; older producers omit it.
+	Source *SourceInfo `json:"source,omitempty"`
+	// Passthrough means the rendition at the source height can be stream-copied.
+	Passthrough bool `json:"passthrough,omitempty"`
+}
+
+type SourceInfo struct {
+	Width   int     `json:"width"`
+	Height  int     `json:"height"`
+	Codec   string  `json:"codec"`
+	Bitrate int64   `json:"bitrate"`
+	FPS     float64 `json:"fps"`
+	Profile string  `json:"profile"`
+	Level   int     `json:"level"`
 }
 
 type JobConfig struct {
@@ -34,4 +48,5 @@ type JobConfig struct {
 	RabbitMQExchange        string
 	RabbitMQRoutingKey      string
 	AllowHTTP               bool
+	Copy                    bool
 }
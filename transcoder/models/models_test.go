@@ -83,6 +83,25 @@ func TestMessage_JSONUnmarshaling_InvalidJSON(t *testing.T) {
 	assert.Error(t, err)
 }
 
+func TestMessage_JSONUnmarshaling_Source(t *testing.T) {
+	jsonData := `{"message_id": 1, "video_id": "v", "source": {"width": 854, "height": 480, "codec": "h264", "bitrate": 1500000, "fps": 29.97}}`
+
+	var message Message
+	err := json.Unmarshal([]byte(jsonData), &message)
+	require.NoError(t, err)
+
+	require.NotNil(t, message.Source)
+	assert.Equal(t, SourceInfo{Width: 854, Height: 480, Codec: "h264", Bitrate: 1500000, FPS: 29.97}, *message.Source)
+}
+
+func TestMessage_JSONUnmarshaling_WithoutSource(t *testing.T) {
+	var message Message
+	err := json.Unmarshal([]byte(`{"message_id": 1, "video_id": "v", "source": null}`), &message)
+	require.NoError(t, err)
+
+	assert.Nil(t, message.Source)
+}
+
 func TestJobConfig_AllFieldsPresent(t *testing.T) {
 	jobConfig := JobConfig{
 		SegmentID:               1,
@@ -49,37 +49,26 @@ func (c *client) InitializeJobCounters(ctx context.Context, videoID, resolution
 	totalJobsKey := c.GetTotalJobsKey(videoID)
 	completedJobsKey := c.GetCompletedJobsKey(videoID)
 
-	pipe := c.rdb.Pipeline()
-
-	pipe.SetNX(ctx, totalJobsKey, totalJobs, 0)
-	pipe.HSetNX(ctx, completedJobsKey, resolution, 0)
-
-	cmders, err := pipe.Exec(ctx)
-	if err != nil && err != redis.Nil {
-		return fmt.Errorf("redis pipeline error initializing counters for %s-%s: %w", videoID, resolution, err)
-	}
-
-	totalSetCmd, ok1 := cmders[0].(*redis.BoolCmd)
-	completedSetCmd, ok2 := cmders[1].(*redis.BoolCmd)
-
-	if !ok1 || !ok2 {
-		return fmt.Errorf("unexpected command result types from redis pipeline for %s-%s", videoID, resolution)
-	}
-
-	if totalSetCmd.Err() != nil && totalSetCmd.Err() != redis.Nil {
-		return fmt.Errorf("redis error setting total jobs for %s-%s: %w", videoID, resolution, totalSetCmd.Err())
-	}
-	if completedSetCmd.Err() != nil && completedSetCmd.Err() != redis.Nil {
-		return fmt.Errorf("redis error setting completed jobs for %s-%s: %w", videoID, resolution, completedSetCmd.Err())
-	}
-
-	if totalSetCmd.Val() {
-		log.Printf("Redis: Initialized '%s' to %d", totalJobsKey, totalJobs)
+	// A zero total comes from pipelined uploads: iframebreaker sets the key itself once probing ends.
+	if totalJobs > 0 {
+		totalSet, err := c.rdb.SetNX(ctx, totalJobsKey, totalJobs, 0).Result()
+		if err != nil && err != redis.Nil {
+			return fmt.Errorf("redis error setting total jobs for %s-%s: %w", videoID, resolution, err)
+		}
+		if totalSet {
+			log.Printf("Redis: Initialized '%s' to %d", totalJobsKey, totalJobs)
+		} else {
+			log.Printf("Redis: Key '%s' already exists.", totalJobsKey)
+		}
 	} else {
-		log.Printf("Redis: Key '%s' already exists.", totalJobsKey)
+		log.Printf("Redis: Total for '%s' will be set by the producer", totalJobsKey)
 	}
 
-	if completedSetCmd.Val() {
+	completedSet, err := c.rdb.HSetNX(ctx, completedJobsKey, resolution, 0).Result()
+	if err != nil && err != redis.Nil {
+		return fmt.Errorf("redis error setting completed jobs for %s-%s: %w", videoID, resolution, err)
+	}
+	if completedSet {
 		log.Printf("Redis: Initialized '%s' to 0", completedJobsKey)
 	} else {
 		log.Printf("Redis: Key '%s' already exists.", completedJobsKey)
@@ -2,6 +2,7 @@ package utils
 
 import (
 	"regexp"
+	"strconv"
 	"strings"
 	"unicode"
 )
@@ -26,3 +27,36 @@ func SanitizeLabel(input string) string {
 
 	return strings.ToLower(sanitized)
 }
+
+// ResolutionHeight parses a configured resolution such as "720" or "720p".
+func ResolutionHeight(resolution string) (int, error) {
+	return strconv.Atoi(strings.TrimSuffix(resolution, "p"))
+}
+
+// ResolutionsUpToHeight drops the resolutions taller than the source, which
+// would only be upscaled. The lowest resolution is kept even when the source is
+// shorter than all of them, and resolutions that are not a height ("720" or
+// "720p") are always kept. A sourceHeight of 0 means unknown and keeps all.
+func ResolutionsUpToHeight(resolutions []string, sourceHeight int) []string {
+	if sourceHeight <= 0 {
+		return resolutions
+	}
+
+	kept := make([]string, 0, len(resolutions))
+	lowest, lowestHeight := "", 0
+	for _, resolution := range resolutions {
+		height, err := ResolutionHeight(resolution)
+		if err != nil || height <= sourceHeight {
+			kept = append(kept, resolution)
+			continue
+		}
+		if lowest == "" || height < lowestHeight {
+			lowest, lowestHeight = resolution, height
+		}
+	}
+
+	if len(kept) == 0 && lowest != "" {
+		kept = append(kept, lowest)
+	}
+	return kept
+}
@@ -138,3 +138,29 @@ func TestSanitizeLabel_KubernetesCompliance(t *testing.T) {
 	}
 }
 
+
+func TestResolutionsUpToHeight(t *testing.T) {
+	ladder := []string{"240", "360", "480", "720", "1080"}
+	testCases := []struct {
+		name         string
+		sourceHeight int
+		expected     []string
+	}{
+		{"unknown_source", 0, ladder},
+		{"480p_source", 480, []string{"240", "360", "480"}},
+		{"between_rungs", 719, []string{"240", "360", "480"}},
+		{"4k_source", 2160, ladder},
+		{"below_lowest_keeps_lowest", 144, []string{"240"}},
+	}
+
+	for _, tc := range testCases {
+		result := ResolutionsUpToHeight(ladder, tc.sourceHeight)
+		assert.Equal(t, tc.expected, result, "Failed for case: %s", tc.name)
+	}
+}
+
+func TestResolutionsUpToHeight_SuffixedAndUnparsable(t *testing.T) {
+	result := ResolutionsUpToHeight([]string{"360p", "720p", "auto"}, 480)
+
+	assert.Equal(t, []string{"360p", "auto"}, result)
+}
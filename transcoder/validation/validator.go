@@ -164,10 +164,11 @@ func (v *MessageValidator) validateTimestamps(timestamps []float64) []Validation
 func (v *MessageValidator) validateTotalMessages(totalMessages int) []ValidationError {
 	var errors []ValidationError
 
-	if totalMessages <= 0 {
+	// Zero means the producer publishes while still probing and records the total in Redis.
+	if totalMessages < 0 {
 		errors = append(errors, ValidationError{
 			Field:   "total_messages",
-			Message: "total messages must be positive",
+			Message: "total messages cannot be negative",
 		})
 	}
 
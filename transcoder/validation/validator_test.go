@@ -129,6 +129,22 @@ func TestMessageValidator_ValidateTimestamps_NegativeValues(t *testing.T) {
 	assert.Contains(t, errors[0].Message, "cannot be negative")
 }
 
+func TestMessageValidator_ValidateTotalMessages_PipelinedZero(t *testing.T) {
+	validator := NewMessageValidator()
+
+	assert.Empty(t, validator.validateTotalMessages(0))
+}
+
+func TestMessageValidator_ValidateTotalMessages_Negative(t *testing.T) {
+	validator := NewMessageValidator()
+
+	errors := validator.validateTotalMessages(-1)
+
+	assert.NotEmpty(t, errors)
+	assert.Equal(t, "total_messages", errors[0].Field)
+	assert.Contains(t, errors[0].Message, "cannot be negative")
+}
+
 func TestMessageValidator_ValidateTimestamps_Empty(t *testing.T) {
 	validator := NewMessageValidator()
 
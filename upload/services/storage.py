@@ -21,7 +21,8 @@ class StorageService:
         headers = {
             "Content-Type": request.content_type or "application/octet-stream",
             "original-filename": request.filename,
-            "user-id": user_id,
+            # Kept as object user metadata, which iframebreaker's fair scheduler reads
+            "x-amz-meta-user-id": user_id,
             "title": request.title,
             "visibility": request.visibility,
         }